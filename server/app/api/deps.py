@@ -6,9 +6,11 @@ from uuid import UUID
 from fastapi import Depends, HTTPException, Request, status
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 from sqlalchemy import select
-from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 
-from app.core.database import get_db
+from app.core import principal_cache
+from app.core.database import get_db, get_streaming_session_maker
+from app.core.principal_cache import AdminPrincipal
 from app.core.security import decode_token
 from app.models.admin import Admin
 
@@ -18,11 +20,62 @@ security = HTTPBearer(auto_error=False)
 ADMIN_TOKEN_COOKIE = "swaps_token"
 ADMIN_LOGIN_PATH = "/admin/login"
 
+# Routes anyone may call. Server-Timing there is only shown to admins: e.g. whether
+# /licenses/validate ran the lookup and log_write stages tells whether a key exists
+PUBLIC_PATHS = frozenset(
+    {
+        "/health",
+        "/metrics",
+        "/licenses/validate",
+        "/auth/login",
+        "/auth/refresh",
+        ADMIN_LOGIN_PATH,
+        "/docs",
+        "/docs/oauth2-redirect",
+        "/redoc",
+        "/openapi.json",
+    }
+)
+
+
+async def _load_principal(db: AsyncSession, email: str) -> AdminPrincipal | None:
+    """Principal for a token subject: from the principal cache, else one admins lookup."""
+    principal = principal_cache.get(email)
+    if principal is not None:
+        return principal
+    generation = principal_cache.generation()
+    result = await db.execute(select(Admin).where(Admin.email == email).limit(1))
+    admin = result.scalar_one_or_none()
+    if admin is None:
+        return None
+    principal = AdminPrincipal.from_admin(admin)
+    principal_cache.put(principal, generation)
+    return principal
+
+
+def server_timing_allowed(request: Request) -> bool:
+    """Server-Timing for admin-only routes, or for requests with a valid admin token.
+
+    Unmatched paths count as public. Only the token signature and type are checked (no DB
+    lookup), as for any other diagnostic the token holder could request.
+    """
+    route = request.scope.get("route")
+    if route is not None and route.path not in PUBLIC_PATHS:
+        return True
+    token = request.cookies.get(ADMIN_TOKEN_COOKIE)
+    auth = request.headers.get("authorization", "")
+    if auth[:7].lower() == "bearer ":
+        token = auth[7:]
+    if not token:
+        return False
+    payload = decode_token(token)
+    return bool(payload) and payload.get("type") == "access"
+
 
 async def get_current_admin(
     db: AsyncSession = Depends(get_db),
     credentials: HTTPAuthorizationCredentials | None = Depends(security),
-) -> Admin:
+) -> AdminPrincipal:
     """Require valid JWT and return the admin. Use for protected routes."""
     if not credentials or credentials.scheme != "Bearer":
         raise HTTPException(
@@ -40,8 +93,7 @@ async def get_current_admin(
     email = payload.get("sub")
     if not email:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token")
-    result = await db.execute(select(Admin).where(Admin.email == email).limit(1))
-    admin = result.scalar_one_or_none()
+    admin = await _load_principal(db, email)
     if not admin:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Admin not found")
     if not admin.is_active:
@@ -52,7 +104,7 @@ async def get_current_admin(
 async def get_optional_admin(
     db: AsyncSession = Depends(get_db),
     credentials: HTTPAuthorizationCredentials | None = Depends(security),
-) -> Admin | None:
+) -> AdminPrincipal | None:
     """Optional admin from JWT. Returns None if no/invalid token."""
     if not credentials or credentials.scheme != "Bearer":
         return None
@@ -62,44 +114,60 @@ async def get_optional_admin(
     email = payload.get("sub")
     if not email:
         return None
-    result = await db.execute(select(Admin).where(Admin.email == email).limit(1))
-    admin = result.scalar_one_or_none()
+    admin = await _load_principal(db, email)
     if not admin or not admin.is_active:
         return None
     return admin
 
 
+def _redirect_to_login() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_302_FOUND,
+        headers={"Location": ADMIN_LOGIN_PATH},
+    )
+
+
+def _cookie_subject(request: Request) -> str:
+    """Token subject (admin email) of the swaps_token cookie, else a redirect to login."""
+    token = request.cookies.get(ADMIN_TOKEN_COOKIE)
+    if not token:
+        raise _redirect_to_login()
+    payload = decode_token(token)
+    if not payload or payload.get("type") != "access":
+        raise _redirect_to_login()
+    email = payload.get("sub")
+    if not email:
+        raise _redirect_to_login()
+    return email
+
+
 async def get_admin_from_cookie(
     request: Request,
     db: AsyncSession = Depends(get_db),
-) -> Admin:
+) -> AdminPrincipal:
     """
     For dashboard HTML routes: require admin from swaps_token cookie.
     Redirects to /admin/login if missing or invalid.
     """
-    token = request.cookies.get(ADMIN_TOKEN_COOKIE)
-    if not token:
-        raise HTTPException(
-            status_code=status.HTTP_302_FOUND,
-            headers={"Location": ADMIN_LOGIN_PATH},
-        )
-    payload = decode_token(token)
-    if not payload or payload.get("type") != "access":
-        raise HTTPException(
-            status_code=status.HTTP_302_FOUND,
-            headers={"Location": ADMIN_LOGIN_PATH},
-        )
-    email = payload.get("sub")
-    if not email:
-        raise HTTPException(
-            status_code=status.HTTP_302_FOUND,
-            headers={"Location": ADMIN_LOGIN_PATH},
-        )
-    result = await db.execute(select(Admin).where(Admin.email == email).limit(1))
-    admin = result.scalar_one_or_none()
+    admin = await _load_principal(db, _cookie_subject(request))
     if not admin or not admin.is_active:
-        raise HTTPException(
-            status_code=status.HTTP_302_FOUND,
-            headers={"Location": ADMIN_LOGIN_PATH},
-        )
+        raise _redirect_to_login()
+    return admin
+
+
+async def get_streaming_admin_from_cookie(
+    request: Request,
+    session_maker: async_sessionmaker[AsyncSession] = Depends(get_streaming_session_maker),
+) -> AdminPrincipal:
+    """get_admin_from_cookie for streamed responses (pages, SSE).
+
+    A yield dependency such as get_db may only be cleaned up after the response body has
+    been sent (FastAPI >= 0.118), which for a stream holds a pooled connection for the whole
+    stream. Here a principal-cache miss reads the admin in a session of its own, closed
+    before the route runs.
+    """
+    async with session_maker() as db:  # connects only on a cache miss
+        admin = await _load_principal(db, _cookie_subject(request))
+    if not admin or not admin.is_active:
+        raise _redirect_to_login()
     return admin
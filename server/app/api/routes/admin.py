@@ -1,16 +1,30 @@
 """Admin dashboard routes (Jinja2 + HTMX) — Sprint 4 & 5."""
 
-from datetime import date
+from contextlib import aclosing
+from datetime import date, datetime
+from urllib.parse import urlencode
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, Form, Request
-from fastapi.responses import HTMLResponse, RedirectResponse
+from fastapi import APIRouter, Depends, Form, HTTPException, Request
+from fastapi.responses import HTMLResponse, RedirectResponse, StreamingResponse
 from fastapi.templating import Jinja2Templates
-from sqlalchemy.ext.asyncio import AsyncSession
+from jinja2 import FileSystemBytecodeCache
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 
-from app.api.deps import ADMIN_TOKEN_COOKIE, get_admin_from_cookie, get_db
-from app.core.security import create_access_token, verify_password
+from app.api.deps import (
+    ADMIN_TOKEN_COOKIE,
+    get_admin_from_cookie,
+    get_db,
+    get_streaming_admin_from_cookie,
+)
+from app.core.broadcast import TooManySubscribersError, audit_broadcaster
+from app.core.config import settings
+from app.core.crypto_pool import CryptoPoolBusyError, verify_password_async
+from app.core.database import get_readonly_db, get_streaming_session_maker
+from app.core.principal_cache import AdminPrincipal
+from app.core.security import create_access_token
 from app.models.admin import Admin
+from app.models.validation_log import ValidationReason
 from app.schemas.license import LicenseCreate, LicenseUpdate
 from app.services import license_service
 
@@ -20,6 +34,81 @@ from pathlib import Path
 _templates_dir = Path(__file__).resolve().parent.parent.parent / "templates"
 templates = Jinja2Templates(directory=str(_templates_dir))
 
+REASON_LABELS = [r.label for r in ValidationReason]
+
+
+def _bytecode_cache(pattern: str) -> FileSystemBytecodeCache | None:
+    if not settings.template_cache_dir:
+        return None
+    cache_dir = Path(settings.template_cache_dir)
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    return FileSystemBytecodeCache(str(cache_dir), pattern)
+
+
+templates.env.bytecode_cache = _bytecode_cache("__jinja2_%s.cache")
+# Same loader, filters and globals; async so templates can loop over DB cursors. Async
+# code differs from sync code for the same source, so it gets its own cache files
+_streaming_env = templates.env.overlay(
+    enable_async=True, bytecode_cache=_bytecode_cache("__jinja2_async_%s.cache")
+)
+_STREAM_CHUNK_CHARS = 8192
+
+
+def precompile_templates() -> int:
+    """Load every template into both environments' in-memory caches now, compiling it or
+    reading its bytecode, instead of on the first request for each page.
+
+    Returns the number of templates loaded per environment.
+    """
+    names = templates.env.list_templates(extensions=["html"])
+    for env in (templates.env, _streaming_env):
+        for name in names:
+            env.get_template(name)
+    return len(names)
+
+
+class _ClosingStreamingResponse(StreamingResponse):
+    """StreamingResponse that closes its body generator however the response ends.
+
+    When the client disconnects under ASGI spec 2.4, Starlette's send raises while the body
+    is suspended at a yield and nothing closes it, so its cleanup would wait for garbage
+    collection.
+    """
+
+    async def __call__(self, scope, receive, send) -> None:
+        try:
+            await super().__call__(scope, receive, send)
+        finally:
+            await self.body_iterator.aclose()
+
+
+def _stream_template(name: str, context: dict, db: AsyncSession) -> StreamingResponse:
+    """Render a template progressively, sending about _STREAM_CHUNK_CHARS at a time.
+
+    Async iterables in `context` (cursors over `db`) are consumed as the template reaches
+    them, so page size does not bound memory or time to first byte. `db` is closed when the
+    body ends, however it ends: rendered, a template or query error, or a client disconnect.
+    """
+
+    async def body():
+        try:
+            buffer: list[str] = []
+            size = 0
+            async with aclosing(_streaming_env.get_template(name).generate_async(context)) as gen:
+                async for chunk in gen:
+                    buffer.append(chunk)
+                    size += len(chunk)
+                    if size >= _STREAM_CHUNK_CHARS:
+                        yield "".join(buffer)
+                        buffer.clear()
+                        size = 0
+            if buffer:
+                yield "".join(buffer)
+        finally:
+            await db.close()
+
+    return _ClosingStreamingResponse(body(), media_type="text/html; charset=utf-8")
+
 
 def _set_token_cookie(response: RedirectResponse, token: str) -> None:
     response.set_cookie(
@@ -57,7 +146,15 @@ async def login_submit(
 
     result = await db.execute(select(Admin).where(Admin.email == email).limit(1))
     admin = result.scalar_one_or_none()
-    if not admin or not verify_password(password, admin.password_hash) or not admin.is_active:
+    try:
+        password_ok = bool(admin) and await verify_password_async(password, admin.password_hash)
+    except CryptoPoolBusyError:
+        return templates.TemplateResponse(
+            "admin/login.html",
+            {"request": request, "error": "Too many login attempts in progress; try again"},
+            status_code=503,
+        )
+    if not password_ok or not admin.is_active:
         return templates.TemplateResponse(
             "admin/login.html",
             {"request": request, "error": "Invalid email or password"},
@@ -86,24 +183,29 @@ async def dashboard(
     client_name: str | None = None,
     expiry_from: str | None = None,
     expiry_to: str | None = None,
-    db: AsyncSession = Depends(get_db),
-    admin: Admin = Depends(get_admin_from_cookie),
+    session_maker: async_sessionmaker[AsyncSession] = Depends(get_streaming_session_maker),
+    admin: AdminPrincipal = Depends(get_streaming_admin_from_cookie),
 ):
-    """License list with optional filters and dashboard summary."""
+    """License list with optional filters and dashboard summary (table streamed)."""
     expiry_from_d = date.fromisoformat(expiry_from) if expiry_from else None
     expiry_to_d = date.fromisoformat(expiry_to) if expiry_to else None
-    licenses = await license_service.list_licenses(
+    db = session_maker()
+    try:
+        active_count = await license_service.count_licenses_by_status(db, "active")
+        expiring_soon = await license_service.list_licenses_expiring_soon(db, within_days=30)
+        recent_failures = await license_service.list_recent_validation_failures(db, limit=10)
+    except BaseException:
+        await db.close()
+        raise
+    licenses = license_service.stream_licenses_with_ip_estimates(
         db,
         status=status,
         client_name=client_name,
         expiry_from=expiry_from_d,
         expiry_to=expiry_to_d,
-        limit=200,
+        limit=settings.admin_table_max_rows,
     )
-    active_count = await license_service.count_licenses_by_status(db, "active")
-    expiring_soon = await license_service.list_licenses_expiring_soon(db, within_days=30)
-    recent_failures = await license_service.list_recent_validation_failures(db, limit=10)
-    return templates.TemplateResponse(
+    return _stream_template(
         "admin/dashboard.html",
         {
             "request": request,
@@ -117,13 +219,14 @@ async def dashboard(
             "expiring_soon": expiring_soon,
             "recent_failures": recent_failures,
         },
+        db,
     )
 
 
 @router.get("/licenses/new", response_class=HTMLResponse)
 async def license_new_form(
     request: Request,
-    admin: Admin = Depends(get_admin_from_cookie),
+    admin: AdminPrincipal = Depends(get_admin_from_cookie),
 ):
     """Create license form."""
     return templates.TemplateResponse(
@@ -136,7 +239,7 @@ async def license_new_form(
 async def license_create(
     request: Request,
     db: AsyncSession = Depends(get_db),
-    admin: Admin = Depends(get_admin_from_cookie),
+    admin: AdminPrincipal = Depends(get_admin_from_cookie),
     app_name: str = Form(...),
     client_name: str = Form(...),
     expiry_date: str = Form(...),
@@ -168,8 +271,8 @@ async def license_create(
 async def license_edit_form(
     request: Request,
     license_id: UUID,
-    db: AsyncSession = Depends(get_db),
-    admin: Admin = Depends(get_admin_from_cookie),
+    db: AsyncSession = Depends(get_readonly_db),
+    admin: AdminPrincipal = Depends(get_admin_from_cookie),
 ):
     """Edit license form."""
     license_ = await license_service.get_license_by_id(db, license_id)
@@ -186,7 +289,7 @@ async def license_update(
     request: Request,
     license_id: UUID,
     db: AsyncSession = Depends(get_db),
-    admin: Admin = Depends(get_admin_from_cookie),
+    admin: AdminPrincipal = Depends(get_admin_from_cookie),
     app_name: str = Form(...),
     client_name: str = Form(...),
     expiry_date: str = Form(...),
@@ -194,9 +297,6 @@ async def license_update(
     monthly_renewal: str = Form("off"),
 ):
     """Update license and redirect to list."""
-    license_ = await license_service.get_license_by_id(db, license_id)
-    if not license_:
-        return RedirectResponse(url="/admin", status_code=302)
     data = LicenseUpdate(
         app_name=app_name.strip(),
         client_name=client_name.strip(),
@@ -204,7 +304,7 @@ async def license_update(
         status=status,
         monthly_renewal=monthly_renewal.lower() == "on",
     )
-    await license_service.update_license(db, license_, data)
+    await license_service.update_license(db, license_id, data)
     return RedirectResponse(url="/admin", status_code=302)
 
 
@@ -212,12 +312,10 @@ async def license_update(
 async def license_deactivate(
     license_id: UUID,
     db: AsyncSession = Depends(get_db),
-    admin: Admin = Depends(get_admin_from_cookie),
+    admin: AdminPrincipal = Depends(get_admin_from_cookie),
 ):
     """Deactivate license and redirect to list."""
-    license_ = await license_service.get_license_by_id(db, license_id)
-    if license_:
-        await license_service.deactivate_license(db, license_)
+    await license_service.deactivate_license(db, license_id)
     return RedirectResponse(url="/admin", status_code=302)
 
 
@@ -226,17 +324,49 @@ async def license_deactivate(
 async def license_history(
     request: Request,
     license_id: UUID,
-    db: AsyncSession = Depends(get_db),
-    admin: Admin = Depends(get_admin_from_cookie),
+    session_maker: async_sessionmaker[AsyncSession] = Depends(get_streaming_session_maker),
+    admin: AdminPrincipal = Depends(get_streaming_admin_from_cookie),
 ):
-    """Validation history table for one license."""
-    license_ = await license_service.get_license_by_id(db, license_id)
+    """Validation history table for one license (streamed)."""
+    db = session_maker()
+    try:
+        license_ = await license_service.get_license_by_id(db, license_id)
+        if license_:
+            distinct_ips = await license_service.distinct_ip_estimates(db, [license_id])
+    except BaseException:
+        await db.close()
+        raise
     if not license_:
+        await db.close()
         return RedirectResponse(url="/admin", status_code=302)
-    logs = await license_service.list_validation_history(db, license_id, limit=200)
-    return templates.TemplateResponse(
+    logs = license_service.stream_validation_history(
+        db, license_id, limit=settings.admin_table_max_rows
+    )
+    return _stream_template(
         "admin/license_history.html",
-        {"request": request, "admin": admin, "license": license_, "logs": logs},
+        {
+            "request": request,
+            "admin": admin,
+            "license": license_,
+            "logs": logs,
+            "distinct_ips": distinct_ips[license_id],
+        },
+        db,
+    )
+
+
+# ---- Heavy hitters widget (HTMX fragment, polled by the dashboard) ----
+@router.get("/heavy-hitters", response_class=HTMLResponse)
+async def heavy_hitters_widget(
+    request: Request,
+    db: AsyncSession = Depends(get_readonly_db),
+    admin: AdminPrincipal = Depends(get_admin_from_cookie),
+):
+    """Top validating license keys and IPs in the rolling window."""
+    report = await license_service.heavy_hitters_report(db, limit=5)
+    return templates.TemplateResponse(
+        "admin/_heavy_hitters.html",
+        {"request": request, "report": report},
     )
 
 
@@ -246,11 +376,44 @@ async def audit_log(
     request: Request,
     skip: int = 0,
     limit: int = 100,
-    db: AsyncSession = Depends(get_db),
-    admin: Admin = Depends(get_admin_from_cookie),
+    start: str | None = None,
+    end: str | None = None,
+    result: str | None = None,
+    reason: str | None = None,
+    ip: str | None = None,
+    license_id: str | None = None,
+    db: AsyncSession = Depends(get_readonly_db),
+    admin: AdminPrincipal = Depends(get_admin_from_cookie),
 ):
-    """Full audit log: all validation attempts with IP, timestamp, result, error."""
-    entries = await license_service.list_audit_logs(db, skip=skip, limit=limit)
+    """Full audit log: all validation attempts with IP, timestamp, result, error; filterable."""
+    # Empty form fields arrive as "", meaning "no filter"
+    filters = {
+        "start": start or "",
+        "end": end or "",
+        "result": result or "",
+        "reason": reason or "",
+        "ip": ip or "",
+        "license_id": license_id or "",
+    }
+    error = None
+    entries = []
+    try:
+        if filters["result"] and filters["result"] not in ("success", "fail"):
+            raise ValueError(f"Unknown result {result!r}")
+        if filters["reason"] and filters["reason"] not in REASON_LABELS:
+            raise ValueError(f"Unknown reason {reason!r}")
+        criteria = {
+            "start": datetime.fromisoformat(start) if start else None,
+            "end": datetime.fromisoformat(end) if end else None,
+            "result": result or None,
+            "reason": reason or None,
+            "ip_network": license_service.parse_ip_filter(ip) if ip else None,
+            "license_id": UUID(license_id.strip()) if license_id else None,
+        }
+    except ValueError as exc:
+        error = f"Invalid filter: {exc}"
+    else:
+        entries = await license_service.list_audit_logs(db, skip=skip, limit=limit, **criteria)
     return templates.TemplateResponse(
         "admin/audit.html",
         {
@@ -259,5 +422,30 @@ async def audit_log(
             "entries": entries,
             "skip": skip,
             "limit": limit,
+            "filters": filters,
+            "filter_query": urlencode({k: v for k, v in filters.items() if v}),
+            "reasons": REASON_LABELS,
+            "error": error,
         },
     )
+
+
+@router.get("/audit/stream")
+async def audit_stream(
+    request: Request,
+    admin: AdminPrincipal = Depends(get_streaming_admin_from_cookie),
+):
+    """Live tail of validations in this worker (Server-Sent Events).
+
+    Only the admin lookup may touch the database (on a principal-cache miss), in a session
+    closed before the stream starts; the stream itself runs no queries.
+    """
+    try:
+        sub = audit_broadcaster.subscribe()
+    except TooManySubscribersError as exc:
+        raise HTTPException(status_code=503, detail=str(exc), headers={"Retry-After": "30"})
+    return StreamingResponse(
+        audit_broadcaster.stream(sub, request.is_disconnected),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
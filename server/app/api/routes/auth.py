@@ -7,12 +7,11 @@ from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.api.deps import get_db
+from app.core.crypto_pool import CryptoPoolBusyError, verify_password_async
 from app.core.security import (
     create_access_token,
     create_refresh_token,
     decode_token,
-    hash_password,
-    verify_password,
 )
 from app.models.admin import Admin
 from app.schemas.auth import LoginRequest, RefreshRequest, TokenResponse
@@ -28,7 +27,17 @@ async def login(
     """Admin login. Returns JWT access and refresh tokens."""
     result = await db.execute(select(Admin).where(Admin.email == body.email).limit(1))
     admin = result.scalar_one_or_none()
-    if not admin or not verify_password(body.password, admin.password_hash):
+    try:
+        password_ok = bool(admin) and await verify_password_async(
+            body.password, admin.password_hash
+        )
+    except CryptoPoolBusyError:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Too many login attempts in progress; try again shortly",
+            headers={"Retry-After": "1"},
+        ) from None
+    if not password_ok:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid email or password",
@@ -0,0 +1,94 @@
+"""Admin diagnostics routes: on-demand sampling profiler, validation heavy hitters."""
+
+import asyncio
+import threading
+from datetime import datetime, timezone
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from fastapi.responses import PlainTextResponse
+from fastapi.routing import APIRoute
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.deps import get_current_admin
+from app.core.config import settings
+from app.core.database import get_readonly_db
+from app.core.profiler import ProfilerBusyError, render_collapsed, sample_thread
+from app.services import license_service
+
+router = APIRouter()
+
+
+def _endpoint_code(request: Request, spec: str):
+    """Code object of the endpoint serving `spec`: "METHOD /path" (e.g.
+    "PATCH /licenses/{license_id}"), or just the path when one endpoint serves it.
+    """
+    method, _, path = spec.strip().rpartition(" ")
+    method = method.strip().upper()
+    endpoints = {
+        route.endpoint: route.methods
+        for route in request.app.routes
+        if isinstance(route, APIRoute)
+        and route.path == path
+        and (not method or method in route.methods)
+    }
+    if not endpoints:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"No route {spec}")
+    if len(endpoints) > 1:
+        methods = ", ".join(sorted(m for ms in endpoints.values() for m in ms))
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"{path} has several endpoints; prefix the method ({methods})",
+        )
+    return next(iter(endpoints)).__code__
+
+
+@router.get("/profile", response_class=PlainTextResponse)
+async def profile(
+    request: Request,
+    seconds: float = Query(5.0, gt=0),
+    interval_ms: float = Query(5.0, ge=1.0, le=100.0),
+    route: str | None = Query(
+        None,
+        description="Only keep samples inside this route's handler: 'METHOD /path' or a path",
+    ),
+    admin=Depends(get_current_admin),
+) -> PlainTextResponse:
+    """
+    Sample this worker's event loop for `seconds` and return collapsed stacks
+    (flamegraph.pl / speedscope input). Runs in a background thread; the loop keeps serving.
+    """
+    if seconds > settings.profiler_max_seconds:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=f"seconds must be <= {settings.profiler_max_seconds}",
+        )
+    only_within = _endpoint_code(request, route) if route else None
+    loop_thread = threading.get_ident()
+    try:
+        stacks, taken = await asyncio.to_thread(
+            sample_thread, loop_thread, seconds, interval_ms / 1000, only_within
+        )
+    except ProfilerBusyError as e:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e)) from e
+    stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+    return PlainTextResponse(
+        render_collapsed(stacks),
+        headers={
+            "Content-Disposition": f'attachment; filename="profile-{stamp}.folded"',
+            "X-Profile-Samples": str(taken),
+        },
+    )
+
+
+@router.get("/heavy-hitters")
+async def heavy_hitters(
+    limit: int = Query(10, ge=1, le=100),
+    db: AsyncSession = Depends(get_readonly_db),
+    admin=Depends(get_current_admin),
+) -> dict:
+    """
+    Approximate top license keys and client IPs of /licenses/validate over the rolling
+    window (this worker only). `count` may over-estimate by at most `error`.
+    """
+    return await license_service.heavy_hitters_report(db, limit=limit)
@@ -1,18 +1,25 @@
 """License CRUD and validation routes."""
 
 from collections import deque
-from datetime import date
+from datetime import date, datetime
 from time import time
+from typing import Literal
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, HTTPException, Request, status
-from sqlalchemy import select
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.api.deps import get_current_admin, get_db
-from app.core.security import hash_license_key
-from app.models.license import License
-from app.models.validation_log import ValidationLog
+from app.core.client_ip import client_ip
+from app.core.config import settings
+from app.core.database import get_readonly_db
+from app.core.fast_json import JSONBytesResponse, encode, pre_encoded
+from app.core.heavy_hitters import heavy_hitters
+from app.core.metrics import RATE_LIMIT_REJECTIONS, VALIDATION_OUTCOMES
+from app.core.security import license_key_digest
+from app.core.tracing import span
+from app.models.validation_log import ValidationReason
 from app.schemas.license import (
+    AuditLogEntry,
     LicenseCreate,
     LicenseCreateResponse,
     LicenseResponse,
@@ -24,23 +31,24 @@ from app.schemas.license import (
 from app.services import license_service
 
 router = APIRouter()
+# /validate alone, for API-only deployments (settings.deployment_mode == "api")
+validate_router = APIRouter()
 
-# In-memory rate limit: key_hash -> deque of timestamps (last hour). Sprint 6: use Redis.
-_validations_by_key: dict[str, deque[float]] = {}
-_RATE_LIMIT_PER_HOUR = 10
+# In-memory rate limit: key digest -> deque of timestamps (last hour). Sprint 6: use Redis.
+_validations_by_key: dict[bytes, deque[float]] = {}
 _HOUR_SECONDS = 3600
 
 
-def _check_validation_rate_limit(license_key: str) -> bool:
+def _check_validation_rate_limit(key_hash: bytes) -> bool:
     """True if under limit (allow), False if over limit (reject)."""
-    key_hash = hash_license_key(license_key)
+    limit = settings.validation_rate_limit_per_key_per_hour
     now = time()
     if key_hash not in _validations_by_key:
-        _validations_by_key[key_hash] = deque(maxlen=_RATE_LIMIT_PER_HOUR + 1)
+        _validations_by_key[key_hash] = deque(maxlen=limit + 1)
     q = _validations_by_key[key_hash]
     while q and q[0] < now - _HOUR_SECONDS:
         q.popleft()
-    if len(q) >= _RATE_LIMIT_PER_HOUR:
+    if len(q) >= limit:
         return False
     q.append(now)
     return True
@@ -74,7 +82,7 @@ async def list_licenses(
     expiry_to: date | None = None,
     skip: int = 0,
     limit: int = 100,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_readonly_db),
     admin=Depends(get_current_admin),
 ) -> list[LicenseResponse]:
     """List all licenses with optional filters (admin only)."""
@@ -90,29 +98,86 @@ async def list_licenses(
     return [LicenseResponse.model_validate(x) for x in items]
 
 
-@router.post("/validate", response_model=ValidateResponse)
+@router.get("/audit", response_model=list[AuditLogEntry])
+async def list_audit_logs(
+    start: datetime | None = Query(None, description="validated_at >= start (UTC)"),
+    end: datetime | None = Query(None, description="validated_at < end (UTC)"),
+    result: Literal["success", "fail"] | None = None,
+    reason: str | None = Query(None, description='Failure reason, e.g. "License expired"'),
+    ip: str | None = Query(None, description="Client IP address or CIDR, e.g. 203.0.113.0/24"),
+    license_id: UUID | None = None,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=1000),
+    db: AsyncSession = Depends(get_readonly_db),
+    admin=Depends(get_current_admin),
+) -> list[AuditLogEntry]:
+    """Validation logs across all licenses, newest first, with optional filters (admin only)."""
+    if reason is not None and reason not in {r.label for r in ValidationReason}:
+        raise HTTPException(status_code=422, detail=f"Unknown reason {reason!r}")
+    try:
+        ip_network = license_service.parse_ip_filter(ip) if ip else None
+    except ValueError:
+        raise HTTPException(status_code=422, detail=f"Invalid IP address or CIDR {ip!r}")
+    entries = await license_service.list_audit_logs(
+        db,
+        skip=skip,
+        limit=limit,
+        start=start,
+        end=end,
+        result=result,
+        reason=reason,
+        ip_network=ip_network,
+        license_id=license_id,
+    )
+    return [
+        AuditLogEntry(
+            **ValidationLogEntry.model_validate(log).model_dump(),
+            app_name=lic.app_name,
+            client_name=lic.client_name,
+        )
+        for log, lic in entries
+    ]
+
+
+_RATE_LIMITED = pre_encoded(
+    ValidateResponse(
+        valid=False,
+        status="rate_limited",
+        expires_at=None,
+        message="Too many validation attempts; try again later",
+    )
+)
+
+
+@validate_router.post("/validate", response_model=ValidateResponse)
 async def validate_license(
     body: ValidateRequest,
     request: Request,
     db: AsyncSession = Depends(get_db),
-) -> ValidateResponse:
-    """Public endpoint: validate a license key (called by SDK). Signed request required."""
-    if not _check_validation_rate_limit(body.license_key):
-        return ValidateResponse(
-            valid=False,
-            status="rate_limited",
-            expires_at=None,
-            message="Too many validation attempts; try again later",
-        )
-    ip_address = request.client.host if request.client else None
-    return await license_service.validate_license(db, body, ip_address=ip_address)
-
-
-# Path for validate must not match /{id}; so we define validate above and {id} below.
+) -> JSONBytesResponse:
+    """Public endpoint: validate a license key (called by SDK). Signed request required.
+
+    The body is encoded with orjson (constant outcomes are pre-encoded) instead of going
+    through response_model validation; response_model documents the same wire format.
+    """
+    ip_address = client_ip(request)
+    key_hash = license_key_digest(body.license_key)
+    heavy_hitters.record(key_hash, ip_address)
+    if not _check_validation_rate_limit(key_hash):
+        RATE_LIMIT_REJECTIONS.inc("license_key")
+        VALIDATION_OUTCOMES.inc("rate_limited")
+        return JSONBytesResponse(encode(_RATE_LIMITED))
+    with span("handler"):
+        response = await license_service.validate_license(db, body, ip_address=ip_address)
+    VALIDATION_OUTCOMES.inc(response.status)
+    return JSONBytesResponse(encode(response))
+
+
+# Path for validate must not match /{id}; main.py includes validate_router before router.
 @router.get("/{license_id}", response_model=LicenseResponse)
 async def get_license(
     license_id: UUID,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_readonly_db),
     admin=Depends(get_current_admin),
 ) -> LicenseResponse:
     """Get single license details (admin only)."""
@@ -130,10 +195,9 @@ async def update_license(
     admin=Depends(get_current_admin),
 ) -> LicenseResponse:
     """Update license fields (admin only)."""
-    license_ = await license_service.get_license_by_id(db, license_id)
-    if not license_:
+    updated = await license_service.update_license(db, license_id, body)
+    if not updated:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="License not found")
-    updated = await license_service.update_license(db, license_, body)
     return LicenseResponse.model_validate(updated)
 
 
@@ -144,24 +208,16 @@ async def deactivate_license(
     admin=Depends(get_current_admin),
 ) -> None:
     """Soft-delete / deactivate a license (admin only)."""
-    license_ = await license_service.get_license_by_id(db, license_id)
-    if not license_:
+    if not await license_service.deactivate_license(db, license_id):
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="License not found")
-    await license_service.deactivate_license(db, license_)
 
 
 @router.get("/{license_id}/history", response_model=list[ValidationLogEntry])
 async def get_license_history(
     license_id: UUID,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_readonly_db),
     admin=Depends(get_current_admin),
 ) -> list[ValidationLogEntry]:
     """Get validation history for a license (admin only)."""
-    result = await db.execute(
-        select(ValidationLog)
-        .where(ValidationLog.license_id == license_id)
-        .order_by(ValidationLog.validated_at.desc())
-        .limit(500)
-    )
-    logs = list(result.scalars().all())
+    logs = await license_service.list_validation_history(db, license_id, limit=500)
     return [ValidationLogEntry.model_validate(x) for x in logs]
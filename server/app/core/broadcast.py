@@ -0,0 +1,106 @@
+"""In-process fan-out of validation events to live audit subscribers (Server-Sent Events).
+
+The validate path publishes each outcome once; the event is encoded to an SSE frame a single
+time and put on every subscriber's bounded queue without awaiting. A subscriber whose queue
+is full (its client reads slower than validations arrive) is dropped: it gets the frames
+already buffered, then a `dropped` event, and its stream ends (EventSource reconnects on
+its own). Publishing never blocks the validate path and costs nothing with no subscribers;
+streams never touch the database. Events are per worker process.
+"""
+
+import asyncio
+import json
+from collections.abc import AsyncIterator, Awaitable, Callable
+
+from app.core.config import settings
+from app.core.metrics import CallbackGauge, Counter, registry
+
+DROPPED_FRAME = b"event: dropped\ndata: {}\n\n"
+KEEPALIVE_FRAME = b": keepalive\n\n"
+
+AUDIT_STREAM_DROPS = registry.register(
+    Counter(
+        "swaps_audit_stream_dropped_subscribers_total",
+        "Live audit subscribers disconnected because their buffer was full.",
+    )
+)
+
+
+class TooManySubscribersError(RuntimeError):
+    """audit_stream_max_subscribers streams are already open in this worker."""
+
+
+class Subscription:
+    """One live stream: a bounded queue of encoded SSE frames."""
+
+    __slots__ = ("queue", "dropped")
+
+    def __init__(self, maxsize: int) -> None:
+        self.queue: asyncio.Queue[bytes] = asyncio.Queue(maxsize)
+        self.dropped = False
+
+
+class Broadcaster:
+    """Publishes events to all current subscribers; slow subscribers are dropped."""
+
+    def __init__(self) -> None:
+        self._subscribers: set[Subscription] = set()
+
+    def __len__(self) -> int:
+        return len(self._subscribers)
+
+    def subscribe(self) -> Subscription:
+        if len(self._subscribers) >= settings.audit_stream_max_subscribers:
+            raise TooManySubscribersError("Too many live audit streams")
+        sub = Subscription(settings.audit_stream_queue_size)
+        self._subscribers.add(sub)
+        return sub
+
+    def unsubscribe(self, sub: Subscription) -> None:
+        self._subscribers.discard(sub)
+
+    def publish(self, event: dict) -> None:
+        if not self._subscribers:
+            return
+        frame = f"data: {json.dumps(event, separators=(',', ':'))}\n\n".encode()
+        for sub in list(self._subscribers):
+            try:
+                sub.queue.put_nowait(frame)
+            except asyncio.QueueFull:
+                sub.dropped = True
+                self._subscribers.discard(sub)
+                AUDIT_STREAM_DROPS.inc()
+
+    async def stream(
+        self, sub: Subscription, is_disconnected: Callable[[], Awaitable[bool]]
+    ) -> AsyncIterator[bytes]:
+        """SSE body for one subscription; unsubscribes when the client goes away."""
+        try:
+            yield b"retry: 3000\n\n"
+            while True:
+                if sub.dropped and sub.queue.empty():
+                    yield DROPPED_FRAME
+                    return
+                try:
+                    frame = await asyncio.wait_for(
+                        sub.queue.get(), timeout=settings.audit_stream_heartbeat_seconds
+                    )
+                except asyncio.TimeoutError:
+                    if await is_disconnected():
+                        return
+                    yield KEEPALIVE_FRAME
+                    continue
+                yield frame
+        finally:
+            self.unsubscribe(sub)
+
+
+audit_broadcaster = Broadcaster()
+
+registry.register(
+    CallbackGauge(
+        "swaps_audit_stream_subscribers",
+        "Open live audit streams in this worker.",
+        lambda: {(): float(len(audit_broadcaster))},
+    )
+)
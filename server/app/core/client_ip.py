@@ -0,0 +1,58 @@
+"""Client address of a request, believing X-Forwarded-For only from trusted proxies.
+
+client_ip() is the one place a request's client address is resolved; the per-IP and
+per-key limits, failure counts, heavy hitters and IP cardinality all use it.
+"""
+
+import ipaddress
+from functools import lru_cache
+
+from starlette.requests import Request
+
+from app.core.config import settings
+
+_CLIENT_IP_SCOPE_KEY = "swaps.client_ip"
+
+
+@lru_cache(maxsize=4)
+def _trusted_networks(
+    proxies: tuple[str, ...],
+) -> tuple[ipaddress.IPv4Network | ipaddress.IPv6Network, ...]:
+    return tuple(ipaddress.ip_network(p, strict=False) for p in proxies)
+
+
+def _is_trusted(host: str, networks) -> bool:
+    try:
+        address = ipaddress.ip_address(host)
+    except ValueError:
+        return False
+    return any(address in network for network in networks)
+
+
+def from_trusted_proxy(request: Request) -> bool:
+    """The direct peer is one of trusted_proxies (so its forwarded headers are believed)."""
+    return request.client is not None and _is_trusted(
+        request.client.host, _trusted_networks(tuple(settings.trusted_proxies))
+    )
+
+
+def client_ip(request: Request) -> str | None:
+    """Client address: the peer, or, when the peer is a trusted proxy (e.g. Nginx), the
+    nearest X-Forwarded-For hop that is not one. Cached in the ASGI scope, so it is
+    resolved once per request however many layers ask.
+    """
+    scope = request.scope
+    if _CLIENT_IP_SCOPE_KEY in scope:
+        return scope[_CLIENT_IP_SCOPE_KEY]
+    ip = request.client.host if request.client else None
+    networks = _trusted_networks(tuple(settings.trusted_proxies))
+    if ip is not None and _is_trusted(ip, networks):
+        forwarded = request.headers.get("x-forwarded-for")
+        if forwarded:
+            # Walk right to left: entries left of the first untrusted hop are client-supplied
+            for hop in reversed(forwarded.split(",")):
+                ip = hop.strip()
+                if not _is_trusted(ip, networks):
+                    break
+    scope[_CLIENT_IP_SCOPE_KEY] = ip
+    return ip
@@ -0,0 +1,131 @@
+"""Bounded executor for CPU-heavy crypto (bcrypt) so it never runs on the event loop.
+
+bcrypt releases the GIL while hashing, so a small thread pool keeps validations flowing
+during a burst of logins. Admission is capped (pool workers + queue slots); a caller that
+cannot get a slot within the queue timeout gets CryptoPoolBusyError instead of waiting.
+A slot is freed when its operation finishes on the pool, not when the caller stops
+waiting: a cancelled caller's hash still runs (or stays queued) and still counts.
+"""
+
+import asyncio
+import time
+import weakref
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from typing import TypeVar
+
+from app.core.config import settings
+from app.core.metrics import CallbackGauge, Counter, Histogram, registry
+from app.core.security import hash_password, verify_password
+
+T = TypeVar("T")
+
+
+class CryptoPoolBusyError(Exception):
+    """No crypto slot became free within crypto_queue_timeout_seconds."""
+
+
+class CryptoPool:
+    """Thread pool plus an admission semaphore (one per event loop)."""
+
+    def __init__(self) -> None:
+        self._executor: ThreadPoolExecutor | None = None
+        self._semaphores: weakref.WeakKeyDictionary[
+            asyncio.AbstractEventLoop, asyncio.Semaphore
+        ] = weakref.WeakKeyDictionary()
+        self.in_flight = 0
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=settings.crypto_pool_workers, thread_name_prefix="crypto"
+            )
+        return self._executor
+
+    def _get_semaphore(self, loop: asyncio.AbstractEventLoop) -> asyncio.Semaphore:
+        sem = self._semaphores.get(loop)
+        if sem is None:
+            limit = settings.crypto_pool_workers + settings.crypto_queue_size
+            sem = self._semaphores[loop] = asyncio.Semaphore(limit)
+        return sem
+
+    async def run(self, operation: str, fn: Callable[..., T], *args) -> T:
+        loop = asyncio.get_running_loop()
+        sem = self._get_semaphore(loop)
+        queued_at = time.perf_counter()
+        try:
+            await asyncio.wait_for(sem.acquire(), settings.crypto_queue_timeout_seconds)
+        except TimeoutError:
+            CRYPTO_REJECTED.inc(operation)
+            raise CryptoPoolBusyError("Too many concurrent crypto operations") from None
+        self.in_flight += 1
+        started = time.perf_counter()
+        CRYPTO_QUEUE_WAIT.observe(started - queued_at, operation)
+        try:
+            future = self._get_executor().submit(fn, *args)
+        except BaseException:
+            self._release(sem)
+            raise
+
+        def done(_future) -> None:  # on a pool thread, or here if cancelled while queued
+            try:
+                loop.call_soon_threadsafe(self._release, sem)
+            except RuntimeError:  # the loop is closed; its semaphore is gone with it
+                pass
+
+        future.add_done_callback(done)
+        result = await asyncio.wrap_future(future, loop=loop)
+        CRYPTO_DURATION.observe(time.perf_counter() - started, operation)
+        return result
+
+    def _release(self, sem: asyncio.Semaphore) -> None:
+        self.in_flight -= 1
+        sem.release()
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+        self._semaphores.clear()
+
+
+crypto_pool = CryptoPool()
+
+CRYPTO_QUEUE_WAIT = registry.register(
+    Histogram(
+        "swaps_crypto_queue_wait_seconds",
+        "Time a crypto operation waited for a pool slot.",
+        ("operation",),
+    )
+)
+CRYPTO_DURATION = registry.register(
+    Histogram(
+        "swaps_crypto_duration_seconds",
+        "Time a crypto operation ran on the pool.",
+        ("operation",),
+    )
+)
+CRYPTO_REJECTED = registry.register(
+    Counter(
+        "swaps_crypto_rejected_total",
+        "Crypto operations rejected because no slot freed up within the queue timeout.",
+        ("operation",),
+    )
+)
+registry.register(
+    CallbackGauge(
+        "swaps_crypto_in_flight",
+        "Crypto operations admitted (running or waiting for a pool thread).",
+        lambda: {(): float(crypto_pool.in_flight)},
+    )
+)
+
+
+async def verify_password_async(plain: str, hashed: str) -> bool:
+    """verify_password on the crypto pool. Raises CryptoPoolBusyError when saturated."""
+    return await crypto_pool.run("verify_password", verify_password, plain, hashed)
+
+
+async def hash_password_async(password: str) -> str:
+    """hash_password on the crypto pool. Raises CryptoPoolBusyError when saturated."""
+    return await crypto_pool.run("hash_password", hash_password, password)
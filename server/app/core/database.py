@@ -1,17 +1,47 @@
 """Async database connection and session management."""
 
+import ipaddress
 from collections.abc import AsyncGenerator
 
-from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
-from sqlalchemy.orm import DeclarativeBase
+from sqlalchemy import Engine, event
+from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
+    AsyncSession,
+    async_sessionmaker,
+    create_async_engine,
+)
+from sqlalchemy.orm import DeclarativeBase, ORMExecuteState, Session
 
 from app.core.config import settings
+from app.core.query_stats import install_query_hooks
+
+
+def _inet_within(address: str | None, network: str) -> bool | None:
+    if address is None:
+        return None
+    try:
+        return ipaddress.ip_address(address) in ipaddress.ip_network(network, strict=False)
+    except ValueError:
+        return False
+
+
+def install_sqlite_functions(engine: Engine) -> None:
+    """On SQLite (tests, perf gate), register SQL functions PostgreSQL has natively."""
+    if engine.dialect.name != "sqlite":
+        return
+
+    @event.listens_for(engine, "connect")
+    def _register(dbapi_connection, connection_record) -> None:
+        dbapi_connection.create_function("inet_within", 2, _inet_within, deterministic=True)
+
 
 engine = create_async_engine(
     settings.database_url,
-    echo=settings.database_url.startswith("postgresql+asyncpg"),  # echo in dev if desired
+    echo=settings.database_echo,
     future=True,
 )
+install_query_hooks(engine.sync_engine)
+install_sqlite_functions(engine.sync_engine)
 
 async_session_maker = async_sessionmaker(
     engine,
@@ -22,6 +52,51 @@ async_session_maker = async_sessionmaker(
 )
 
 
+def make_readonly_session_maker(bind: AsyncEngine) -> async_sessionmaker[AsyncSession]:
+    """Sessions for read-only routes: one transaction per session, never committed.
+
+    On PostgreSQL the transaction is BEGIN ISOLATION LEVEL REPEATABLE READ READ ONLY: the
+    server rejects writes, and every query of a page reads the same snapshot (dashboard
+    counts agree with its list). On other databases (SQLite in tests and the perf gate)
+    writes are only blocked by the ORM guard below. Server-side cursors (streamed pages)
+    need the open transaction too.
+    """
+    if bind.dialect.name == "postgresql":
+        bind = bind.execution_options(
+            isolation_level="REPEATABLE READ", postgresql_readonly=True
+        )
+    return async_sessionmaker(
+        bind,
+        class_=AsyncSession,
+        expire_on_commit=False,
+        autoflush=False,
+        info={"readonly": True},
+    )
+
+
+readonly_session_maker = make_readonly_session_maker(engine)
+# Streamed pages open their own session from this maker (see get_streaming_session_maker)
+streaming_session_maker = readonly_session_maker
+
+
+class ReadOnlySessionError(RuntimeError):
+    """A write was attempted through a session from get_readonly_db."""
+
+
+@event.listens_for(Session, "before_flush")
+def _reject_readonly_flush(session: Session, flush_context, instances) -> None:
+    if session.info.get("readonly") and (session.new or session.dirty or session.deleted):
+        raise ReadOnlySessionError("Cannot flush changes in a read-only session")
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _reject_readonly_dml(state: ORMExecuteState) -> None:
+    if state.session.info.get("readonly") and (
+        state.is_insert or state.is_update or state.is_delete
+    ):
+        raise ReadOnlySessionError("Cannot execute DML in a read-only session")
+
+
 class Base(DeclarativeBase):
     """Base class for all ORM models."""
 
@@ -29,13 +104,34 @@ class Base(DeclarativeBase):
 
 
 async def get_db() -> AsyncGenerator[AsyncSession, None]:
-    """Dependency that yields an async DB session."""
+    """Dependency that yields an async DB session.
+
+    The session checks out a connection on its first statement, so a request that returns
+    before touching the DB (e.g. a rate-limited validate) costs no pool checkout, and the
+    COMMIT is only sent when a transaction was actually started.
+    """
     async with async_session_maker() as session:
         try:
             yield session
-            await session.commit()
+            if session.in_transaction():
+                await session.commit()
         except Exception:
             await session.rollback()
             raise
         finally:
             await session.close()
+
+
+async def get_readonly_db() -> AsyncGenerator[AsyncSession, None]:
+    """Dependency for read-only routes: a read-only transaction, rolled back on close."""
+    async with readonly_session_maker() as session:
+        yield session
+
+
+def get_streaming_session_maker() -> async_sessionmaker[AsyncSession]:
+    """Dependency for streamed responses, whose body outlives the request's dependencies.
+
+    The response body opens its own read-only session from this maker and closes it when
+    the last byte is sent (or the client disconnects).
+    """
+    return streaming_session_maker
@@ -0,0 +1,153 @@
+"""Approximate top-K license keys and client IPs over a rolling window (Space-Saving).
+
+Each dimension keeps one Space-Saving summary of at most `capacity` counters per time
+bucket; the window is the last `buckets` buckets. An item's reported count never
+under-estimates its true count and over-estimates it by at most `error` (the count of the
+counter it evicted), so anything occurring more than window_total / capacity times is
+guaranteed to be listed. Memory is capacity * buckets entries per dimension, whatever the
+traffic. Counts are per worker process.
+"""
+
+import time
+from collections.abc import Hashable
+from dataclasses import dataclass
+
+from app.core.config import settings
+
+
+@dataclass(slots=True)
+class HeavyHitter:
+    item: Hashable
+    count: int
+    error: int  # count may exceed the true count by at most this much
+
+
+class SpaceSaving:
+    """Space-Saving summary (Metwally et al.) with a fixed number of counters.
+
+    Counters are grouped by count (the paper's stream-summary), and the smallest count is
+    tracked, so evicting the minimum counter is O(1) per add, not a scan of all counters.
+    """
+
+    __slots__ = ("capacity", "total", "_counts", "_errors", "_by_count", "_min")
+
+    def __init__(self, capacity: int) -> None:
+        self.capacity = capacity
+        self.total = 0
+        self._counts: dict[Hashable, int] = {}
+        self._errors: dict[Hashable, int] = {}
+        # count -> items with that count (dict as an insertion-ordered set)
+        self._by_count: dict[int, dict[Hashable, None]] = {}
+        self._min = 0
+
+    def floor(self) -> int:
+        """Upper bound on the count of any item not in the summary (0 until it is full)."""
+        return self._min if len(self._counts) >= self.capacity else 0
+
+    def _place(self, item: Hashable, count: int) -> None:
+        self._counts[item] = count
+        self._by_count.setdefault(count, {})[item] = None
+
+    def _unplace(self, item: Hashable, count: int) -> None:
+        group = self._by_count[count]
+        del group[item]
+        if not group:
+            del self._by_count[count]
+
+    def _raise_min(self, upper: int) -> None:
+        # The old minimum emptied; some item now has count `upper`, so stop there
+        while self._min not in self._by_count and self._min < upper:
+            self._min += 1
+
+    def add(self, item: Hashable, n: int = 1) -> None:
+        self.total += n
+        count = self._counts.get(item)
+        if count is not None:
+            self._unplace(item, count)
+            self._place(item, count + n)
+            if count == self._min:
+                self._raise_min(count + n)
+        elif len(self._counts) < self.capacity:
+            self._place(item, n)
+            self._errors[item] = 0
+            self._min = n if len(self._counts) == 1 else min(self._min, n)
+        else:
+            floor = self._min
+            victim = next(iter(self._by_count[floor]))
+            self._unplace(victim, floor)
+            del self._counts[victim]
+            del self._errors[victim]
+            self._place(item, floor + n)
+            self._errors[item] = floor
+            self._raise_min(floor + n)
+
+    def items(self) -> list[HeavyHitter]:
+        return [HeavyHitter(i, c, self._errors[i]) for i, c in self._counts.items()]
+
+
+class RollingTopK:
+    """Space-Saving summaries over `buckets` consecutive time buckets of `bucket_seconds`."""
+
+    def __init__(self, capacity: int, bucket_seconds: float, buckets: int) -> None:
+        self.capacity = capacity
+        self.bucket_seconds = bucket_seconds
+        self.buckets = buckets
+        self._sketches: dict[int, SpaceSaving] = {}
+
+    def _bucket(self, now: float) -> int:
+        return int(now // self.bucket_seconds)
+
+    def add(self, item: Hashable, now: float | None = None) -> None:
+        bucket = self._bucket(time.time() if now is None else now)
+        sketch = self._sketches.get(bucket)
+        if sketch is None:
+            sketch = self._sketches[bucket] = SpaceSaving(self.capacity)
+            oldest = bucket - self.buckets
+            for b in [b for b in self._sketches if b <= oldest]:
+                del self._sketches[b]
+        sketch.add(item)
+
+    def top(self, k: int, now: float | None = None) -> tuple[list[HeavyHitter], int]:
+        """(top k by estimated count over the window, total events in the window).
+
+        Summaries are merged the standard Space-Saving way: a bucket that does not list an
+        item adds its floor (minimum counter, if full) to both count and error, so the
+        merged count still never under-estimates the true window count.
+        """
+        first = self._bucket(time.time() if now is None else now) - self.buckets + 1
+        window = [s for b, s in self._sketches.items() if b >= first]
+        total = sum(s.total for s in window)
+        floors = sum(s.floor() for s in window)
+        merged: dict[Hashable, HeavyHitter] = {}
+        for sketch in window:
+            floor = sketch.floor()
+            for hh in sketch.items():
+                acc = merged.get(hh.item)
+                if acc is None:
+                    acc = merged[hh.item] = HeavyHitter(hh.item, floors, floors)
+                acc.count += hh.count - floor
+                acc.error += hh.error - floor
+        ranked = sorted(merged.values(), key=lambda h: h.count, reverse=True)
+        return ranked[:k], total
+
+
+class ValidationHeavyHitters:
+    """Top license keys (by SHA256 digest, never plaintext) and client IPs of /validate."""
+
+    def __init__(self) -> None:
+        bucket_seconds = settings.heavy_hitters_window_seconds / settings.heavy_hitters_buckets
+        self.keys = RollingTopK(
+            settings.heavy_hitters_capacity, bucket_seconds, settings.heavy_hitters_buckets
+        )
+        self.ips = RollingTopK(
+            settings.heavy_hitters_capacity, bucket_seconds, settings.heavy_hitters_buckets
+        )
+
+    def record(self, key_digest: bytes, ip_address: str | None) -> None:
+        now = time.time()
+        self.keys.add(key_digest, now)
+        if ip_address:
+            self.ips.add(ip_address, now)
+
+
+heavy_hitters = ValidationHeavyHitters()
@@ -0,0 +1,56 @@
+"""HyperLogLog distinct-count sketch with a compact, mergeable byte serialization.
+
+With p = 8 the sketch is 256 one-byte registers (256 bytes) and the standard error is
+about 1.04 / sqrt(256) = 6.5%. Two sketches merge by taking the register-wise maximum, so
+per-worker sketches can be combined with the stored one in any order.
+"""
+
+import hashlib
+import math
+
+DEFAULT_PRECISION = 8
+
+
+class HyperLogLog:
+    """Distinct-count estimator over strings (e.g. client IPs)."""
+
+    __slots__ = ("p", "m", "registers")
+
+    def __init__(self, p: int = DEFAULT_PRECISION, registers: bytes | None = None) -> None:
+        self.p = p
+        self.m = 1 << p
+        if registers is not None and len(registers) != self.m:
+            raise ValueError(f"Expected {self.m} registers, got {len(registers)}")
+        self.registers = bytearray(registers) if registers is not None else bytearray(self.m)
+
+    def add(self, value: str) -> None:
+        x = int.from_bytes(hashlib.blake2b(value.encode(), digest_size=8).digest(), "big")
+        index = x >> (64 - self.p)
+        rest = x & ((1 << (64 - self.p)) - 1)
+        rank = (64 - self.p) - rest.bit_length() + 1  # leading zeros + 1
+        if rank > self.registers[index]:
+            self.registers[index] = rank
+
+    def merge(self, other: "HyperLogLog") -> None:
+        if other.p != self.p:
+            raise ValueError("Cannot merge sketches with different precision")
+        regs = self.registers
+        for i, r in enumerate(other.registers):
+            if r > regs[i]:
+                regs[i] = r
+
+    def estimate(self) -> int:
+        m = self.m
+        alpha = 0.7213 / (1 + 1.079 / m) if m >= 128 else {16: 0.673, 32: 0.697, 64: 0.709}[m]
+        raw = alpha * m * m / sum(2.0 ** -r for r in self.registers)
+        zeros = self.registers.count(0)
+        if raw <= 2.5 * m and zeros:
+            return round(m * math.log(m / zeros))  # linear counting for small cardinalities
+        return round(raw)
+
+    def to_bytes(self) -> bytes:
+        return bytes(self.registers)
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "HyperLogLog":
+        return cls(p=int(math.log2(len(data))), registers=data)
@@ -0,0 +1,107 @@
+"""Event-loop lag monitor and (debug) blocking-call detector.
+
+A background task sleeps for a fixed interval and records how late it wakes up: that
+lateness is time the loop spent running something else without yielding. In debug mode a
+watchdog thread also notices when the loop has not ticked for longer than the threshold
+and logs the stack of whatever is running on the loop thread at that moment.
+"""
+
+import asyncio
+import logging
+import sys
+import threading
+import time
+import traceback
+
+from app.core.config import settings
+from app.core.metrics import Counter, Histogram, registry
+
+logger = logging.getLogger(__name__)
+
+LOOP_LAG = registry.register(
+    Histogram(
+        "swaps_event_loop_lag_seconds",
+        "Delay between when the loop monitor should have woken up and when it did.",
+    )
+)
+LOOP_BLOCKED = registry.register(
+    Counter(
+        "swaps_event_loop_blocked_total",
+        "Stalls longer than LOOP_BLOCK_THRESHOLD_MS caught by the debug watchdog.",
+    )
+)
+
+
+class LoopMonitor:
+    """Measures event-loop lag continuously; in debug mode, captures blocking stacks."""
+
+    def __init__(self) -> None:
+        self._task: asyncio.Task | None = None
+        self._watchdog: threading.Thread | None = None
+        self._stop = threading.Event()
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._loop_thread_id: int | None = None
+        self._last_tick = time.monotonic()
+        self.last_lag = 0.0
+
+    def start(self) -> None:
+        if self._task is not None:
+            return
+        self._loop = asyncio.get_running_loop()
+        self._loop_thread_id = threading.get_ident()
+        self._last_tick = time.monotonic()
+        self._stop.clear()
+        self._task = asyncio.create_task(self._run())
+        if settings.debug:
+            self._watchdog = threading.Thread(
+                target=self._watch, name="loop-watchdog", daemon=True
+            )
+            self._watchdog.start()
+
+    async def stop(self) -> None:
+        self._stop.set()
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        if self._watchdog is not None:
+            self._watchdog.join(timeout=1.0)
+            self._watchdog = None
+
+    async def _run(self) -> None:
+        interval = settings.loop_monitor_interval_seconds
+        while True:
+            start = time.perf_counter()
+            await asyncio.sleep(interval)
+            self.last_lag = max(time.perf_counter() - start - interval, 0.0)
+            LOOP_LAG.observe(self.last_lag)
+            self._last_tick = time.monotonic()
+
+    def _watch(self) -> None:
+        """Watchdog thread: log the loop thread's stack once per stall."""
+        threshold = settings.loop_block_threshold_ms / 1000
+        allowed = settings.loop_monitor_interval_seconds + threshold
+        reported_tick = None
+        while not self._stop.wait(threshold / 2):
+            tick = self._last_tick
+            stalled_for = time.monotonic() - tick
+            if stalled_for <= allowed or reported_tick == tick:
+                continue
+            reported_tick = tick
+            frame = sys._current_frames().get(self._loop_thread_id)
+            if frame is None:
+                continue
+            try:
+                # Metrics are only updated on the loop thread (they take no locks); this
+                # runs as soon as the loop is unblocked
+                self._loop.call_soon_threadsafe(LOOP_BLOCKED.inc)
+            except RuntimeError:  # loop already closed
+                pass
+            stack = "".join(traceback.format_stack(frame))
+            logger.warning(
+                "Event loop blocked for at least %.0f ms; loop thread stack:\n%s",
+                (stalled_for - settings.loop_monitor_interval_seconds) * 1000,
+                stack,
+            )
+
+
+loop_monitor = LoopMonitor()
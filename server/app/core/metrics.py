@@ -0,0 +1,227 @@
+"""In-process metrics with Prometheus text exposition (GET /metrics).
+
+Collectors are plain dicts of per-label-set values updated from the event loop thread, so
+the hot path takes no locks: an update is a dict lookup, a bisect and a couple of adds.
+"""
+
+import time
+from bisect import bisect_left
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+
+from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.requests import Request
+
+from app.core.tracing import span
+
+# Seconds; tuned for a sub-millisecond to multi-second API
+DEFAULT_BUCKETS = (
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+)
+
+
+def _format_labels(names: tuple[str, ...], values: tuple[str, ...], extra: str = "") -> str:
+    parts = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+class Counter:
+    """Monotonic counter, optionally labelled."""
+
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple[str, ...] = ()) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self._values: dict[tuple[str, ...], float] = {}
+
+    def inc(self, *labels: str, amount: float = 1.0) -> None:
+        self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def value(self, *labels: str) -> float:
+        return self._values.get(labels, 0.0)
+
+    def samples(self) -> Iterator[str]:
+        for labels, value in self._values.items():
+            yield f"{self.name}{_format_labels(self.labelnames, labels)} {value}"
+
+
+class Histogram:
+    """Cumulative-bucket histogram, optionally labelled."""
+
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = DEFAULT_BUCKETS,
+    ) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self.buckets = buckets
+        # labels -> [count per bucket (+Inf last)..., sum]
+        self._series: dict[tuple[str, ...], list[float]] = {}
+
+    def observe(self, value: float, *labels: str) -> None:
+        series = self._series.get(labels)
+        if series is None:
+            series = self._series[labels] = [0] * (len(self.buckets) + 1) + [0.0]
+        series[bisect_left(self.buckets, value)] += 1
+        series[-1] += value
+
+    def count(self, *labels: str) -> int:
+        series = self._series.get(labels)
+        return int(sum(series[:-1])) if series else 0
+
+    def samples(self) -> Iterator[str]:
+        for labels, series in self._series.items():
+            cumulative = 0
+            for bound, n in zip((*self.buckets, float("inf")), series[:-1]):
+                cumulative += n
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                label_str = _format_labels(self.labelnames, labels, f'le="{le}"')
+                yield f"{self.name}_bucket{label_str} {cumulative}"
+            label_str = _format_labels(self.labelnames, labels)
+            yield f"{self.name}_sum{label_str} {series[-1]}"
+            yield f"{self.name}_count{label_str} {cumulative}"
+
+
+class CallbackGauge:
+    """Gauge read at scrape time from a callback returning {label_values: value}."""
+
+    kind = "gauge"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        callback: Callable[[], dict[tuple[str, ...], float]],
+        labelnames: tuple[str, ...] = (),
+    ) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self.callback = callback
+
+    def samples(self) -> Iterator[str]:
+        for labels, value in self.callback().items():
+            yield f"{self.name}{_format_labels(self.labelnames, labels)} {value}"
+
+
+class Registry:
+    """Holds collectors and renders the Prometheus text format."""
+
+    def __init__(self) -> None:
+        self._collectors: list = []
+
+    def register(self, collector):
+        self._collectors.append(collector)
+        return collector
+
+    def render(self) -> str:
+        lines: list[str] = []
+        for c in self._collectors:
+            lines.append(f"# HELP {c.name} {c.documentation}")
+            lines.append(f"# TYPE {c.name} {c.kind}")
+            lines.extend(c.samples())
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+HTTP_REQUEST_DURATION = registry.register(
+    Histogram(
+        "swaps_http_request_duration_seconds",
+        "HTTP request latency by route template, method and status code.",
+        ("route", "method", "status"),
+    )
+)
+VALIDATION_STAGE_DURATION = registry.register(
+    Histogram(
+        "swaps_validation_stage_duration_seconds",
+        "Time spent in each stage of license validation.",
+        ("stage",),
+    )
+)
+VALIDATION_OUTCOMES = registry.register(
+    Counter(
+        "swaps_validation_outcomes_total",
+        "License validation responses by returned status.",
+        ("status",),
+    )
+)
+RATE_LIMIT_REJECTIONS = registry.register(
+    Counter(
+        "swaps_rate_limit_rejections_total",
+        "Requests rejected by a rate limit (ip = global middleware, license_key = validate).",
+        ("limit",),
+    )
+)
+
+
+def _db_pool_stats() -> dict[tuple[str, ...], float]:
+    from app.core.database import engine
+
+    pool = engine.sync_engine.pool
+    stats = {}
+    for state in ("size", "checkedout", "checkedin", "overflow"):
+        fn = getattr(pool, state, None)
+        if callable(fn):
+            stats[(state,)] = float(fn())
+    return stats
+
+
+registry.register(
+    CallbackGauge(
+        "swaps_db_pool_connections",
+        "SQLAlchemy connection pool state (size, checkedout, checkedin, overflow).",
+        _db_pool_stats,
+        ("state",),
+    )
+)
+
+
+@contextmanager
+def validation_stage(stage: str) -> Iterator[None]:
+    """Time a stage of validate_license into VALIDATION_STAGE_DURATION and a trace span."""
+    start = time.perf_counter()
+    try:
+        with span(stage):
+            yield
+    finally:
+        VALIDATION_STAGE_DURATION.observe(time.perf_counter() - start, stage)
+
+
+class MetricsMiddleware(BaseHTTPMiddleware):
+    """Record request latency per route template (not raw path, to bound label cardinality)."""
+
+    async def dispatch(self, request: Request, call_next):
+        start = time.perf_counter()
+        try:
+            response = await call_next(request)
+        except Exception:
+            # Unhandled errors become a 500 further out (ServerErrorMiddleware); count them
+            self._observe(request, start, 500)
+            raise
+        self._observe(request, start, response.status_code)
+        return response
+
+    @staticmethod
+    def _observe(request: Request, start: float, status_code: int) -> None:
+        route = request.scope.get("route")
+        HTTP_REQUEST_DURATION.observe(
+            time.perf_counter() - start,
+            route.path if route is not None else "unmatched",
+            request.method,
+            str(status_code),
+        )
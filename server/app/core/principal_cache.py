@@ -0,0 +1,76 @@
+"""Short-TTL cache of authenticated admin principals, keyed by JWT subject (email).
+
+Every admin API call and dashboard page used to load the admin row after decoding the
+token. The cache keeps the few fields authorization needs (id, email, role, active flag)
+for admin_principal_cache_ttl_seconds. Committing a change to an admin's active flag,
+role or email through an ORM session (or deleting the admin) evicts the entry in this
+process (see app.models.admin); other workers pick the change up when their entry expires.
+
+Every invalidation bumps a generation counter. A principal loaded from the database is
+only cached if no invalidation happened since the load began, so a request that read the
+old row just before a commit cannot put it back afterwards.
+"""
+
+import time
+from dataclasses import dataclass
+from typing import TYPE_CHECKING
+from uuid import UUID
+
+from app.core.config import settings
+
+if TYPE_CHECKING:
+    from app.models.admin import Admin
+
+
+@dataclass(frozen=True, slots=True)
+class AdminPrincipal:
+    """What the auth dependencies return: an immutable snapshot of the admin row."""
+
+    id: UUID
+    email: str
+    role: str
+    is_active: bool
+
+    @classmethod
+    def from_admin(cls, admin: "Admin") -> "AdminPrincipal":
+        return cls(id=admin.id, email=admin.email, role=admin.role, is_active=admin.is_active)
+
+
+# email -> (principal, expires_at monotonic)
+_cache: dict[str, tuple[AdminPrincipal, float]] = {}
+_generation = 0
+
+
+def get(email: str) -> AdminPrincipal | None:
+    entry = _cache.get(email)
+    if entry is None:
+        return None
+    principal, expires_at = entry
+    if time.monotonic() >= expires_at:
+        _cache.pop(email, None)
+        return None
+    return principal
+
+
+def generation() -> int:
+    """Take before loading an admin row; pass to put() with the loaded principal."""
+    return _generation
+
+
+def put(principal: AdminPrincipal, loaded_at_generation: int | None = None) -> None:
+    """Cache a principal, unless an invalidation happened since loaded_at_generation."""
+    if loaded_at_generation is not None and loaded_at_generation != _generation:
+        return
+    ttl = settings.admin_principal_cache_ttl_seconds
+    if ttl > 0:
+        _cache[principal.email] = (principal, time.monotonic() + ttl)
+
+
+def invalidate(email: str | None = None) -> None:
+    """Drop one subject, or everything when email is None."""
+    global _generation
+    _generation += 1
+    if email is None:
+        _cache.clear()
+    else:
+        _cache.pop(email, None)
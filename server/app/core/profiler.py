@@ -0,0 +1,81 @@
+"""Statistical sampling profiler for the live worker (admin diagnostics).
+
+A background thread samples the event loop thread's stack with sys._current_frames() at a
+fixed interval and aggregates collapsed stacks ("root;...;leaf count"), the input format
+of flamegraph.pl, speedscope and similar tools. The loop itself is never paused.
+"""
+
+import sys
+import threading
+import time
+from collections import Counter
+from types import CodeType, FrameType
+
+from app.core.config import settings
+
+
+class ProfilerBusyError(Exception):
+    """Raised when the maximum number of concurrent profiles is already running."""
+
+
+_active = 0
+_active_lock = threading.Lock()
+
+
+def _frame_label(frame: FrameType) -> str:
+    module = frame.f_globals.get("__name__", "?")
+    return f"{module}:{frame.f_code.co_name}"
+
+
+def _collapse(frame: FrameType | None, only_within: CodeType | None) -> str | None:
+    """Collapsed stack root-first; None when `only_within` is set and not on the stack."""
+    labels = []
+    found = only_within is None
+    while frame is not None:
+        if frame.f_code is only_within:
+            found = True
+        labels.append(_frame_label(frame))
+        frame = frame.f_back
+    if not found:
+        return None
+    labels.reverse()
+    return ";".join(labels)
+
+
+def sample_thread(
+    thread_id: int,
+    seconds: float,
+    interval: float,
+    only_within: CodeType | None = None,
+) -> tuple[Counter[str], int]:
+    """Sample `thread_id` for `seconds`. Returns (collapsed stack counts, total samples taken).
+
+    Blocking: run it in a worker thread (e.g. asyncio.to_thread), never on the sampled thread.
+    With `only_within`, only samples whose stack contains that code object are kept.
+    """
+    global _active
+    with _active_lock:
+        if _active >= settings.profiler_max_concurrent:
+            raise ProfilerBusyError("A profile is already running; try again later")
+        _active += 1
+    try:
+        stacks: Counter[str] = Counter()
+        taken = 0
+        deadline = time.monotonic() + seconds
+        while time.monotonic() < deadline:
+            frame = sys._current_frames().get(thread_id)
+            taken += 1
+            stack = _collapse(frame, only_within)
+            if stack:
+                stacks[stack] += 1
+            del frame
+            time.sleep(interval)
+        return stacks, taken
+    finally:
+        with _active_lock:
+            _active -= 1
+
+
+def render_collapsed(stacks: Counter[str]) -> str:
+    """Flamegraph collapsed-stack text, one 'stack count' per line, heaviest first."""
+    return "".join(f"{stack} {count}\n" for stack, count in stacks.most_common())
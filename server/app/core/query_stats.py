@@ -0,0 +1,79 @@
+"""Per-request SQL statement counting and timing, hooked into the engine's cursor events."""
+
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.requests import Request
+
+SQL_STATS_HEADER = "X-SQL-Stats"
+
+
+@dataclass
+class QueryStats:
+    """Statements executed while this object was the current capture."""
+
+    count: int = 0
+    total_ms: float = 0.0
+    statements: list[str] = field(default_factory=list)
+
+    def header_value(self) -> str:
+        return f"count={self.count}, time_ms={self.total_ms:.2f}"
+
+
+# None when nothing is capturing: the cursor hooks then cost one ContextVar lookup
+_current: ContextVar[QueryStats | None] = ContextVar("sql_query_stats", default=None)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _current.get() is not None:
+        conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = _current.get()
+    if stats is None:
+        return
+    starts = conn.info.get("query_start")
+    if starts:
+        stats.total_ms += (time.perf_counter() - starts.pop()) * 1000
+    stats.count += 1
+    stats.statements.append(statement)
+
+
+def install_query_hooks(engine: Engine) -> None:
+    """Attach statement counting to a (sync) engine; use engine.sync_engine for async engines."""
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+
+@contextmanager
+def capture_statements() -> Iterator[QueryStats]:
+    """Count statements run in this context (and tasks started from it).
+
+    Test helper, e.g.:
+        with capture_statements() as stats:
+            await client.post("/licenses/validate", json=body)
+        assert stats.count <= 2, stats.statements
+    """
+    stats = QueryStats()
+    token = _current.set(stats)
+    try:
+        yield stats
+    finally:
+        _current.reset(token)
+
+
+class QueryStatsMiddleware(BaseHTTPMiddleware):
+    """Debug only: add X-SQL-Stats (statement count and DB time) to every response."""
+
+    async def dispatch(self, request: Request, call_next):
+        with capture_statements() as stats:
+            response = await call_next(request)
+        response.headers[SQL_STATS_HEADER] = stats.header_value()
+        return response
@@ -7,28 +7,20 @@ from starlette.middleware.base import BaseHTTPMiddleware
 from starlette.requests import Request
 from starlette.responses import JSONResponse
 
+from app.core.client_ip import client_ip
 from app.core.config import settings
+from app.core.metrics import RATE_LIMIT_REJECTIONS
 
 # In-memory: IP -> deque of request timestamps (last 60 seconds)
 _rate: dict[str, deque[float]] = {}
 _WINDOW_SECONDS = 60
 
 
-def _get_client_ip(request: Request) -> str:
-    """Prefer X-Forwarded-For when behind proxy (e.g. Nginx), else client.host."""
-    forwarded = request.headers.get("x-forwarded-for")
-    if forwarded:
-        return forwarded.split(",")[0].strip()
-    if request.client:
-        return request.client.host
-    return "unknown"
-
-
 class RateLimitMiddleware(BaseHTTPMiddleware):
     """Reject requests when IP exceeds rate_limit_per_minute_per_ip in a 60s window."""
 
     async def dispatch(self, request: Request, call_next):
-        ip = _get_client_ip(request)
+        ip = client_ip(request) or "unknown"
         now = time()
         if ip not in _rate:
             _rate[ip] = deque(maxlen=settings.rate_limit_per_minute_per_ip + 1)
@@ -37,6 +29,7 @@ class RateLimitMiddleware(BaseHTTPMiddleware):
         while q and q[0] < now - _WINDOW_SECONDS:
             q.popleft()
         if len(q) >= settings.rate_limit_per_minute_per_ip:
+            RATE_LIMIT_REJECTIONS.inc("ip")
             return JSONResponse(
                 status_code=429,
                 content={"detail": "Too many requests. Try again later."},
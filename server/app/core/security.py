@@ -23,11 +23,24 @@ def _prepare_password(password: str) -> bytes:
     return hashlib.sha256(raw).digest()  # 32 bytes
 
 
+def license_key_digest(license_key: str) -> bytes:
+    """SHA256 digest (32 bytes) of the license key, as stored in licenses.license_key_hash."""
+    return hashlib.sha256(license_key.encode("utf-8")).digest()
+
+
 def hash_license_key(license_key: str) -> str:
-    """SHA256 hash of the license key for storage. Never store plaintext."""
+    """SHA256 hash of the license key as 64 hex chars (logs, tooling, pre-002 schema).
+
+    Same value as license_key_digest(key).hex(); never store plaintext.
+    """
     return hashlib.sha256(license_key.encode("utf-8")).hexdigest()
 
 
+def license_key_digest_from_hex(key_hash: str) -> bytes:
+    """Convert a stored hex hash (pre-002 schema, exports) to the binary column value."""
+    return bytes.fromhex(key_hash)
+
+
 def compute_validation_signature(license_key: str, app_id: str, timestamp: int) -> str:
     """HMAC-SHA256(license_key + app_id + timestamp, shared_secret) for validation requests."""
     payload = f"{license_key}|{app_id}|{timestamp}"
@@ -0,0 +1,295 @@
+"""Lightweight request tracing: spans, Server-Timing headers and sampled OTLP JSON export.
+
+The middleware is only installed when Server-Timing is enabled or traces are sampled, and
+a trace is only created for a request that is sampled or may receive Server-Timing;
+otherwise span() returns a shared no-op and costs one ContextVar lookup.
+"""
+
+import asyncio
+import json
+import logging
+import random
+import secrets
+import time
+from collections import deque
+from collections.abc import Callable
+from contextvars import ContextVar
+from pathlib import Path
+
+from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.requests import Request
+
+from app.core.config import settings
+from app.core.client_ip import from_trusted_proxy
+
+logger = logging.getLogger(__name__)
+
+SERVER_TIMING_HEADER = "Server-Timing"
+_SERVICE_NAME = "swaps"
+_SPAN_KIND_SERVER = 2
+_SPAN_KIND_INTERNAL = 1
+
+
+class Span:
+    """One timed operation; durations come from time.perf_counter_ns()."""
+
+    __slots__ = ("name", "span_id", "parent_id", "start_unix_ns", "_start", "duration_ns",
+                 "attributes", "_trace", "_token")
+
+    def __init__(self, trace: "Trace", name: str, parent_id: str | None) -> None:
+        self.name = name
+        self.span_id = secrets.token_hex(8)
+        self.parent_id = parent_id
+        self.start_unix_ns = 0
+        self._start = 0
+        self.duration_ns = 0
+        self.attributes: dict[str, str | int | float | bool] = {}
+        self._trace = trace
+        self._token = None
+
+    def set_attribute(self, key: str, value: str | int | float | bool) -> None:
+        self.attributes[key] = value
+
+    def __enter__(self) -> "Span":
+        self.start_unix_ns = time.time_ns()
+        self._start = time.perf_counter_ns()
+        self._token = _current_span.set(self)
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.duration_ns = time.perf_counter_ns() - self._start
+        _current_span.reset(self._token)
+        self._trace.spans.append(self)
+
+
+class _NoopSpan:
+    """Returned by span() when the request is not traced."""
+
+    __slots__ = ()
+
+    def set_attribute(self, key, value) -> None:
+        pass
+
+    def __enter__(self) -> "_NoopSpan":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        pass
+
+
+_NOOP_SPAN = _NoopSpan()
+
+
+class Trace:
+    """Spans of one request. `sampled` traces are exported; all feed Server-Timing."""
+
+    __slots__ = ("trace_id", "sampled", "spans")
+
+    def __init__(self, trace_id: str, sampled: bool) -> None:
+        self.trace_id = trace_id
+        self.sampled = sampled
+        self.spans: list[Span] = []
+
+    def server_timing(self) -> str:
+        """Server-Timing value, e.g. 'total;dur=4.1, lookup;dur=1.9' (ms, first per name)."""
+        seen: dict[str, float] = {}
+        for s in self.spans:
+            seen.setdefault(s.name, s.duration_ns / 1e6)
+        root = seen.pop("request", None)
+        handler = seen.get("handler")
+        parts = [f"{name};dur={ms:.2f}" for name, ms in seen.items()]
+        if root is not None:
+            parts.insert(0, f"total;dur={root:.2f}")
+            if handler is not None:
+                parts.append(f"middleware;dur={max(root - handler, 0.0):.2f}")
+        return ", ".join(parts)
+
+    def to_otlp(self) -> dict:
+        """One OTLP/JSON span list entry (see opentelemetry-proto trace.proto)."""
+        spans = []
+        for s in self.spans:
+            spans.append(
+                {
+                    "traceId": self.trace_id,
+                    "spanId": s.span_id,
+                    "parentSpanId": s.parent_id or "",
+                    "name": s.name,
+                    "kind": _SPAN_KIND_SERVER if s.name == "request" else _SPAN_KIND_INTERNAL,
+                    "startTimeUnixNano": str(s.start_unix_ns),
+                    "endTimeUnixNano": str(s.start_unix_ns + s.duration_ns),
+                    "attributes": [_otlp_attribute(k, v) for k, v in s.attributes.items()],
+                }
+            )
+        return {"scope": {"name": _SERVICE_NAME}, "spans": spans}
+
+
+def _otlp_attribute(key: str, value) -> dict:
+    if isinstance(value, bool):
+        return {"key": key, "value": {"boolValue": value}}
+    if isinstance(value, int):
+        return {"key": key, "value": {"intValue": str(value)}}
+    if isinstance(value, float):
+        return {"key": key, "value": {"doubleValue": value}}
+    return {"key": key, "value": {"stringValue": str(value)}}
+
+
+_current_trace: ContextVar[Trace | None] = ContextVar("trace", default=None)
+_current_span: ContextVar[Span | None] = ContextVar("span", default=None)
+
+
+def span(name: str) -> Span | _NoopSpan:
+    """Context manager timing `name` as a child of the current span (no-op if untraced)."""
+    trace = _current_trace.get()
+    if trace is None:
+        return _NOOP_SPAN
+    parent = _current_span.get()
+    return Span(trace, name, parent.span_id if parent is not None else None)
+
+
+_HEX = frozenset("0123456789abcdef")
+
+
+def _is_id(value: str, length: int) -> bool:
+    """Lowercase hex of `length` characters, not all zeros (W3C invalid id)."""
+    return len(value) == length and _HEX.issuperset(value) and value != "0" * length
+
+
+def _parse_traceparent(value: str | None) -> tuple[str, str, bool] | None:
+    """W3C traceparent '00-<trace_id>-<parent_id>-<flags>' -> (trace_id, parent_id, sampled).
+
+    None for anything malformed, so the request gets a fresh trace id instead.
+    """
+    if not value:
+        return None
+    parts = value.strip().split("-")
+    if len(parts) != 4:
+        return None
+    version, trace_id, parent_id, flags = parts
+    if (
+        len(version) != 2
+        or not _HEX.issuperset(version)
+        or version == "ff"
+        or not _is_id(trace_id, 32)
+        or not _is_id(parent_id, 16)
+        or len(flags) != 2
+        or not _HEX.issuperset(flags)
+    ):
+        return None
+    return trace_id, parent_id, bool(int(flags, 16) & 1)
+
+
+class TraceExporter:
+    """Batches sampled traces and writes OTLP/JSON to a file (JSON lines) or an HTTP collector."""
+
+    def __init__(self, max_queue: int = 2048, interval_seconds: float = 2.0) -> None:
+        self._queue: deque[Trace] = deque(maxlen=max_queue)
+        self._interval = interval_seconds
+        self._task: asyncio.Task | None = None
+
+    @property
+    def enabled(self) -> bool:
+        return bool(settings.trace_export_path or settings.trace_export_url)
+
+    def submit(self, trace: Trace) -> None:
+        self._queue.append(trace)
+
+    def start(self) -> None:
+        if self.enabled and self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        try:
+            await self.flush()
+        except Exception:  # an unreachable collector must not break shutdown
+            logger.exception("Final trace export failed")
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self._interval)
+            try:
+                await self.flush()
+            except Exception:  # exporting must never take the worker down
+                logger.exception("Trace export failed")
+
+    def _drain(self) -> dict | None:
+        if not self._queue:
+            return None
+        scope_spans = []
+        while self._queue:
+            scope_spans.append(self._queue.popleft().to_otlp())
+        return {
+            "resourceSpans": [
+                {
+                    "resource": {"attributes": [_otlp_attribute("service.name", _SERVICE_NAME)]},
+                    "scopeSpans": scope_spans,
+                }
+            ]
+        }
+
+    async def flush(self) -> None:
+        payload = self._drain()
+        if payload is None:
+            return
+        if settings.trace_export_path:
+            line = json.dumps(payload, separators=(",", ":")) + "\n"
+            await asyncio.to_thread(_append_line, Path(settings.trace_export_path), line)
+        if settings.trace_export_url:
+            import httpx
+
+            async with httpx.AsyncClient(timeout=5.0) as client:
+                await client.post(settings.trace_export_url, json=payload)
+
+
+def _append_line(path: Path, line: str) -> None:
+    with path.open("a", encoding="utf-8") as f:
+        f.write(line)
+
+
+exporter = TraceExporter()
+
+
+class TracingMiddleware(BaseHTTPMiddleware):
+    """Open a root span per request; add Server-Timing and hand sampled traces to the exporter.
+
+    `timing_allowed(request)` (checked after the route matched) decides whether a response
+    may carry Server-Timing; stage timings of public endpoints can leak information, so
+    main.py restricts it to admins. None allows it everywhere.
+    """
+
+    def __init__(self, app, timing_allowed: Callable[[Request], bool] | None = None) -> None:
+        super().__init__(app)
+        self.timing_allowed = timing_allowed
+
+    async def dispatch(self, request: Request, call_next):
+        incoming = _parse_traceparent(request.headers.get("traceparent"))
+        trace_id, parent_id = incoming[:2] if incoming is not None else (None, None)
+        if incoming is not None and from_trusted_proxy(request):
+            sampled = incoming[2]
+        else:
+            # Anyone can send "-01": only a trusted upstream may force (or veto) sampling
+            sampled = random.random() < settings.trace_sample_rate
+        if not sampled and not settings.server_timing_enabled:
+            return await call_next(request)
+
+        trace = Trace(trace_id or secrets.token_hex(16), sampled)
+        token = _current_trace.set(trace)
+        try:
+            root = Span(trace, "request", parent_id)
+            with root:
+                response = await call_next(request)
+            route = request.scope.get("route")
+            root.set_attribute("http.method", request.method)
+            root.set_attribute("http.route", route.path if route is not None else "unmatched")
+            root.set_attribute("http.status_code", response.status_code)
+        finally:
+            _current_trace.reset(token)
+        if settings.server_timing_enabled and (
+            self.timing_allowed is None or self.timing_allowed(request)
+        ):
+            response.headers[SERVER_TIMING_HEADER] = trace.server_timing()
+        if sampled and exporter.enabled:
+            exporter.submit(trace)
+        return response
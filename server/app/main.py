@@ -1,11 +1,42 @@
 """FastAPI application entry point."""
 
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse
 
-from app.api.routes import admin, auth, licenses
+from app.api.deps import server_timing_allowed
+from app.api.routes import licenses
 from app.core.config import settings
+from app.core.crypto_pool import crypto_pool
+from app.core.loop_monitor import loop_monitor
+from app.core.metrics import MetricsMiddleware, registry
+from app.core.query_stats import QueryStatsMiddleware
 from app.core.rate_limit import RateLimitMiddleware
+from app.core.tracing import TracingMiddleware, exporter
+from app.services.failure_counts import failure_aggregator
+from app.services.ip_cardinality import ip_cardinality
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Start and stop background workers."""
+    if settings.deployment_mode == "full" and settings.template_precompile:
+        from app.api.routes.admin import precompile_templates
+
+        precompile_templates()
+    exporter.start()
+    loop_monitor.start()
+    failure_aggregator.start()
+    ip_cardinality.start()
+    yield
+    await ip_cardinality.stop()
+    await failure_aggregator.stop()
+    await loop_monitor.stop()
+    await exporter.stop()
+    crypto_pool.shutdown()
+
 
 app = FastAPI(
     title="SWAPS",
@@ -13,6 +44,7 @@ app = FastAPI(
     version="0.1.0",
     docs_url="/docs",
     redoc_url="/redoc",
+    lifespan=lifespan,
 )
 
 # Global rate limit: 100 req/min per IP (then CORS)
@@ -24,6 +56,13 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+if settings.sql_debug_header:
+    app.add_middleware(QueryStatsMiddleware)
+if settings.metrics_enabled:
+    app.add_middleware(MetricsMiddleware)
+# Outermost, so the root span (Server-Timing "total") includes every other middleware
+if settings.server_timing_enabled or settings.trace_sample_rate > 0:
+    app.add_middleware(TracingMiddleware, timing_allowed=server_timing_allowed)
 
 
 @app.get("/health")
@@ -32,6 +71,20 @@ async def health():
     return {"status": "ok", "service": "swaps"}
 
 
-app.include_router(auth.router, prefix="/auth", tags=["auth"])
-app.include_router(licenses.router, prefix="/licenses", tags=["licenses"])
-app.include_router(admin.router, prefix="/admin", tags=["admin"])
+if settings.metrics_enabled:
+
+    @app.get("/metrics", include_in_schema=False)
+    async def metrics():
+        """Prometheus scrape endpoint (block it at the public proxy)."""
+        return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
+
+
+app.include_router(licenses.validate_router, prefix="/licenses", tags=["licenses"])
+if settings.deployment_mode == "full":
+    # Imported here so API-only nodes never load the admin UI or Jinja2
+    from app.api.routes import admin, auth, diagnostics
+
+    app.include_router(auth.router, prefix="/auth", tags=["auth"])
+    app.include_router(licenses.router, prefix="/licenses", tags=["licenses"])
+    app.include_router(admin.router, prefix="/admin", tags=["admin"])
+    app.include_router(diagnostics.router, prefix="/diagnostics", tags=["diagnostics"])
@@ -3,6 +3,15 @@
 from app.models.admin import Admin
 from app.models.application import Application
 from app.models.license import License
+from app.models.license_ip_sketch import LicenseIPSketch
+from app.models.validation_failure_count import ValidationFailureCount
 from app.models.validation_log import ValidationLog
 
-__all__ = ["Admin", "Application", "License", "ValidationLog"]
+__all__ = [
+    "Admin",
+    "Application",
+    "License",
+    "LicenseIPSketch",
+    "ValidationFailureCount",
+    "ValidationLog",
+]
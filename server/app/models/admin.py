@@ -2,9 +2,10 @@
 
 from datetime import datetime
 
-from sqlalchemy import Boolean, DateTime, String, func
-from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy import Boolean, DateTime, String, event, func, inspect
+from sqlalchemy.orm import Mapped, ORMExecuteState, Session, mapped_column
 
+from app.core import principal_cache
 from app.core.database import Base
 from app.models.base import UUIDMixin
 
@@ -19,3 +20,58 @@ class Admin(Base, UUIDMixin):
     role: Mapped[str] = mapped_column(String(50), nullable=False, default="admin")
     last_login: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
     is_active: Mapped[bool] = mapped_column(Boolean, nullable=False, default=True)
+
+
+# ---- Principal cache invalidation ----
+# Changes are collected per session at flush and evicted from the principal cache only
+# after COMMIT: evicting earlier would let a concurrent request re-cache the still
+# committed old row. ORM-enabled update(Admin) / delete(Admin) executed through a session
+# evict every entry on commit. Do not change admins with Core statements on a bare
+# connection (engine.connect()): nothing sees those until the cache TTL expires.
+_PENDING = "principal_cache_invalidate"  # session.info key: set of emails, None = all
+_AUTH_FIELDS = ("is_active", "role", "email")
+
+
+def _pending(session: Session) -> set[str | None]:
+    return session.info.setdefault(_PENDING, set())
+
+
+@event.listens_for(Session, "before_flush")
+def _collect_admin_changes(session: Session, flush_context, instances) -> None:
+    for obj in session.dirty:
+        if not isinstance(obj, Admin):
+            continue
+        state = inspect(obj)
+        for field in _AUTH_FIELDS:
+            history = state.attrs[field].history
+            if history.has_changes():
+                # Tokens carry the old email as subject; it must stop resolving too
+                _pending(session).update(v for v in (*history.deleted, obj.email) if v)
+    for obj in session.deleted:
+        if isinstance(obj, Admin):
+            _pending(session).add(obj.email)
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _collect_admin_statements(state: ORMExecuteState) -> None:
+    if (state.is_update or state.is_delete) and any(
+        m.class_ is Admin for m in state.all_mappers
+    ):
+        _pending(state.session).add(None)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_committed_admins(session: Session) -> None:
+    emails = session.info.pop(_PENDING, None)
+    if not emails:
+        return
+    if None in emails:
+        principal_cache.invalidate()
+    else:
+        for email in emails:
+            principal_cache.invalidate(email)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_admin_changes(session: Session) -> None:
+    session.info.pop(_PENDING, None)
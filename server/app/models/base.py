@@ -1,5 +1,9 @@
 """Base model with common columns."""
 
+import os
+import threading
+import time
+import uuid
 from datetime import datetime
 from uuid import uuid4
 
@@ -20,6 +24,36 @@ class TimestampMixin:
     )
 
 
+_uuid7_lock = threading.Lock()
+_uuid7_last_ms = 0
+_uuid7_seq = 0
+
+
+def uuid7() -> uuid.UUID:
+    """Time-ordered UUID (RFC 9562 version 7): 48-bit Unix ms timestamp, then randomness.
+
+    The 12 rand_a bits hold a per-millisecond counter (seeded randomly), so ids generated
+    by this process are strictly increasing and new rows land on the right edge of the
+    primary-key b-tree instead of random pages.
+    """
+    global _uuid7_last_ms, _uuid7_seq
+    with _uuid7_lock:
+        ms = time.time_ns() // 1_000_000
+        if ms > _uuid7_last_ms:
+            _uuid7_last_ms = ms
+            _uuid7_seq = int.from_bytes(os.urandom(2), "big") & 0x7FF  # leave headroom
+        else:
+            ms = _uuid7_last_ms  # clock went back or same ms: keep ordering
+            _uuid7_seq += 1
+            if _uuid7_seq > 0xFFF:  # counter exhausted: borrow the next millisecond
+                _uuid7_last_ms = ms = ms + 1
+                _uuid7_seq = 0
+        seq = _uuid7_seq
+    rand_b = int.from_bytes(os.urandom(8), "big") & 0x3FFF_FFFF_FFFF_FFFF
+    value = (ms << 80) | (0x7 << 76) | (seq << 64) | (0b10 << 62) | rand_b
+    return uuid.UUID(int=value)
+
+
 class UUIDMixin:
     """Mixin adding UUID primary key."""
 
@@ -28,3 +62,16 @@ class UUIDMixin:
         primary_key=True,
         default=uuid4,
     )
+
+
+class TimeOrderedUUIDMixin:
+    """UUID primary key generated with uuid7, for append-heavy tables (validation_logs).
+
+    Same column type as UUIDMixin, so switching a table needs no DDL.
+    """
+
+    id: Mapped[UUID] = mapped_column(
+        UUID(as_uuid=True),
+        primary_key=True,
+        default=uuid7,
+    )
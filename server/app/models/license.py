@@ -3,7 +3,7 @@
 from datetime import date
 from uuid import UUID
 
-from sqlalchemy import Boolean, Date, ForeignKey, String, func
+from sqlalchemy import Boolean, Date, ForeignKey, LargeBinary, String, func
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.core.database import Base
@@ -12,12 +12,16 @@ from app.models.base import TimestampMixin, UUIDMixin
 
 class License(Base, UUIDMixin, TimestampMixin):
     """
-    License record. license_key is stored as SHA256 hash only; plaintext shown once at creation.
+    License record. license_key is stored as a binary SHA256 digest only; plaintext shown
+    once at creation.
     """
 
     __tablename__ = "licenses"
 
-    license_key_hash: Mapped[str] = mapped_column(String(64), unique=True, nullable=False, index=True)
+    # SHA256 digest, 32 bytes (BYTEA); see security.license_key_digest
+    license_key_hash: Mapped[bytes] = mapped_column(
+        LargeBinary(32), unique=True, nullable=False, index=True
+    )
     app_name: Mapped[str] = mapped_column(String(255), nullable=False, index=True)
     client_name: Mapped[str] = mapped_column(String(255), nullable=False, index=True)
     expiry_date: Mapped[date] = mapped_column(Date, nullable=False)
@@ -0,0 +1,22 @@
+"""Per-license HyperLogLog sketches of distinct client IPs (per day and per month)."""
+
+from datetime import date
+from uuid import UUID
+
+from sqlalchemy import Date, ForeignKey, LargeBinary, String
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.core.database import Base
+
+
+class LicenseIPSketch(Base):
+    """HyperLogLog registers (app.core.hll, 256 bytes) for one license and period."""
+
+    __tablename__ = "license_ip_sketches"
+
+    license_id: Mapped[UUID] = mapped_column(
+        ForeignKey("licenses.id", ondelete="CASCADE"), primary_key=True
+    )
+    period: Mapped[str] = mapped_column(String(8), primary_key=True)  # day | month
+    period_start: Mapped[date] = mapped_column(Date, primary_key=True)
+    registers: Mapped[bytes] = mapped_column(LargeBinary, nullable=False)
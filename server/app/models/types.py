@@ -0,0 +1,115 @@
+"""Column types that store compact encodings but read and write plain Python strings."""
+
+import ipaddress
+
+from sqlalchemy import Boolean, SmallInteger, String, literal
+from sqlalchemy.dialects.postgresql import CIDR, INET
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.functions import FunctionElement
+from sqlalchemy.types import TypeDecorator
+
+
+class CodedLabel(TypeDecorator):
+    """A closed set of string labels stored as SMALLINT codes.
+
+    `labels` is a tuple of (code, label) pairs; binding an unknown label raises ValueError,
+    so a new result or reason has to be added to its enum (and never renumbered).
+    """
+
+    impl = SmallInteger
+    cache_ok = True
+
+    def __init__(self, labels: tuple[tuple[int, str], ...]) -> None:
+        super().__init__()
+        self.labels = labels
+        self._codes = {label: code for code, label in labels}
+        self._labels = dict(labels)
+
+    def process_bind_param(self, value: str | None, dialect) -> int | None:
+        if value is None:
+            return None
+        try:
+            return self._codes[value]
+        except KeyError:
+            raise ValueError(f"Unknown label {value!r}") from None
+
+    def process_result_value(self, value: int | None, dialect) -> str | None:
+        if value is None:
+            return None
+        return self._labels.get(value, f"unknown({value})")
+
+
+class IPAddress(TypeDecorator):
+    """IPv4/IPv6 address: native INET on PostgreSQL, text elsewhere; str in Python.
+
+    Values that are not IP addresses (e.g. a test client's placeholder host) are stored as
+    NULL rather than failing the insert.
+    """
+
+    impl = String(45)
+    cache_ok = True
+
+    class comparator_factory(TypeDecorator.Comparator):
+        def within(self, network: str):
+            """Address is inside `network` (an address or CIDR; inet <<= on PostgreSQL)."""
+            return within_network(self.expr, literal(network, String()))
+
+    def load_dialect_impl(self, dialect):
+        if dialect.name == "postgresql":
+            return dialect.type_descriptor(INET())
+        return dialect.type_descriptor(String(45))
+
+    def process_bind_param(self, value: str | None, dialect) -> str | None:
+        if value is None:
+            return None
+        try:
+            return str(ipaddress.ip_address(value))
+        except ValueError:
+            return None
+
+    def process_result_value(self, value, dialect) -> str | None:
+        if value is None:
+            return None
+        # asyncpg returns ipaddress objects (an interface when a prefix is set)
+        return str(getattr(value, "ip", value))
+
+
+class IPNetwork(TypeDecorator):
+    """IPv4/IPv6 network (e.g. 203.0.113.0/24): native CIDR on PostgreSQL, text elsewhere."""
+
+    impl = String(49)
+    cache_ok = True
+
+    def load_dialect_impl(self, dialect):
+        if dialect.name == "postgresql":
+            return dialect.type_descriptor(CIDR())
+        return dialect.type_descriptor(String(49))
+
+    def process_bind_param(self, value: str | None, dialect) -> str | None:
+        if value is None:
+            return None
+        return str(ipaddress.ip_network(value))
+
+    def process_result_value(self, value, dialect) -> str | None:
+        return None if value is None else str(value)
+
+
+class within_network(FunctionElement):
+    """`address <<= network` on PostgreSQL; inet_within() elsewhere (see database.py)."""
+
+    type = Boolean()
+    inherit_cache = True
+    name = "inet_within"
+
+
+@compiles(within_network)
+def _compile_within_network(element, compiler, **kw):
+    return f"inet_within({compiler.process(element.clauses, **kw)})"
+
+
+@compiles(within_network, "postgresql")
+def _compile_within_network_pg(element, compiler, **kw):
+    address, network = element.clauses
+    return (
+        f"{compiler.process(address, **kw)} <<= CAST({compiler.process(network, **kw)} AS INET)"
+    )
@@ -0,0 +1,22 @@
+"""Aggregated counts of validation failures that have no license (unknown key, bad signature)."""
+
+from datetime import datetime
+
+from sqlalchemy import DateTime, Integer
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.core.database import Base
+from app.models.types import IPNetwork
+from app.models.validation_log import REASON_TYPE
+
+
+class ValidationFailureCount(Base):
+    """Failures per (minute, client IP prefix, reason); written by the failure aggregator."""
+
+    __tablename__ = "validation_failure_counts"
+
+    minute: Mapped[datetime] = mapped_column(DateTime(timezone=True), primary_key=True)
+    # /24 (IPv4) or /64 (IPv6) of the client; 0.0.0.0/0 when unknown or over the key cap
+    ip_prefix: Mapped[str] = mapped_column(IPNetwork(), primary_key=True)
+    reason: Mapped[str] = mapped_column(REASON_TYPE, primary_key=True)
+    count: Mapped[int] = mapped_column(Integer, nullable=False)
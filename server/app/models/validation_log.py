@@ -1,31 +1,101 @@
 """Validation log — audit trail for each validation request."""
 
+import enum
 from datetime import datetime
 from uuid import UUID
 
-from sqlalchemy import ForeignKey, String, Text, func
+from sqlalchemy import ForeignKey, Index, Integer, func, text
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.core.database import Base
-from app.models.base import UUIDMixin
+from app.models.base import TimeOrderedUUIDMixin
+from app.models.types import CodedLabel, IPAddress
 
 
-class ValidationLog(Base, UUIDMixin):
-    """Single validation attempt: license_id, timestamp, IP, result, error_reason."""
+class ValidationResult(enum.IntEnum):
+    """Stored codes of validation_logs.result. Append only; never renumber."""
+
+    SUCCESS = 1
+    FAIL = 2
+
+    @property
+    def label(self) -> str:
+        return self.name.lower()
+
+
+class ValidationReason(enum.IntEnum):
+    """Stored codes of validation_logs.reason (failure reasons). Append only; never renumber."""
+
+    INVALID_SIGNATURE = 1
+    LICENSE_NOT_FOUND = 2
+    LICENSE_EXPIRED = 3
+    LICENSE_INACTIVE = 4
+    LICENSE_SUSPENDED = 5
+
+    @property
+    def label(self) -> str:
+        return _REASON_LABELS[self]
+
+
+_REASON_LABELS = {
+    ValidationReason.INVALID_SIGNATURE: "Invalid signature",
+    ValidationReason.LICENSE_NOT_FOUND: "License not found",
+    ValidationReason.LICENSE_EXPIRED: "License expired",
+    ValidationReason.LICENSE_INACTIVE: "License inactive",
+    ValidationReason.LICENSE_SUSPENDED: "License suspended",
+}
+
+RESULT_TYPE = CodedLabel(tuple((r.value, r.label) for r in ValidationResult))
+REASON_TYPE = CodedLabel(tuple((r.value, r.label) for r in ValidationReason))
+
+
+class ValidationLog(Base, TimeOrderedUUIDMixin):
+    """Validation attempt: license_id, timestamp, IP, result, error_reason.
+
+    With log dedup on, one row also stands for repeat_count identical attempts, the last
+    of them at last_seen_at (None when the row is a single attempt).
+    """
 
     __tablename__ = "validation_logs"
+    # Audit filters (migration 009): each filter is an index prefix followed by the
+    # validated_at sort key; IP / CIDR containment (<<=) uses a GiST index on
+    # (ip_address inet_ops, validated_at) (btree_gist), so a CIDR filter with a time range
+    # is answered from the index alone
+    __table_args__ = (
+        Index("ix_validation_logs_license_id_validated_at", "license_id", "validated_at"),
+        Index("ix_validation_logs_result_validated_at", "result", "validated_at"),
+        Index(
+            "ix_validation_logs_reason_validated_at",
+            "reason",
+            "validated_at",
+            postgresql_where=text("reason IS NOT NULL"),
+        ),
+        Index(
+            "ix_validation_logs_ip_address_validated_at",
+            "ip_address",
+            "validated_at",
+            postgresql_using="gist",
+            postgresql_ops={"ip_address": "inet_ops"},
+        ),
+    )
 
     license_id: Mapped[UUID] = mapped_column(
         ForeignKey("licenses.id", ondelete="CASCADE"),
         nullable=False,
-        index=True,
     )
     validated_at: Mapped[datetime] = mapped_column(
         nullable=False,
         server_default=func.now(),
+        index=True,
+    )
+    # INET on PostgreSQL (7 bytes for IPv4 vs up to 16 as text); str in Python
+    ip_address: Mapped[str | None] = mapped_column(IPAddress(), nullable=True)
+    # SMALLINT codes (ValidationResult / ValidationReason); read and written as labels
+    result: Mapped[str] = mapped_column(RESULT_TYPE, nullable=False)  # success | fail
+    error_reason: Mapped[str | None] = mapped_column("reason", REASON_TYPE, nullable=True)
+    repeat_count: Mapped[int] = mapped_column(
+        Integer, nullable=False, default=1, server_default="1"
     )
-    ip_address: Mapped[str | None] = mapped_column(String(45), nullable=True)
-    result: Mapped[str] = mapped_column(String(16), nullable=False)  # success | fail
-    error_reason: Mapped[str | None] = mapped_column(Text, nullable=True)
+    last_seen_at: Mapped[datetime | None] = mapped_column(nullable=True)
 
     license: Mapped["License"] = relationship("License", back_populates="validation_logs")
@@ -3,7 +3,7 @@
 from datetime import date, datetime
 from uuid import UUID
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 
 
 # ---- Create ----
@@ -60,6 +60,9 @@ class ValidateRequest(BaseModel):
 
 
 class ValidateResponse(BaseModel):
+    # Frozen: constant outcomes are shared instances (see app.core.fast_json)
+    model_config = ConfigDict(frozen=True)
+
     valid: bool
     status: str  # active | expired | suspended | inactive | pending
     expires_at: datetime | None = None
@@ -74,5 +77,12 @@ class ValidationLogEntry(BaseModel):
     ip_address: str | None
     result: str
     error_reason: str | None
+    repeat_count: int = 1  # identical validations collapsed into this entry (log dedup)
+    last_seen_at: datetime | None = None
 
     model_config = {"from_attributes": True}
+
+
+class AuditLogEntry(ValidationLogEntry):
+    app_name: str
+    client_name: str
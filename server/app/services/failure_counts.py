@@ -0,0 +1,124 @@
+"""In-memory aggregation of license-less validation failures, flushed as counter rows.
+
+Unknown-key and bad-signature attempts have no license to attach a validation_logs row to,
+and they are the bulk of abuse traffic, so one row per attempt would let an attacker drive
+our write load. Instead each attempt bumps a dict entry keyed by (minute, IP prefix,
+reason); a background task upserts the accumulated counts every
+failure_counts_flush_seconds. Write cost is bounded by the number of distinct keys per
+interval (capped by failure_counts_max_keys), not by request rate.
+"""
+
+import asyncio
+import ipaddress
+import logging
+import time
+from datetime import datetime, timezone
+
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.core.config import settings
+from app.core.database import async_session_maker
+from app.core.metrics import Counter, registry
+from app.models.validation_failure_count import ValidationFailureCount
+
+logger = logging.getLogger(__name__)
+
+UNKNOWN_PREFIX = "0.0.0.0/0"
+
+FAILURES_RECORDED = registry.register(
+    Counter(
+        "swaps_validation_failures_aggregated_total",
+        "License-less validation failures counted by the failure aggregator.",
+        ("reason",),
+    )
+)
+
+
+def ip_prefix(ip_address: str | None) -> str:
+    """Client network used as aggregation key: /24 for IPv4, /64 for IPv6 by default."""
+    if not ip_address:
+        return UNKNOWN_PREFIX
+    try:
+        ip = ipaddress.ip_address(ip_address)
+    except ValueError:
+        return UNKNOWN_PREFIX
+    if ip.version == 4:
+        bits = settings.failure_counts_ipv4_prefix
+    else:
+        bits = settings.failure_counts_ipv6_prefix
+    return str(ipaddress.ip_network((ip, bits), strict=False))
+
+
+class FailureAggregator:
+    """Counts per (minute, prefix, reason) in a dict; flush() upserts and resets them."""
+
+    def __init__(self) -> None:
+        self._counts: dict[tuple[int, str, str], int] = {}
+        self._task: asyncio.Task | None = None
+
+    def record(self, ip_address: str | None, reason: str, now: float | None = None) -> None:
+        minute = int(time.time() if now is None else now) // 60
+        key = (minute, ip_prefix(ip_address), reason)
+        if key not in self._counts and len(self._counts) >= settings.failure_counts_max_keys:
+            key = (minute, UNKNOWN_PREFIX, reason)
+        self._counts[key] = self._counts.get(key, 0) + 1
+        FAILURES_RECORDED.inc(reason)
+
+    def pending(self) -> dict[tuple[int, str, str], int]:
+        return dict(self._counts)
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        try:
+            await self.flush()
+        except Exception:  # shutdown goes on; these last counts are lost
+            logger.exception("Final flush of validation failure counts failed")
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(settings.failure_counts_flush_seconds)
+            try:
+                await self.flush()
+            except Exception:  # keep counting; the counts are retried on the next flush
+                logger.exception("Flushing validation failure counts failed")
+
+    async def flush(self, session_maker: async_sessionmaker[AsyncSession] | None = None) -> int:
+        """Upsert pending counts (adding to existing rows); returns the number of rows written."""
+        if not self._counts:
+            return 0
+        counts, self._counts = self._counts, {}
+        rows = [
+            {
+                "minute": datetime.fromtimestamp(minute * 60, tz=timezone.utc),
+                "ip_prefix": prefix,
+                "reason": reason,
+                "count": n,
+            }
+            for (minute, prefix, reason), n in counts.items()
+        ]
+        try:
+            async with (session_maker or async_session_maker)() as db:
+                dialect = db.bind.dialect.name
+                insert = postgresql.insert if dialect == "postgresql" else sqlite.insert
+                stmt = insert(ValidationFailureCount)
+                stmt = stmt.on_conflict_do_update(
+                    index_elements=["minute", "ip_prefix", "reason"],
+                    set_={"count": ValidationFailureCount.count + stmt.excluded["count"]},
+                )
+                await db.execute(stmt, rows)
+                await db.commit()
+        except Exception:
+            for key, n in counts.items():  # put them back so the next flush retries
+                self._counts[key] = self._counts.get(key, 0) + n
+            raise
+        return len(rows)
+
+
+failure_aggregator = FailureAggregator()
@@ -0,0 +1,219 @@
+"""Distinct client IPs per license (per UTC day and month) via HyperLogLog sketches.
+
+Each worker adds IPs to in-memory sketches for the licenses it validated and periodically
+merges them into license_ip_sketches (register-wise max, so workers never overwrite each
+other's observations). Estimates combine the stored sketch with this worker's unflushed
+one. Used to flag keys that are deployed on many more machines than expected.
+
+Only the current day and month are ever read, so a flush also deletes (once per UTC day
+per worker) day rows before yesterday and month rows before last month: the table stays
+at about two rows per recently active license instead of growing by one row a day.
+"""
+
+import asyncio
+import logging
+from datetime import date, datetime, timedelta, timezone
+from uuid import UUID
+
+from sqlalchemy import and_, delete, or_, select, tuple_, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.core.config import settings
+from app.core.database import async_session_maker
+from app.core.hll import HyperLogLog
+from app.models.license_ip_sketch import LicenseIPSketch
+
+logger = logging.getLogger(__name__)
+
+PERIODS = ("day", "month")
+
+SketchKey = tuple[UUID, str, date]
+
+
+def period_starts(today: date | None = None) -> dict[str, date]:
+    today = today or datetime.now(timezone.utc).date()
+    return {"day": today, "month": today.replace(day=1)}
+
+
+def retained_starts(today: date | None = None) -> dict[str, date]:
+    """Oldest period_start kept per period: yesterday and last month.
+
+    estimates() reads only the current periods; the previous ones are kept because a worker
+    may still flush observations recorded just before midnight (or the month's end).
+    """
+    starts = period_starts(today)
+    return {
+        "day": starts["day"] - timedelta(days=1),
+        "month": (starts["month"] - timedelta(days=1)).replace(day=1),
+    }
+
+
+async def delete_expired_sketches(db: AsyncSession, today: date | None = None) -> int:
+    """Delete sketch rows older than retained_starts(); returns the number deleted."""
+    keep = retained_starts(today)
+    result = await db.execute(
+        delete(LicenseIPSketch).where(
+            or_(
+                *(
+                    and_(LicenseIPSketch.period == period, LicenseIPSketch.period_start < start)
+                    for period, start in keep.items()
+                )
+            )
+        )
+    )
+    return result.rowcount
+
+
+class IPCardinalityTracker:
+    """Unflushed per-(license, period) sketches of this worker, merged into the DB on flush."""
+
+    def __init__(self) -> None:
+        self._pending: dict[SketchKey, HyperLogLog] = {}
+        self._task: asyncio.Task | None = None
+        self._pruned_on: date | None = None
+
+    def record(self, license_id: UUID, ip_address: str | None, today: date | None = None) -> None:
+        if not ip_address:
+            return
+        for period, start in period_starts(today).items():
+            key = (license_id, period, start)
+            sketch = self._pending.get(key)
+            if sketch is None:
+                sketch = self._pending[key] = HyperLogLog()
+            sketch.add(ip_address)
+
+    def pending(self, key: SketchKey) -> HyperLogLog | None:
+        return self._pending.get(key)
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        try:
+            await self.flush()
+        except Exception:  # shutdown goes on; this worker's last observations are lost
+            logger.exception("Final flush of license IP sketches failed")
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(settings.ip_sketch_flush_seconds)
+            try:
+                await self.flush()
+            except Exception:  # sketches are kept and merged again on the next flush
+                logger.exception("Flushing license IP sketches failed")
+
+    async def flush(
+        self,
+        session_maker: async_sessionmaker[AsyncSession] | None = None,
+        today: date | None = None,
+    ) -> int:
+        """Merge pending sketches into license_ip_sketches; returns the number of rows merged.
+
+        Three statements regardless of how many licenses: create missing rows, lock and
+        read them, write the merged registers back. The first flush of each UTC day then
+        deletes expired rows (delete_expired_sketches) in a transaction of its own.
+        """
+        if not self._pending:
+            return 0
+        pending, self._pending = self._pending, {}
+        # Every worker inserts and locks rows in primary-key order, so concurrent flushes
+        # touching the same licenses queue behind each other instead of deadlocking
+        keys = sorted(pending)
+        try:
+            async with (session_maker or async_session_maker)() as db:
+                dialect = db.bind.dialect.name
+                insert = postgresql.insert if dialect == "postgresql" else sqlite.insert
+                empty = HyperLogLog().to_bytes()
+                await db.execute(
+                    insert(LicenseIPSketch).on_conflict_do_nothing(),
+                    [
+                        {"license_id": lid, "period": period, "period_start": start,
+                         "registers": empty}
+                        for lid, period, start in keys
+                    ],
+                )
+                pk = tuple_(
+                    LicenseIPSketch.license_id, LicenseIPSketch.period, LicenseIPSketch.period_start
+                )
+                rows = await db.execute(
+                    select(LicenseIPSketch.__table__)
+                    .where(pk.in_(keys))
+                    .order_by(*pk.clauses)
+                    .with_for_update()
+                )
+                merged = []
+                for row in rows:
+                    sketch = HyperLogLog.from_bytes(row.registers)
+                    sketch.merge(pending[(row.license_id, row.period, row.period_start)])
+                    merged.append(
+                        {
+                            "license_id": row.license_id,
+                            "period": row.period,
+                            "period_start": row.period_start,
+                            "registers": sketch.to_bytes(),
+                        }
+                    )
+                await db.execute(update(LicenseIPSketch), merged)
+                await db.commit()
+        except Exception:
+            for key, sketch in pending.items():
+                current = self._pending.get(key)
+                if current is None:
+                    self._pending[key] = sketch
+                else:
+                    current.merge(sketch)
+            raise
+        today = today or datetime.now(timezone.utc).date()
+        if self._pruned_on != today:
+            async with (session_maker or async_session_maker)() as db:
+                await delete_expired_sketches(db, today)
+                await db.commit()
+            self._pruned_on = today
+        return len(merged)
+
+    async def estimates(
+        self, db: AsyncSession, license_ids: list[UUID], today: date | None = None
+    ) -> dict[UUID, dict[str, int]]:
+        """{license_id: {"day": n, "month": n}} for the current day and month."""
+        if not license_ids:
+            return {}
+        starts = period_starts(today)
+        result = await db.execute(
+            select(LicenseIPSketch.__table__).where(
+                LicenseIPSketch.license_id.in_(license_ids),
+                tuple_(LicenseIPSketch.period, LicenseIPSketch.period_start).in_(
+                    list(starts.items())
+                ),
+            )
+        )
+        stored = {
+            (row.license_id, row.period, row.period_start): row.registers for row in result
+        }
+        out: dict[UUID, dict[str, int]] = {}
+        for license_id in license_ids:
+            counts = {}
+            for period, start in starts.items():
+                key = (license_id, period, start)
+                registers = stored.get(key)
+                sketch = HyperLogLog.from_bytes(registers) if registers else HyperLogLog()
+                local = self._pending.get(key)
+                if local is not None:
+                    sketch.merge(local)
+                counts[period] = sketch.estimate()
+            out[license_id] = counts
+        return out
+
+
+def is_key_sharing_suspect(counts: dict[str, int]) -> bool:
+    return (
+        counts.get("day", 0) > settings.key_sharing_daily_ip_threshold
+        or counts.get("month", 0) > settings.key_sharing_monthly_ip_threshold
+    )
+
+
+ip_cardinality = IPCardinalityTracker()
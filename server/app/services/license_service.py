@@ -1,29 +1,38 @@
 """License business logic: key generation, CRUD, validation."""
 
+import ipaddress
+from collections.abc import AsyncIterator
 from datetime import date, datetime, timedelta, timezone
 from uuid import UUID
 
-from sqlalchemy import select
+from sqlalchemy import Select, func, insert, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.broadcast import audit_broadcaster
 from app.core.config import settings
+from app.core.fast_json import pre_encoded
+from app.core.heavy_hitters import heavy_hitters
+from app.core.metrics import validation_stage
 from app.core.security import (
     generate_license_key,
-    hash_license_key,
+    license_key_digest,
     verify_validation_signature,
 )
 from app.models.license import License
 from app.models.validation_log import ValidationLog
 from app.schemas.license import LicenseCreate, LicenseUpdate, ValidateRequest, ValidateResponse
+from app.services.failure_counts import failure_aggregator
+from app.services.ip_cardinality import ip_cardinality, is_key_sharing_suspect
+from app.services.log_dedup import log_dedup
 
 
-def create_license_key_pair(app_code: str) -> tuple[str, str]:
+def create_license_key_pair(app_code: str) -> tuple[str, bytes]:
     """
     Generate a new license key and its hash for DB storage.
-    Returns (plaintext_key, key_hash). Caller must show plaintext once and store only hash.
+    Returns (plaintext_key, key_digest). Caller must show plaintext once and store only hash.
     """
     plain = generate_license_key(app_code)
-    key_hash = hash_license_key(plain)
+    key_hash = license_key_digest(plain)
     return plain, key_hash
 
 
@@ -32,32 +41,29 @@ async def create_license(db: AsyncSession, data: LicenseCreate) -> tuple[License
     """Create license; returns (license, plaintext_key). Extract app_code from app_name (e.g. MYAPP)."""
     app_code = (data.app_name or "APP").replace(" ", "")[:20].upper() or "APP"
     plain_key, key_hash = create_license_key_pair(app_code)
-    license_ = License(
-        license_key_hash=key_hash,
-        app_name=data.app_name,
-        client_name=data.client_name,
-        expiry_date=data.expiry_date,
-        status=data.status,
-        monthly_renewal=data.monthly_renewal,
+    # INSERT ... RETURNING: one round trip, server defaults (id, created_at) come back with it
+    result = await db.execute(
+        insert(License)
+        .values(
+            license_key_hash=key_hash,
+            app_name=data.app_name,
+            client_name=data.client_name,
+            expiry_date=data.expiry_date,
+            status=data.status,
+            monthly_renewal=data.monthly_renewal,
+        )
+        .returning(License)
     )
-    db.add(license_)
-    await db.flush()
-    await db.refresh(license_)
-    return license_, plain_key
+    return result.scalar_one(), plain_key
 
 
-async def list_licenses(
-    db: AsyncSession,
-    *,
+def _licenses_query(
     status: str | None = None,
     client_name: str | None = None,
     expiry_from: date | None = None,
     expiry_to: date | None = None,
-    skip: int = 0,
-    limit: int = 100,
-) -> list[License]:
-    """List licenses with optional filters (status, client, expiry date range)."""
-    q = select(License).order_by(License.created_at.desc()).offset(skip).limit(limit)
+) -> Select:
+    q = select(License).order_by(License.created_at.desc())
     if status:
         q = q.where(License.status == status)
     if client_name:
@@ -66,10 +72,48 @@ async def list_licenses(
         q = q.where(License.expiry_date >= expiry_from)
     if expiry_to is not None:
         q = q.where(License.expiry_date <= expiry_to)
+    return q
+
+
+async def list_licenses(
+    db: AsyncSession,
+    *,
+    status: str | None = None,
+    client_name: str | None = None,
+    expiry_from: date | None = None,
+    expiry_to: date | None = None,
+    skip: int = 0,
+    limit: int = 100,
+) -> list[License]:
+    """List licenses with optional filters (status, client, expiry date range)."""
+    q = _licenses_query(status, client_name, expiry_from, expiry_to).offset(skip).limit(limit)
     result = await db.execute(q)
     return list(result.scalars().all())
 
 
+async def stream_licenses_with_ip_estimates(
+    db: AsyncSession,
+    *,
+    status: str | None = None,
+    client_name: str | None = None,
+    expiry_from: date | None = None,
+    expiry_to: date | None = None,
+    limit: int = 1000,
+    batch_size: int = 200,
+) -> AsyncIterator[tuple[License, dict | None]]:
+    """(license, distinct IP estimates) read through a cursor, batch_size rows at a time.
+
+    Estimates are looked up per batch, so memory and time to the first row do not grow
+    with `limit`.
+    """
+    q = _licenses_query(status, client_name, expiry_from, expiry_to).limit(limit)
+    result = await db.stream_scalars(q.execution_options(yield_per=batch_size))
+    async for batch in result.partitions():
+        estimates = await distinct_ip_estimates(db, [lic.id for lic in batch])
+        for lic in batch:
+            yield lic, estimates.get(lic.id)
+
+
 async def count_licenses_by_status(db: AsyncSession, status: str) -> int:
     """Count licenses with the given status."""
     from sqlalchemy import func
@@ -122,19 +166,109 @@ async def list_validation_history(
     return list(result.scalars().all())
 
 
-async def list_audit_logs(
-    db: AsyncSession, skip: int = 0, limit: int = 100
-) -> list[tuple[ValidationLog, License]]:
-    """All validation logs with license info (app_name, client_name), for audit view."""
+async def stream_validation_history(
+    db: AsyncSession, license_id: UUID, limit: int = 500, batch_size: int = 500
+) -> AsyncIterator[ValidationLog]:
+    """Like list_validation_history, read through a cursor batch_size rows at a time."""
     q = (
-        select(ValidationLog, License)
-        .join(License, ValidationLog.license_id == License.id)
+        select(ValidationLog)
+        .where(ValidationLog.license_id == license_id)
         .order_by(ValidationLog.validated_at.desc())
-        .offset(skip)
         .limit(limit)
+        .execution_options(yield_per=batch_size)
     )
-    result = await db.execute(q)
-    return [(row[0], row[1]) for row in result.all()]
+    async for log in await db.stream_scalars(q):
+        yield log
+
+
+def _naive_utc(value: datetime) -> datetime:
+    """validated_at is stored as naive UTC; convert aware filter values to match."""
+    if value.tzinfo is None:
+        return value
+    return value.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+def parse_ip_filter(value: str) -> str:
+    """Normalize an IP address or CIDR audit filter (e.g. 203.0.113.0/24); ValueError if invalid."""
+    return str(ipaddress.ip_network(value.strip(), strict=False))
+
+
+async def list_audit_logs(
+    db: AsyncSession,
+    skip: int = 0,
+    limit: int = 100,
+    *,
+    start: datetime | None = None,
+    end: datetime | None = None,
+    result: str | None = None,
+    reason: str | None = None,
+    ip_network: str | None = None,
+    license_id: UUID | None = None,
+) -> list[tuple[ValidationLog, License]]:
+    """Validation logs with license info (app_name, client_name), newest first, for the audit view.
+
+    Optional filters: start <= validated_at < end, result (success | fail), reason label,
+    client IP inside ip_network (address or CIDR) and license_id. Each is served by an index
+    of migration 009, so filtered pages do not scan the table.
+    """
+    q = select(ValidationLog, License).join(License, ValidationLog.license_id == License.id)
+    if start is not None:
+        q = q.where(ValidationLog.validated_at >= _naive_utc(start))
+    if end is not None:
+        q = q.where(ValidationLog.validated_at < _naive_utc(end))
+    if result is not None:
+        q = q.where(ValidationLog.result == result)
+    if reason is not None:
+        q = q.where(ValidationLog.error_reason == reason)
+    if ip_network is not None:
+        q = q.where(ValidationLog.ip_address.within(ip_network))
+    if license_id is not None:
+        q = q.where(ValidationLog.license_id == license_id)
+    q = q.order_by(ValidationLog.validated_at.desc()).offset(skip).limit(limit)
+    rows = await db.execute(q)
+    return [(row[0], row[1]) for row in rows.all()]
+
+
+async def heavy_hitters_report(db: AsyncSession, limit: int = 10) -> dict:
+    """Top license keys (resolved to licenses where they exist) and client IPs of /validate."""
+    keys, key_total = heavy_hitters.keys.top(limit)
+    ips, ip_total = heavy_hitters.ips.top(limit)
+    licenses: dict[bytes, License] = {}
+    if keys:
+        result = await db.execute(
+            select(License).where(License.license_key_hash.in_([h.item for h in keys]))
+        )
+        licenses = {lic.license_key_hash: lic for lic in result.scalars()}
+    return {
+        "window_seconds": settings.heavy_hitters_window_seconds,
+        "license_keys": {
+            "total": key_total,
+            "top": [
+                {
+                    "key_hash_prefix": h.item.hex()[:12],
+                    "license_id": licenses[h.item].id if h.item in licenses else None,
+                    "client_name": (
+                        licenses[h.item].client_name if h.item in licenses else None
+                    ),
+                    "count": h.count,
+                    "error": h.error,
+                }
+                for h in keys
+            ],
+        },
+        "ips": {
+            "total": ip_total,
+            "top": [{"ip": h.item, "count": h.count, "error": h.error} for h in ips],
+        },
+    }
+
+
+async def distinct_ip_estimates(db: AsyncSession, license_ids: list[UUID]) -> dict[UUID, dict]:
+    """Estimated distinct client IPs today and this month per license, with the sharing flag."""
+    estimates = await ip_cardinality.estimates(db, license_ids)
+    for counts in estimates.values():
+        counts["flagged"] = is_key_sharing_suspect(counts)
+    return estimates
 
 
 async def get_license_by_id(db: AsyncSession, license_id: UUID) -> License | None:
@@ -143,23 +277,31 @@ async def get_license_by_id(db: AsyncSession, license_id: UUID) -> License | Non
     return result.scalar_one_or_none()
 
 
+async def _update_returning(db: AsyncSession, license_id: UUID, values: dict) -> License | None:
+    """UPDATE licenses SET ... WHERE id = :id RETURNING *; None if no such license."""
+    result = await db.execute(
+        update(License)
+        .where(License.id == license_id)
+        .values(**values)
+        .returning(License)
+        .execution_options(synchronize_session=False, populate_existing=True)
+    )
+    return result.scalar_one_or_none()
+
+
 async def update_license(
-    db: AsyncSession, license_: License, data: LicenseUpdate
-) -> License:
-    """Update license fields."""
-    for k, v in data.model_dump(exclude_unset=True).items():
-        setattr(license_, k, v)
-    await db.flush()
-    await db.refresh(license_)
-    return license_
+    db: AsyncSession, license_id: UUID, data: LicenseUpdate
+) -> License | None:
+    """Update license fields in one statement. Returns None if the license does not exist."""
+    values = data.model_dump(exclude_unset=True)
+    if not values:
+        return await get_license_by_id(db, license_id)
+    return await _update_returning(db, license_id, values)
 
 
-async def deactivate_license(db: AsyncSession, license_: License) -> License:
-    """Set license status to inactive (soft delete)."""
-    license_.status = "inactive"
-    await db.flush()
-    await db.refresh(license_)
-    return license_
+async def deactivate_license(db: AsyncSession, license_id: UUID) -> License | None:
+    """Set license status to inactive (soft delete). Returns None if it does not exist."""
+    return await _update_returning(db, license_id, {"status": "inactive"})
 
 
 # ---- Validation ----
@@ -170,6 +312,23 @@ def _check_timestamp_fresh(timestamp: int) -> bool:
     return delta <= settings.validation_timestamp_window_seconds
 
 
+# Outcomes that carry no license data: shared instances whose JSON is encoded once
+_REQUEST_EXPIRED = pre_encoded(
+    ValidateResponse(
+        valid=False,
+        status="invalid",
+        expires_at=None,
+        message="Request expired or invalid timestamp",
+    )
+)
+_INVALID_REQUEST = pre_encoded(
+    ValidateResponse(valid=False, status="invalid", expires_at=None, message="Invalid request")
+)
+_INVALID_LICENSE = pre_encoded(
+    ValidateResponse(valid=False, status="invalid", expires_at=None, message="Invalid license")
+)
+
+
 async def validate_license(
     db: AsyncSession,
     body: ValidateRequest,
@@ -181,44 +340,32 @@ async def validate_license(
     """
     # 1. Verify signature and timestamp
     if not _check_timestamp_fresh(body.timestamp):
-        return ValidateResponse(
-            valid=False,
-            status="invalid",
-            expires_at=None,
-            message="Request expired or invalid timestamp",
+        return _REQUEST_EXPIRED
+    with validation_stage("signature"):
+        signature_ok = verify_validation_signature(
+            body.license_key, body.app_id, body.timestamp, body.signature
         )
-    if not verify_validation_signature(
-        body.license_key, body.app_id, body.timestamp, body.signature
-    ):
+    if not signature_ok:
         await _log_validation(db, None, ip_address, "fail", "Invalid signature")
-        return ValidateResponse(
-            valid=False,
-            status="invalid",
-            expires_at=None,
-            message="Invalid request",
-        )
+        return _INVALID_REQUEST
 
-    key_hash = hash_license_key(body.license_key)
-    result = await db.execute(
-        select(License).where(License.license_key_hash == key_hash).limit(1)
-    )
-    license_ = result.scalar_one_or_none()
+    with validation_stage("lookup"):
+        key_hash = license_key_digest(body.license_key)
+        result = await db.execute(
+            select(License).where(License.license_key_hash == key_hash).limit(1)
+        )
+        license_ = result.scalar_one_or_none()
 
     if not license_:
         await _log_validation(db, None, ip_address, "fail", "License not found")
-        return ValidateResponse(
-            valid=False,
-            status="invalid",
-            expires_at=None,
-            message="Invalid license",
-        )
+        return _INVALID_LICENSE
 
     # 2. Check status and expiry
     expiry_dt = datetime.combine(license_.expiry_date, datetime.min.time())
     expiry_dt = expiry_dt.replace(tzinfo=timezone.utc)
     now = datetime.now(timezone.utc)
     if now > expiry_dt:
-        await _log_validation(db, license_.id, ip_address, "fail", "License expired")
+        await _log_validation(db, license_, ip_address, "fail", "License expired")
         return ValidateResponse(
             valid=False,
             status="expired",
@@ -226,7 +373,7 @@ async def validate_license(
             message="License has expired",
         )
     if license_.status == "inactive":
-        await _log_validation(db, license_.id, ip_address, "fail", "License inactive")
+        await _log_validation(db, license_, ip_address, "fail", "License inactive")
         return ValidateResponse(
             valid=False,
             status="inactive",
@@ -234,7 +381,7 @@ async def validate_license(
             message="License is inactive",
         )
     if license_.status == "suspended":
-        await _log_validation(db, license_.id, ip_address, "fail", "License suspended")
+        await _log_validation(db, license_, ip_address, "fail", "License suspended")
         return ValidateResponse(
             valid=False,
             status="suspended",
@@ -242,7 +389,7 @@ async def validate_license(
             message="License is suspended",
         )
     if license_.status == "pending":
-        await _log_validation(db, license_.id, ip_address, "success", None)
+        await _log_validation(db, license_, ip_address, "success", None)
         return ValidateResponse(
             valid=False,
             status="pending",
@@ -251,7 +398,7 @@ async def validate_license(
         )
 
     # status == "active"
-    await _log_validation(db, license_.id, ip_address, "success", None)
+    await _log_validation(db, license_, ip_address, "success", None)
     return ValidateResponse(
         valid=True,
         status="active",
@@ -262,19 +409,57 @@ async def validate_license(
 
 async def _log_validation(
     db: AsyncSession,
-    license_id: UUID | None,
+    license_: License | None,
     ip_address: str | None,
     result: str,
     error_reason: str | None,
 ) -> None:
-    """Insert a validation_log row."""
-    if license_id is None:
-        return  # We don't have a license id for "not found" cases; could use a sentinel
-    log = ValidationLog(
-        license_id=license_id,
-        ip_address=ip_address,
-        result=result,
-        error_reason=error_reason,
+    """Insert a validation_log row; license-less failures are only counted in aggregate.
+
+    With log dedup on, a repeat of a recent identical validation increments that row's
+    repeat_count instead (one UPDATE by primary key). Every attempt is also published to
+    live audit streams (no-op without subscribers).
+    """
+    audit_broadcaster.publish(
+        {
+            "validated_at": datetime.now(timezone.utc).replace(tzinfo=None).isoformat(),
+            "license_id": str(license_.id) if license_ else None,
+            "app_name": license_.app_name if license_ else None,
+            "client_name": license_.client_name if license_ else None,
+            "ip_address": ip_address,
+            "result": result,
+            "error_reason": error_reason,
+        }
     )
-    db.add(log)
-    await db.flush()
+    if license_ is None:
+        failure_aggregator.record(ip_address, error_reason)
+        return
+    license_id = license_.id
+    ip_cardinality.record(license_id, ip_address)
+    with validation_stage("log_write"):
+        key = (license_id, ip_address, result, error_reason)
+        if log_dedup.enabled:
+            row_id = log_dedup.row_for(key)
+            if row_id is not None:
+                updated = await db.execute(
+                    update(ValidationLog)
+                    .where(ValidationLog.id == row_id)
+                    .values(
+                        repeat_count=ValidationLog.repeat_count + 1,
+                        last_seen_at=func.now(),
+                    )
+                    .execution_options(synchronize_session=False)
+                )
+                if updated.rowcount:
+                    return
+                log_dedup.forget(key)  # rolled back or deleted; start a new row
+        log = ValidationLog(
+            license_id=license_id,
+            ip_address=ip_address,
+            result=result,
+            error_reason=error_reason,
+        )
+        db.add(log)
+        await db.flush()
+        if log_dedup.enabled:
+            log_dedup.remember(key, log.id)
@@ -0,0 +1,286 @@
+"""Archive closed days of validation_logs to local files and query them without the DB.
+
+An archive directory holds one file per UTC day, validation_logs-YYYY-MM-DD.ndjson.gz, with
+the day's rows sorted by (license_id, validated_at) and written as independent gzip members
+of up to block_rows rows each (together still a valid .gz stream, so zcat and gzip.open
+read a whole file). manifest.json records, per file, each block's byte offset, length,
+row count, license_id range and validated_at range.
+
+ArchiveReader memory-maps a file and decompresses only the blocks whose license and time
+ranges can hold matches, so a per-license query reads a few blocks of each day it spans.
+Rows are deleted from the database only after their file and the manifest entry are on
+disk, by the ids read back from the archive.
+"""
+
+import gzip
+import json
+import mmap
+import os
+from collections.abc import Iterable, Iterator
+from datetime import date, datetime, time, timedelta
+from itertools import islice
+from pathlib import Path
+from uuid import UUID
+
+from sqlalchemy import delete, func, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.core.config import settings
+from app.core.database import async_session_maker
+from app.models.validation_log import ValidationLog
+
+MANIFEST = "manifest.json"
+FORMAT_VERSION = 1
+DELETE_BATCH = 1000
+
+_COLUMNS = (
+    ValidationLog.id,
+    ValidationLog.license_id,
+    ValidationLog.validated_at,
+    ValidationLog.ip_address,
+    ValidationLog.result,
+    ValidationLog.error_reason,
+    ValidationLog.repeat_count,
+    ValidationLog.last_seen_at,
+)
+_TIME_FIELDS = ("validated_at", "last_seen_at")
+
+
+def _iso(value: datetime | None) -> str | None:
+    # Fixed width, so timestamps compare correctly as strings in the manifest
+    return None if value is None else value.isoformat(timespec="microseconds")
+
+
+def _encode(row) -> dict:
+    return {
+        "id": str(row.id),
+        "license_id": str(row.license_id),
+        "validated_at": _iso(row.validated_at),
+        "ip_address": row.ip_address,
+        "result": row.result,
+        "error_reason": row.error_reason,
+        "repeat_count": row.repeat_count,
+        "last_seen_at": _iso(row.last_seen_at),
+    }
+
+
+def _decode(record: dict) -> dict:
+    for field in _TIME_FIELDS:
+        if record[field] is not None:
+            record[field] = datetime.fromisoformat(record[field])
+    return record
+
+
+def file_name(day: date) -> str:
+    return f"validation_logs-{day.isoformat()}.ndjson.gz"
+
+
+def load_manifest(archive_dir: Path) -> dict:
+    path = archive_dir / MANIFEST
+    if not path.exists():
+        return {"version": FORMAT_VERSION, "files": []}
+    return json.loads(path.read_text())
+
+
+def _write_atomic(path: Path, data: bytes) -> None:
+    tmp = path.with_name(path.name + ".tmp")
+    with open(tmp, "wb") as fh:
+        fh.write(data)
+        fh.flush()
+        os.fsync(fh.fileno())
+    os.replace(tmp, path)
+
+
+class _BlockWriter:
+    """Writes records as gzip members of at most block_rows lines and indexes each one."""
+
+    def __init__(self, fh, block_rows: int) -> None:
+        self.fh = fh
+        self.block_rows = block_rows
+        self.blocks: list[dict] = []
+        self.rows = 0
+        self._lines: list[bytes] = []
+        self._licenses: list[str] = []
+        self._times: list[str] = []
+
+    def add(self, record: dict) -> None:
+        self._lines.append(json.dumps(record, separators=(",", ":")).encode() + b"\n")
+        self._licenses.append(record["license_id"])
+        self._times.append(record["validated_at"])
+        if len(self._lines) >= self.block_rows:
+            self.flush_block()
+
+    def flush_block(self) -> None:
+        if not self._lines:
+            return
+        data = gzip.compress(b"".join(self._lines), mtime=0)
+        self.blocks.append(
+            {
+                "offset": self.fh.tell(),
+                "length": len(data),
+                "rows": len(self._lines),
+                "license_min": min(self._licenses),
+                "license_max": max(self._licenses),
+                "time_min": min(self._times),
+                "time_max": max(self._times),
+            }
+        )
+        self.fh.write(data)
+        self.rows += len(self._lines)
+        self._lines, self._licenses, self._times = [], [], []
+
+
+class ArchiveReader:
+    """Per-license history over an archive directory, reading only candidate blocks."""
+
+    def __init__(self, archive_dir: str | Path | None = None) -> None:
+        self.archive_dir = Path(archive_dir or settings.validation_log_archive_dir)
+        self.manifest = load_manifest(self.archive_dir)
+        self.blocks_read = 0  # for diagnostics: how much pruning left to decompress
+
+    def _read_blocks(self, entry: dict, blocks: list[dict]) -> Iterator[dict]:
+        with open(self.archive_dir / entry["file"], "rb") as fh:
+            with mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                for block in blocks:
+                    self.blocks_read += 1
+                    end = block["offset"] + block["length"]
+                    data = gzip.decompress(mm[block["offset"] : end])
+                    for line in data.splitlines():
+                        yield json.loads(line)
+
+    def records(self, entry: dict) -> Iterator[dict]:
+        """Every record of one archived file, in file order (undecoded)."""
+        return self._read_blocks(entry, entry["blocks"])
+
+    def history(
+        self,
+        license_id: UUID,
+        start: datetime | None = None,
+        end: datetime | None = None,
+        limit: int | None = None,
+    ) -> list[dict]:
+        """Archived entries for one license with start <= validated_at < end, newest first."""
+        lid = str(license_id)
+        lo, hi = _iso(start), _iso(end)
+        found = []
+        for entry in self.manifest["files"]:
+            if (lo and entry["end"] <= lo) or (hi and entry["start"] >= hi):
+                continue
+            blocks = [
+                b
+                for b in entry["blocks"]
+                if b["license_min"] <= lid <= b["license_max"]
+                and not (lo and b["time_max"] < lo)
+                and not (hi and b["time_min"] >= hi)
+            ]
+            for record in self._read_blocks(entry, blocks):
+                if record["license_id"] != lid:
+                    continue
+                if (lo and record["validated_at"] < lo) or (hi and record["validated_at"] >= hi):
+                    continue
+                found.append(record)
+        found.sort(key=lambda r: r["validated_at"], reverse=True)
+        return [_decode(r) for r in found[:limit]]
+
+
+async def _delete_rows(maker: async_sessionmaker[AsyncSession], ids: Iterable[UUID]) -> int:
+    """Delete by primary key in small committed batches (short locks, no range scan).
+
+    `ids` is consumed one batch at a time, so only DELETE_BATCH ids are held in memory.
+    """
+    deleted = 0
+    ids = iter(ids)
+    async with maker() as db:
+        while batch := list(islice(ids, DELETE_BATCH)):
+            result = await db.execute(
+                delete(ValidationLog)
+                .where(ValidationLog.id.in_(batch))
+                .execution_options(synchronize_session=False)
+            )
+            await db.commit()
+            deleted += result.rowcount
+    return deleted
+
+
+async def archive_day(
+    day: date,
+    archive_dir: str | Path | None = None,
+    session_maker: async_sessionmaker[AsyncSession] | None = None,
+    block_rows: int | None = None,
+    delete_rows: bool = True,
+) -> dict | None:
+    """Export one UTC day of validation_logs, then delete the exported rows.
+
+    Returns the manifest entry, or None if the day had no rows. Re-running for a day that
+    is already in the manifest only deletes rows left behind by an interrupted run.
+    """
+    archive_dir = Path(archive_dir or settings.validation_log_archive_dir)
+    archive_dir.mkdir(parents=True, exist_ok=True)
+    maker = session_maker or async_session_maker
+    block_rows = block_rows or settings.validation_log_archive_block_rows
+    name = file_name(day)
+    manifest = load_manifest(archive_dir)
+    entry = next((f for f in manifest["files"] if f["file"] == name), None)
+
+    if entry is None:
+        start = datetime.combine(day, time.min)
+        end = start + timedelta(days=1)
+        tmp = archive_dir / (name + ".tmp")
+        async with maker() as db:
+            result = await db.stream(
+                select(*_COLUMNS)
+                .where(ValidationLog.validated_at >= start, ValidationLog.validated_at < end)
+                .order_by(ValidationLog.license_id, ValidationLog.validated_at)
+                .execution_options(yield_per=block_rows)
+            )
+            with open(tmp, "wb") as fh:
+                writer = _BlockWriter(fh, block_rows)
+                async for row in result:
+                    writer.add(_encode(row))
+                writer.flush_block()
+                fh.flush()
+                os.fsync(fh.fileno())
+        if not writer.rows:
+            tmp.unlink()
+            return None
+        os.replace(tmp, archive_dir / name)
+        entry = {
+            "file": name,
+            "start": _iso(start),
+            "end": _iso(end),
+            "rows": writer.rows,
+            "blocks": writer.blocks,
+        }
+        manifest["files"].append(entry)
+        manifest["files"].sort(key=lambda f: f["start"])
+        _write_atomic(archive_dir / MANIFEST, json.dumps(manifest, indent=1).encode())
+
+    if delete_rows:
+        # Ids are read back from the archive block by block while deleting, never all at once
+        ids = (UUID(r["id"]) for r in ArchiveReader(archive_dir).records(entry))
+        await _delete_rows(maker, ids)
+    return entry
+
+
+async def archive_before(
+    before: date,
+    archive_dir: str | Path | None = None,
+    session_maker: async_sessionmaker[AsyncSession] | None = None,
+    delete_rows: bool = True,
+) -> list[dict]:
+    """Archive every day older than `before` (exclusive) that still has rows."""
+    maker = session_maker or async_session_maker
+    async with maker() as db:
+        oldest = await db.scalar(
+            select(func.min(ValidationLog.validated_at)).where(
+                ValidationLog.validated_at < datetime.combine(before, time.min)
+            )
+        )
+    entries = []
+    day = oldest.date() if oldest else before
+    while day < before:
+        entry = await archive_day(day, archive_dir, maker, delete_rows=delete_rows)
+        if entry is not None:
+            entries.append(entry)
+        day += timedelta(days=1)
+    return entries
@@ -0,0 +1,58 @@
+"""Collapse repeated identical validations into one validation_logs row.
+
+A client that validates the same key from the same IP with the same outcome over and over
+would otherwise write one row per call. With validation_log_dedup_seconds > 0, this worker
+remembers which row it last inserted for each (license, IP, result, reason); a repeat
+within the window (measured from that row's first validation) is a single
+UPDATE ... SET repeat_count = repeat_count + 1, last_seen_at = now() by primary key, and
+only a miss (new combination, expired window, or row gone) inserts. Each worker keeps its
+own rows, so counts stay exact: history shows one row per worker and window instead of
+one per call.
+"""
+
+import time
+from uuid import UUID
+
+from app.core.config import settings
+
+DedupKey = tuple[UUID, str | None, str, str | None]
+
+
+class ValidationLogDedup:
+    """(license, IP, result, reason) -> (row id, first seen) for the current window."""
+
+    def __init__(self) -> None:
+        self._rows: dict[DedupKey, tuple[UUID, float]] = {}
+
+    @property
+    def enabled(self) -> bool:
+        return settings.validation_log_dedup_seconds > 0
+
+    def row_for(self, key: DedupKey, now: float | None = None) -> UUID | None:
+        """Row that should absorb this repeat, or None if a new row is needed."""
+        entry = self._rows.get(key)
+        if entry is None:
+            return None
+        now = time.monotonic() if now is None else now
+        if now - entry[1] >= settings.validation_log_dedup_seconds:
+            del self._rows[key]
+            return None
+        return entry[0]
+
+    def remember(self, key: DedupKey, row_id: UUID, now: float | None = None) -> None:
+        now = time.monotonic() if now is None else now
+        if key not in self._rows and len(self._rows) >= settings.validation_log_dedup_max_keys:
+            horizon = now - settings.validation_log_dedup_seconds
+            self._rows = {k: v for k, v in self._rows.items() if v[1] > horizon}
+            if len(self._rows) >= settings.validation_log_dedup_max_keys:
+                self._rows.clear()  # only costs extra rows, never lost counts
+        self._rows[key] = (row_id, now)
+
+    def forget(self, key: DedupKey) -> None:
+        self._rows.pop(key, None)
+
+    def clear(self) -> None:
+        self._rows.clear()
+
+
+log_dedup = ValidationLogDedup()
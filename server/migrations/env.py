@@ -17,7 +17,14 @@ from sqlalchemy.engine import Connection
 
 from app.core.config import settings
 from app.core.database import Base
-from app.models import Admin, Application, License, ValidationLog  # noqa: F401 — register models
+from app.models import (  # noqa: F401 — register models
+    Admin,
+    Application,
+    License,
+    LicenseIPSketch,
+    ValidationFailureCount,
+    ValidationLog,
+)
 
 config = context.config
 if config.config_file_name is not None:
@@ -0,0 +1,96 @@
+"""Binary license key hash, step 1 (online): add BYTEA column, backfill, index concurrently.
+
+Safe to run while the previous app version is serving traffic:
+- a trigger keeps license_key_hash_bin in sync for rows the running app inserts/updates,
+- existing rows are backfilled in small committed batches (short row locks only),
+- the unique index is built with CREATE INDEX CONCURRENTLY (no write lock on licenses).
+
+Step 2 (003) swaps the columns and must be deployed together with the app version that
+reads/writes license_key_hash as 32-byte digests.
+
+Revision ID: 002_key_hash_bin_backfill
+Revises: 001_initial
+Create Date: 2026-10-19
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = "002_key_hash_bin_backfill"
+down_revision: Union[str, None] = "001_initial"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BATCH_SIZE = 5000
+
+
+def _backfill_in_batches(conn) -> None:
+    """Each batch commits on its own (autocommit block), so row locks are held briefly."""
+    while True:
+        updated = conn.execute(
+            sa.text(
+                """
+                UPDATE licenses SET license_key_hash_bin = decode(license_key_hash, 'hex')
+                WHERE id IN (
+                    SELECT id FROM licenses WHERE license_key_hash_bin IS NULL
+                    LIMIT :batch
+                )
+                """
+            ),
+            {"batch": BATCH_SIZE},
+        ).rowcount
+        if not updated:
+            break
+
+
+def upgrade() -> None:
+    op.add_column("licenses", sa.Column("license_key_hash_bin", sa.LargeBinary(32), nullable=True))
+    op.execute(
+        """
+        CREATE FUNCTION licenses_sync_key_hash_bin() RETURNS trigger AS $$
+        BEGIN
+            NEW.license_key_hash_bin := decode(NEW.license_key_hash, 'hex');
+            RETURN NEW;
+        END
+        $$ LANGUAGE plpgsql
+        """
+    )
+    op.execute(
+        """
+        CREATE TRIGGER licenses_sync_key_hash_bin
+        BEFORE INSERT OR UPDATE ON licenses
+        FOR EACH ROW EXECUTE FUNCTION licenses_sync_key_hash_bin()
+        """
+    )
+
+    with op.get_context().autocommit_block():
+        if op.get_context().as_sql:
+            # Offline (--sql) script cannot loop: one statement; run online for batching
+            op.execute(
+                "UPDATE licenses SET license_key_hash_bin = decode(license_key_hash, 'hex') "
+                "WHERE license_key_hash_bin IS NULL"
+            )
+        else:
+            _backfill_in_batches(op.get_bind())
+        op.execute(
+            "CREATE UNIQUE INDEX CONCURRENTLY ix_licenses_license_key_hash_bin "
+            "ON licenses (license_key_hash_bin)"
+        )
+        # NOT VALID + VALIDATE scans without blocking writes; 003 then sets NOT NULL
+        # without a second full-table scan under an exclusive lock
+        op.execute(
+            "ALTER TABLE licenses ADD CONSTRAINT ck_licenses_key_hash_bin_not_null "
+            "CHECK (license_key_hash_bin IS NOT NULL) NOT VALID"
+        )
+        op.execute("ALTER TABLE licenses VALIDATE CONSTRAINT ck_licenses_key_hash_bin_not_null")
+
+
+def downgrade() -> None:
+    op.execute("ALTER TABLE licenses DROP CONSTRAINT IF EXISTS ck_licenses_key_hash_bin_not_null")
+    op.execute("DROP INDEX IF EXISTS ix_licenses_license_key_hash_bin")
+    op.execute("DROP TRIGGER IF EXISTS licenses_sync_key_hash_bin ON licenses")
+    op.execute("DROP FUNCTION IF EXISTS licenses_sync_key_hash_bin()")
+    # After a 003 downgrade the column is already gone
+    op.execute("ALTER TABLE licenses DROP COLUMN IF EXISTS license_key_hash_bin")
@@ -0,0 +1,47 @@
+"""Binary license key hash, step 2: swap the BYTEA column in as licenses.license_key_hash.
+
+Metadata-only changes under one short ACCESS EXCLUSIVE lock (SET NOT NULL is satisfied by
+the constraint validated in 002, so no table scan). Deploy with the app version that
+stores license_key_hash as a 32-byte digest.
+
+Revision ID: 003_key_hash_bin_swap
+Revises: 002_key_hash_bin_backfill
+Create Date: 2026-10-19
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = "003_key_hash_bin_swap"
+down_revision: Union[str, None] = "002_key_hash_bin_backfill"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute("LOCK TABLE licenses IN ACCESS EXCLUSIVE MODE")
+    # Rows written between the end of 002 and this lock were covered by the trigger
+    op.execute("DROP TRIGGER licenses_sync_key_hash_bin ON licenses")
+    op.execute("DROP FUNCTION licenses_sync_key_hash_bin()")
+    op.alter_column("licenses", "license_key_hash_bin", nullable=False)
+    op.execute("ALTER TABLE licenses DROP CONSTRAINT ck_licenses_key_hash_bin_not_null")
+    op.drop_index(op.f("ix_licenses_license_key_hash"), table_name="licenses")
+    op.drop_column("licenses", "license_key_hash")
+    op.alter_column("licenses", "license_key_hash_bin", new_column_name="license_key_hash")
+    op.execute(
+        "ALTER INDEX ix_licenses_license_key_hash_bin RENAME TO ix_licenses_license_key_hash"
+    )
+
+
+def downgrade() -> None:
+    op.add_column("licenses", sa.Column("license_key_hash_hex", sa.String(64), nullable=True))
+    op.execute("UPDATE licenses SET license_key_hash_hex = encode(license_key_hash, 'hex')")
+    op.alter_column("licenses", "license_key_hash_hex", nullable=False)
+    op.drop_index(op.f("ix_licenses_license_key_hash"), table_name="licenses")
+    op.drop_column("licenses", "license_key_hash")
+    op.alter_column("licenses", "license_key_hash_hex", new_column_name="license_key_hash")
+    op.create_index(
+        op.f("ix_licenses_license_key_hash"), "licenses", ["license_key_hash"], unique=True
+    )
@@ -0,0 +1,67 @@
+"""Compact validation_logs: result/reason as SMALLINT codes, ip_address as INET.
+
+Codes are app.models.validation_log.ValidationResult / ValidationReason. error_reason is
+renamed to reason; free-text reasons that are not one of the known labels become NULL.
+
+The three type changes run as one ALTER TABLE, i.e. a single rewrite of validation_logs
+under an ACCESS EXCLUSIVE lock: validation inserts wait for it. On a large table run it in
+a low-traffic window.
+
+Revision ID: 004_validation_log_compact
+Revises: 003_key_hash_bin_swap
+Create Date: 2026-10-19
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+revision: str = "004_validation_log_compact"
+down_revision: Union[str, None] = "003_key_hash_bin_swap"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Frozen copies of the enums at this revision (migrations must not import app code)
+RESULTS = {"success": 1, "fail": 2}
+REASONS = {
+    "Invalid signature": 1,
+    "License not found": 2,
+    "License expired": 3,
+    "License inactive": 4,
+    "License suspended": 5,
+}
+
+
+def _case(column: str, mapping: dict, to_code: bool) -> str:
+    if to_code:
+        whens = " ".join(f"WHEN '{label}' THEN {code}" for label, code in mapping.items())
+    else:
+        whens = " ".join(f"WHEN {code} THEN '{label}'" for label, code in mapping.items())
+    return f"CASE {column} {whens} END"
+
+
+def upgrade() -> None:
+    op.execute(
+        f"""
+        ALTER TABLE validation_logs
+            ALTER COLUMN result TYPE smallint USING {_case("result", RESULTS, True)},
+            ALTER COLUMN error_reason TYPE smallint USING {_case("error_reason", REASONS, True)},
+            ALTER COLUMN ip_address TYPE inet USING CASE
+                WHEN ip_address ~ '^[0-9]{{1,3}}(\\.[0-9]{{1,3}}){{3}}$'
+                  OR ip_address ~ '^[0-9a-fA-F:.]*:[0-9a-fA-F:.]*$'
+                THEN ip_address::inet END
+        """
+    )
+    op.alter_column("validation_logs", "error_reason", new_column_name="reason")
+
+
+def downgrade() -> None:
+    op.alter_column("validation_logs", "reason", new_column_name="error_reason")
+    op.execute(
+        f"""
+        ALTER TABLE validation_logs
+            ALTER COLUMN result TYPE varchar(16) USING {_case("result", RESULTS, False)},
+            ALTER COLUMN error_reason TYPE text USING {_case("error_reason", REASONS, False)},
+            ALTER COLUMN ip_address TYPE varchar(45) USING host(ip_address)
+        """
+    )
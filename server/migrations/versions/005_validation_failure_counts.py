@@ -0,0 +1,32 @@
+"""validation_failure_counts: per-minute aggregates of license-less validation failures.
+
+Revision ID: 005_validation_failure_counts
+Revises: 004_validation_log_compact
+Create Date: 2026-10-19
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision: str = "005_validation_failure_counts"
+down_revision: Union[str, None] = "004_validation_log_compact"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "validation_failure_counts",
+        sa.Column("minute", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("ip_prefix", postgresql.CIDR(), nullable=False),
+        sa.Column("reason", sa.SmallInteger(), nullable=False),
+        sa.Column("count", sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint("minute", "ip_prefix", "reason"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("validation_failure_counts")
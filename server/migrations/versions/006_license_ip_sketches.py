@@ -0,0 +1,33 @@
+"""license_ip_sketches: per-license HyperLogLog sketches of distinct client IPs.
+
+Revision ID: 006_license_ip_sketches
+Revises: 005_validation_failure_counts
+Create Date: 2026-10-19
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision: str = "006_license_ip_sketches"
+down_revision: Union[str, None] = "005_validation_failure_counts"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "license_ip_sketches",
+        sa.Column("license_id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("period", sa.String(8), nullable=False),
+        sa.Column("period_start", sa.Date(), nullable=False),
+        sa.Column("registers", sa.LargeBinary(), nullable=False),
+        sa.ForeignKeyConstraint(["license_id"], ["licenses.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("license_id", "period", "period_start"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("license_ip_sketches")
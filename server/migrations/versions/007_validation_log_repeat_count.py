@@ -0,0 +1,31 @@
+"""validation_logs: repeat_count and last_seen_at for collapsed repeated validations.
+
+Both columns are added without a table rewrite (constant default / nullable).
+
+Revision ID: 007_validation_log_repeat_count
+Revises: 006_license_ip_sketches
+Create Date: 2026-10-19
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = "007_validation_log_repeat_count"
+down_revision: Union[str, None] = "006_license_ip_sketches"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "validation_logs",
+        sa.Column("repeat_count", sa.Integer(), server_default="1", nullable=False),
+    )
+    op.add_column("validation_logs", sa.Column("last_seen_at", sa.DateTime(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column("validation_logs", "last_seen_at")
+    op.drop_column("validation_logs", "repeat_count")
@@ -0,0 +1,36 @@
+"""validation_logs: index on validated_at for archiving by day (and time-range queries).
+
+Built with CREATE INDEX CONCURRENTLY so it can run while the app is writing logs.
+
+Revision ID: 008_validation_logs_time_idx
+Revises: 007_validation_log_repeat_count
+Create Date: 2026-10-19
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+revision: str = "008_validation_logs_time_idx"
+down_revision: Union[str, None] = "007_validation_log_repeat_count"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_validation_logs_validated_at",
+            "validation_logs",
+            ["validated_at"],
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            "ix_validation_logs_validated_at",
+            table_name="validation_logs",
+            postgresql_concurrently=True,
+        )
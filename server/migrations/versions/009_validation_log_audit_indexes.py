@@ -0,0 +1,77 @@
+"""validation_logs: indexes for audit filters (license, result, reason, client IP / CIDR).
+
+All built with CREATE INDEX CONCURRENTLY (no write lock). The (license_id, validated_at)
+index replaces the single-column license_id one: it serves the same lookups (and the FK
+cascade) and also the per-license history ordered by time. IP / CIDR containment uses a
+GiST index on (ip_address inet_ops, validated_at), which needs btree_gist for the
+timestamp column, so a CIDR filter combined with a time range is one index scan.
+
+Revision ID: 009_validation_log_audit_idx
+Revises: 008_validation_logs_time_idx
+Create Date: 2026-10-19
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = "009_validation_log_audit_idx"
+down_revision: Union[str, None] = "008_validation_logs_time_idx"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute("CREATE EXTENSION IF NOT EXISTS btree_gist")
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_validation_logs_license_id_validated_at",
+            "validation_logs",
+            ["license_id", "validated_at"],
+            postgresql_concurrently=True,
+        )
+        op.create_index(
+            "ix_validation_logs_result_validated_at",
+            "validation_logs",
+            ["result", "validated_at"],
+            postgresql_concurrently=True,
+        )
+        op.create_index(
+            "ix_validation_logs_reason_validated_at",
+            "validation_logs",
+            ["reason", "validated_at"],
+            postgresql_where=sa.text("reason IS NOT NULL"),
+            postgresql_concurrently=True,
+        )
+        op.create_index(
+            "ix_validation_logs_ip_address_validated_at",
+            "validation_logs",
+            ["ip_address", "validated_at"],
+            postgresql_using="gist",
+            postgresql_ops={"ip_address": "inet_ops"},
+            postgresql_concurrently=True,
+        )
+        op.drop_index(
+            "ix_validation_logs_license_id",
+            table_name="validation_logs",
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_validation_logs_license_id",
+            "validation_logs",
+            ["license_id"],
+            postgresql_concurrently=True,
+        )
+        for name in (
+            "ix_validation_logs_ip_address_validated_at",
+            "ix_validation_logs_reason_validated_at",
+            "ix_validation_logs_result_validated_at",
+            "ix_validation_logs_license_id_validated_at",
+        ):
+            op.drop_index(name, table_name="validation_logs", postgresql_concurrently=True)
+    # btree_gist is left installed: other objects may depend on it
@@ -0,0 +1,79 @@
+"""
+Archive old validation_logs to local files, or query archived history for one license.
+
+`archive` exports every UTC day older than the retention (VALIDATION_LOG_RETENTION_DAYS,
+or --older-than-days) to VALIDATION_LOG_ARCHIVE_DIR as block-gzipped NDJSON plus a
+manifest, then deletes the exported rows. Safe to re-run: archived days are skipped and
+rows left by an interrupted run are deleted. `history` reads the archive only (no DB).
+
+Run from server directory:
+  python -m scripts.archive_validation_logs archive --older-than-days 90
+  python -m scripts.archive_validation_logs history <license-id> --from 2026-01-01 --to 2026-02-01
+"""
+import argparse
+import asyncio
+import os
+import sys
+from datetime import date, datetime, timedelta, timezone
+from uuid import UUID
+
+_server_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if _server_dir not in sys.path:
+    sys.path.insert(0, _server_dir)
+
+from app.core.config import settings  # noqa: E402
+from app.core.database import engine  # noqa: E402
+from app.services.log_archive import ArchiveReader, archive_before  # noqa: E402
+
+
+async def _archive(older_than_days: int, archive_dir: str, keep_rows: bool) -> None:
+    # At least one full day back, so the dedup window can no longer touch archived rows
+    before = datetime.now(timezone.utc).date() - timedelta(days=max(older_than_days, 1))
+    entries = await archive_before(before, archive_dir, delete_rows=not keep_rows)
+    await engine.dispose()
+    for entry in entries:
+        print(f"{entry['file']}: {entry['rows']} rows in {len(entry['blocks'])} blocks")
+    print(f"Archived {len(entries)} day(s) before {before} to {archive_dir}")
+
+
+def _history(license_id: UUID, start: date | None, end: date | None, archive_dir: str) -> None:
+    reader = ArchiveReader(archive_dir)
+    records = reader.history(
+        license_id,
+        start=datetime.combine(start, datetime.min.time()) if start else None,
+        end=datetime.combine(end, datetime.min.time()) if end else None,
+    )
+    for r in records:
+        repeats = f" x{r['repeat_count']}" if r["repeat_count"] > 1 else ""
+        print(
+            f"{r['validated_at']:%Y-%m-%d %H:%M:%S}  {r['ip_address'] or '-':<39} "
+            f"{r['result']:<7} {r['error_reason'] or ''}{repeats}"
+        )
+    total = sum(len(f["blocks"]) for f in reader.manifest["files"])
+    print(f"{len(records)} entries; decompressed {reader.blocks_read} of {total} blocks")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--dir", default=settings.validation_log_archive_dir)
+    sub = parser.add_subparsers(dest="command", required=True)
+    archive = sub.add_parser("archive")
+    archive.add_argument(
+        "--older-than-days", type=int, default=settings.validation_log_retention_days
+    )
+    archive.add_argument(
+        "--keep-rows", action="store_true", help="export only, do not delete from the DB"
+    )
+    history = sub.add_parser("history")
+    history.add_argument("license_id", type=UUID)
+    history.add_argument("--from", dest="start", type=date.fromisoformat)
+    history.add_argument("--to", dest="end", type=date.fromisoformat)
+    args = parser.parse_args()
+    if args.command == "archive":
+        asyncio.run(_archive(args.older_than_days, args.dir, args.keep_rows))
+    else:
+        _history(args.license_id, args.start, args.end, args.dir)
+
+
+if __name__ == "__main__":
+    main()
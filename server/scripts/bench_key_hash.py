@@ -0,0 +1,93 @@
+"""
+Compare hex (VARCHAR(64)) and binary (BYTEA, 32 bytes) license key hash storage on PostgreSQL.
+
+Builds two scratch tables with the same N SHA256 hashes, one per representation, each with
+a unique b-tree index, then reports table/index size and point-lookup latency (the query
+validate runs). Uses DATABASE_URL; the tables are TEMP, so nothing is left behind.
+
+Run from server directory:
+  python -m scripts.bench_key_hash --rows 2000000 --lookups 20000
+"""
+import argparse
+import asyncio
+import hashlib
+import os
+import random
+import sys
+import time
+from statistics import quantiles
+
+_server_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if _server_dir not in sys.path:
+    sys.path.insert(0, _server_dir)
+
+from sqlalchemy import text  # noqa: E402
+
+from app.core.database import engine  # noqa: E402
+
+VARIANTS = {
+    "hex": ("varchar(64)", "encode(sha256(('LIC-BENCH-' || g)::bytea), 'hex')"),
+    "bytea": ("bytea", "sha256(('LIC-BENCH-' || g)::bytea)"),
+}
+
+
+def _key_param(variant: str, n: int):
+    digest = hashlib.sha256(f"LIC-BENCH-{n}".encode()).digest()
+    return digest.hex() if variant == "hex" else digest
+
+
+async def _run(rows: int, lookups: int) -> None:
+    async with engine.connect() as conn:
+        results = {}
+        for variant, (col_type, expr) in VARIANTS.items():
+            table = f"bench_key_hash_{variant}"
+            await conn.execute(text(f"CREATE TEMP TABLE {table} (id bigint, key_hash {col_type})"))
+            await conn.execute(
+                text(f"INSERT INTO {table} SELECT g, {expr} FROM generate_series(1, :n) g"),
+                {"n": rows},
+            )
+            await conn.execute(text(f"CREATE UNIQUE INDEX {table}_idx ON {table} (key_hash)"))
+            await conn.execute(text(f"ANALYZE {table}"))
+            sizes = (
+                await conn.execute(
+                    text(
+                        "SELECT pg_relation_size(:t), pg_relation_size(:i), "
+                        "pg_size_pretty(pg_relation_size(:t)), "
+                        "pg_size_pretty(pg_relation_size(:i))"
+                    ),
+                    {"t": table, "i": f"{table}_idx"},
+                )
+            ).one()
+
+            stmt = text(f"SELECT id FROM {table} WHERE key_hash = :k LIMIT 1")
+            sample = [random.randint(1, rows) for _ in range(lookups)]
+            for n in sample[: min(1000, lookups)]:  # warm the index into shared buffers
+                await conn.execute(stmt, {"k": _key_param(variant, n)})
+            timings = []
+            for n in sample:
+                k = _key_param(variant, n)
+                start = time.perf_counter()
+                await conn.execute(stmt, {"k": k})
+                timings.append((time.perf_counter() - start) * 1000)
+            q = quantiles(timings, n=100)
+            results[variant] = (sizes, q[49], q[98])
+
+        print(f"rows={rows} lookups={lookups}")
+        print(f"{'column':<8} {'table':>10} {'index':>10} {'p50 ms':>8} {'p99 ms':>8}")
+        for variant, (sizes, p50, p99) in results.items():
+            print(f"{variant:<8} {sizes[2]:>10} {sizes[3]:>10} {p50:>8.3f} {p99:>8.3f}")
+        hex_idx, bin_idx = results["hex"][0][1], results["bytea"][0][1]
+        print(f"index size bytea/hex: {bin_idx / hex_idx:.2f}")
+    await engine.dispose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--lookups", type=int, default=10_000)
+    args = parser.parse_args()
+    asyncio.run(_run(args.rows, args.lookups))
+
+
+if __name__ == "__main__":
+    main()
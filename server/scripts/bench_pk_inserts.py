@@ -0,0 +1,99 @@
+"""
+Insert throughput, primary-key index size and WAL volume: uuid4 vs uuid7 keys on PostgreSQL.
+
+Creates two scratch tables shaped like validation_logs (one per key generator), inserts
+the same number of rows into each in batches, and reports rows/s, table and pkey size and
+WAL bytes written. Both tables are dropped afterwards. Uses DATABASE_URL.
+
+Existing validation_logs rows keep their uuid4 ids (same column type, no DDL); once most
+of the table was written with uuid7, `REINDEX INDEX CONCURRENTLY validation_logs_pkey`
+compacts the older, split-heavy part of the index.
+
+Run from server directory:
+  python -m scripts.bench_pk_inserts --rows 1000000 --batch 1000
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+import uuid
+
+_server_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if _server_dir not in sys.path:
+    sys.path.insert(0, _server_dir)
+
+from sqlalchemy import text  # noqa: E402
+
+from app.core.database import engine  # noqa: E402
+from app.models.base import uuid7  # noqa: E402
+
+GENERATORS = {"uuid4": uuid.uuid4, "uuid7": uuid7}
+
+
+async def _bench(variant: str, rows: int, batch: int) -> tuple[float, str, str, int]:
+    table = f"bench_pk_{variant}"
+    gen = GENERATORS[variant]
+    async with engine.begin() as conn:
+        await conn.execute(text(f"DROP TABLE IF EXISTS {table}"))
+        await conn.execute(
+            text(
+                f"CREATE TABLE {table} (id uuid PRIMARY KEY, license_id uuid NOT NULL, "
+                "validated_at timestamp NOT NULL DEFAULT now(), ip_address varchar(45), "
+                "result varchar(16) NOT NULL)"
+            )
+        )
+    license_id = uuid.uuid4()
+    insert = text(
+        f"INSERT INTO {table} (id, license_id, ip_address, result) VALUES (:id, :l, :ip, :r)"
+    )
+    async with engine.connect() as conn:
+        wal_start = (await conn.execute(text("SELECT pg_current_wal_insert_lsn()"))).scalar()
+        await conn.commit()
+        start = time.perf_counter()
+        for offset in range(0, rows, batch):
+            params = [
+                {"id": gen(), "l": license_id, "ip": "203.0.113.7", "r": "success"}
+                for _ in range(min(batch, rows - offset))
+            ]
+            await conn.execute(insert, params)
+            await conn.commit()
+        elapsed = time.perf_counter() - start
+        wal_bytes = (
+            await conn.execute(
+                text("SELECT pg_wal_lsn_diff(pg_current_wal_insert_lsn(), :s)"), {"s": wal_start}
+            )
+        ).scalar()
+        sizes = (
+            await conn.execute(
+                text(
+                    "SELECT pg_size_pretty(pg_relation_size(:t)), "
+                    "pg_size_pretty(pg_relation_size(:i))"
+                ),
+                {"t": table, "i": f"{table}_pkey"},
+            )
+        ).one()
+        await conn.execute(text(f"DROP TABLE {table}"))
+        await conn.commit()
+    return rows / elapsed, sizes[0], sizes[1], int(wal_bytes)
+
+
+async def _run(rows: int, batch: int) -> None:
+    print(f"rows={rows} batch={batch}")
+    print(f"{'key':<6} {'rows/s':>10} {'table':>10} {'pkey':>10} {'WAL MB':>8}")
+    for variant in GENERATORS:
+        rps, table_size, pkey_size, wal = await _bench(variant, rows, batch)
+        print(f"{variant:<6} {rps:>10.0f} {table_size:>10} {pkey_size:>10} {wal / 1e6:>8.1f}")
+    await engine.dispose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--batch", type=int, default=1000)
+    args = parser.parse_args()
+    asyncio.run(_run(args.rows, args.batch))
+
+
+if __name__ == "__main__":
+    main()
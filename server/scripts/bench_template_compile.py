@@ -0,0 +1,81 @@
+"""
+Measure what a fresh worker spends compiling admin templates, with and without the cache.
+
+Each run starts a new interpreter (a new worker) and reports, as medians over --runs:
+first page: wall time to load the dashboard templates, i.e. what the first dashboard
+request pays when nothing was precompiled; all templates: CPU time of
+precompile_templates() (every template in both environments). Modes: no bytecode cache,
+an empty cache directory (compile and write) and a populated one (read only).
+
+Run from server directory:
+  python -m scripts.bench_template_compile --runs 10
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+from statistics import median
+
+_server_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if _server_dir not in sys.path:
+    sys.path.insert(0, _server_dir)
+
+_FIRST_PAGE = """
+import json, time
+from app.api.routes import admin
+start = time.perf_counter()
+for name in ("admin/dashboard.html", "base.html"):
+    admin._streaming_env.get_template(name)
+print(json.dumps((time.perf_counter() - start) * 1000))
+"""
+
+_ALL = """
+import json, time
+from app.api.routes import admin
+start = time.process_time()
+admin.precompile_templates()
+print(json.dumps((time.process_time() - start) * 1000))
+"""
+
+
+def _probe(code: str, cache_dir: str) -> float:
+    env = {**os.environ, "TEMPLATE_CACHE_DIR": cache_dir, "PYTHONPATH": _server_dir}
+    out = subprocess.run(
+        [sys.executable, "-c", code], env=env, cwd=_server_dir, capture_output=True, check=True
+    )
+    return json.loads(out.stdout.splitlines()[-1])
+
+
+def _clear(cache_dir: str) -> None:
+    for name in os.listdir(cache_dir):
+        os.remove(os.path.join(cache_dir, name))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as cache_dir:
+        results = {}
+        for mode in ("no cache", "empty cache", "warm cache"):
+            first, total = [], []
+            for _ in range(args.runs):
+                for code, samples in ((_FIRST_PAGE, first), (_ALL, total)):
+                    if mode == "empty cache":
+                        _clear(cache_dir)
+                    samples.append(_probe(code, "" if mode == "no cache" else cache_dir))
+            results[mode] = (median(first), median(total))
+
+    print(f"runs={args.runs}")
+    print(f"{'mode':<12} {'first page ms':>14} {'all templates cpu ms':>21}")
+    for mode, (first, total) in results.items():
+        print(f"{mode:<12} {first:>14.1f} {total:>21.1f}")
+    base = results["no cache"][1]
+    print(f"compile CPU per worker, warm cache / no cache: {results['warm cache'][1] / base:.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""
+Per-request serialization cost of /licenses/validate responses: FastAPI default vs orjson.
+
+"fastapi" is what the route did before the fast path: response_model validation
+(serialize_response with the route's response field) and JSONResponse rendering. "orjson"
+encodes a response built per request (e.g. an active license with its expiry) and
+"pre-encoded" returns the cached body of a constant outcome. Checks that all three produce
+the same bytes first. No database needed.
+
+Run from server directory:
+  python -m scripts.bench_validate_serialization --iterations 100000
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+from datetime import datetime, timezone
+
+_server_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if _server_dir not in sys.path:
+    sys.path.insert(0, _server_dir)
+
+from fastapi.responses import JSONResponse  # noqa: E402
+from fastapi.routing import serialize_response  # noqa: E402
+
+from app.api.routes.licenses import validate_router  # noqa: E402
+from app.core.fast_json import encode  # noqa: E402
+from app.schemas.license import ValidateResponse  # noqa: E402
+from app.services.license_service import _INVALID_LICENSE  # noqa: E402
+
+_FIELD = next(r for r in validate_router.routes if r.path == "/validate").response_field
+
+
+async def _fastapi_body(response: ValidateResponse) -> bytes:
+    content = await serialize_response(field=_FIELD, response_content=response)
+    return JSONResponse(content).body
+
+
+async def _run(iterations: int) -> None:
+    expiry = datetime(2027, 1, 1, tzinfo=timezone.utc)
+
+    def active() -> ValidateResponse:
+        return ValidateResponse(valid=True, status="active", expires_at=expiry, message="ok")
+
+    for response in (active(), _INVALID_LICENSE):
+        assert encode(response) == await _fastapi_body(response), response
+
+    async def fastapi_default():
+        await _fastapi_body(active())
+
+    async def orjson_dynamic():
+        encode(active())
+
+    async def pre_encoded():
+        encode(_INVALID_LICENSE)
+
+    print(f"iterations={iterations} (response construction included)")
+    print(f"{'path':<12} {'us/request':>11}")
+    paths = (("fastapi", fastapi_default), ("orjson", orjson_dynamic), ("pre-encoded", pre_encoded))
+    for name, fn in paths:
+        start = time.perf_counter()
+        for _ in range(iterations):
+            await fn()
+        elapsed = time.perf_counter() - start
+        print(f"{name:<12} {elapsed / iterations * 1e6:>11.2f}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--iterations", type=int, default=50_000)
+    args = parser.parse_args()
+    asyncio.run(_run(args.iterations))
+
+
+if __name__ == "__main__":
+    main()
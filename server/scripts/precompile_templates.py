@@ -0,0 +1,36 @@
+"""
+Compile the admin templates into the Jinja bytecode cache (TEMPLATE_CACHE_DIR).
+
+Run at image build time so that no worker compiles a template: each one reads the
+bytecode at startup instead. The cache is keyed by template source, so an outdated entry
+is recompiled, never used.
+
+Run from server directory:
+  TEMPLATE_CACHE_DIR=/var/cache/swaps/templates python -m scripts.precompile_templates
+"""
+import argparse
+import os
+import sys
+import time
+
+_server_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if _server_dir not in sys.path:
+    sys.path.insert(0, _server_dir)
+
+from app.api.routes.admin import precompile_templates  # noqa: E402
+from app.core.config import settings  # noqa: E402
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.parse_args()
+    if not settings.template_cache_dir:
+        sys.exit("TEMPLATE_CACHE_DIR is not set")
+    start = time.perf_counter()
+    count = precompile_templates()
+    elapsed = (time.perf_counter() - start) * 1000
+    print(f"{count} templates compiled into {settings.template_cache_dir} in {elapsed:.0f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""
+Compare import time, resident memory and loaded modules of app.main per DEPLOYMENT_MODE.
+
+Each run imports the app in a fresh interpreter, as a new worker would, and records the
+wall time of `import app.main`, the process RSS afterwards and the number of loaded
+modules (medians over --runs). Uses the current environment otherwise; nothing connects
+to the database.
+
+Run from server directory:
+  python -m scripts.report_deployment_footprint --runs 10
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+from statistics import median
+
+_server_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+MODES = ("full", "api")
+_WATCHED = ("jinja2", "app.api.routes.admin", "app.api.routes.auth")
+
+_PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import app.main
+elapsed = (time.perf_counter() - start) * 1000
+rss_kb = 0
+with open("/proc/self/status") as fh:
+    for line in fh:
+        if line.startswith("VmRSS:"):
+            rss_kb = int(line.split()[1])
+watched = %r
+print(json.dumps([elapsed, rss_kb, len(sys.modules), [m for m in watched if m in sys.modules]]))
+""" % (_WATCHED,)
+
+
+def _probe(mode: str) -> list:
+    env = {**os.environ, "DEPLOYMENT_MODE": mode, "PYTHONPATH": _server_dir}
+    out = subprocess.run(
+        [sys.executable, "-c", _PROBE], env=env, cwd=_server_dir, capture_output=True, check=True
+    )
+    return json.loads(out.stdout.splitlines()[-1])
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+    if not os.path.exists("/proc/self/status"):
+        sys.exit("RSS is read from /proc/self/status; run this on Linux")
+
+    results = {}
+    for _ in range(args.runs):
+        for mode in MODES:  # interleaved, so drift affects both modes alike
+            results.setdefault(mode, []).append(_probe(mode))
+
+    print(f"runs={args.runs}")
+    print(f"{'mode':<6} {'import ms':>10} {'RSS MiB':>8} {'modules':>8}  loaded")
+    summary = {}
+    for mode, samples in results.items():
+        ms = median(s[0] for s in samples)
+        rss = median(s[1] for s in samples) / 1024
+        modules = median(s[2] for s in samples)
+        summary[mode] = (ms, rss)
+        loaded = ", ".join(samples[-1][3]) or "-"
+        print(f"{mode:<6} {ms:>10.0f} {rss:>8.1f} {modules:>8.0f}  {loaded}")
+    (full_ms, full_rss), (api_ms, api_rss) = summary["full"], summary["api"]
+    print(f"api vs full: import {api_ms / full_ms:.2f}x, RSS -{full_rss - api_rss:.1f} MiB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""
+Bytes saved per validation_logs row by the compact encoding (migration 004).
+
+For a sample of the live table, compares pg_column_size of the stored SMALLINT/INET values
+with the on-disk size of the same values in the old layout (result VARCHAR, error_reason TEXT,
+ip_address VARCHAR(45)). Column payload only: tuple header and alignment padding are
+not counted, so the on-disk saving can differ by a few bytes per row.
+
+Run from server directory:
+  python -m scripts.report_validation_log_size --sample-percent 1
+"""
+import argparse
+import asyncio
+import os
+import sys
+
+_server_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if _server_dir not in sys.path:
+    sys.path.insert(0, _server_dir)
+
+from sqlalchemy import text  # noqa: E402
+
+from app.core.database import engine  # noqa: E402
+from app.models.validation_log import ValidationReason, ValidationResult  # noqa: E402
+
+
+def _label_case(column: str, enum_cls) -> str:
+    whens = " ".join(f"WHEN {m.value} THEN '{m.label}'::text" for m in enum_cls)
+    return f"CASE {column} {whens} END"
+
+
+def _query(sample_percent: float) -> str:
+    # Old values were short varlenas on disk: 1-byte header + bytes (pg_column_size of a
+    # computed value would report the 4-byte in-memory header instead)
+    old_result = f"(octet_length({_label_case('result', ValidationResult)}) + 1)"
+    old_reason = f"coalesce(octet_length({_label_case('reason', ValidationReason)}) + 1, 0)"
+    old_ip = "coalesce(octet_length(host(ip_address)) + 1, 0)"
+    new = (
+        "pg_column_size(result) + coalesce(pg_column_size(reason), 0)"
+        " + coalesce(pg_column_size(ip_address), 0)"
+    )
+    return f"""
+        SELECT count(*),
+               avg({old_result}), avg({old_reason}), avg({old_ip}),
+               avg(pg_column_size(result)), avg(coalesce(pg_column_size(reason), 0)),
+               avg(coalesce(pg_column_size(ip_address), 0)),
+               avg({old_result} + {old_reason} + {old_ip} - ({new})),
+               (SELECT reltuples FROM pg_class WHERE relname = 'validation_logs')
+        FROM validation_logs TABLESAMPLE SYSTEM ({sample_percent})
+    """
+
+
+async def _run(sample_percent: float) -> None:
+    async with engine.connect() as conn:
+        row = (await conn.execute(text(_query(sample_percent)))).one()
+    await engine.dispose()
+    sampled, *avgs, saved, total_rows = row
+    if not sampled:
+        print("No rows sampled; raise --sample-percent or check the table has data.")
+        return
+    old_r, old_e, old_ip, new_r, new_e, new_ip = (float(a or 0) for a in avgs)
+    print(f"sampled rows: {sampled}")
+    print(f"{'column':<12} {'old bytes':>10} {'new bytes':>10}")
+    print(f"{'result':<12} {old_r:>10.2f} {new_r:>10.2f}")
+    print(f"{'reason':<12} {old_e:>10.2f} {new_e:>10.2f}")
+    print(f"{'ip_address':<12} {old_ip:>10.2f} {new_ip:>10.2f}")
+    print(f"saved per row: {float(saved):.2f} bytes")
+    if total_rows and total_rows > 0:
+        total_mb = float(saved) * total_rows / 1e6
+        print(f"estimated total: {total_mb:.1f} MB over {int(total_rows)} rows")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sample-percent", type=float, default=1.0)
+    args = parser.parse_args()
+    asyncio.run(_run(args.sample_percent))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""
+Local stand-in for an OTLP/HTTP collector: accepts POST /v1/traces (OTLP/JSON), appends
+each payload as one JSON line to a file and prints a one-line summary per trace.
+
+Run from server directory:
+  python -m scripts.trace_collector --port 4318 --out traces.jsonl
+
+Then start the API with TRACE_EXPORT_URL=http://localhost:4318/v1/traces and
+TRACE_SAMPLE_RATE=0.01 (or send a `traceparent` header with the sampled flag set).
+"""
+import argparse
+import json
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+
+def _summarize(payload: dict) -> list[str]:
+    lines = []
+    for resource_spans in payload.get("resourceSpans", []):
+        for scope_spans in resource_spans.get("scopeSpans", []):
+            spans = scope_spans.get("spans", [])
+            if not spans:
+                continue
+            parts = []
+            for s in spans:
+                ms = (int(s["endTimeUnixNano"]) - int(s["startTimeUnixNano"])) / 1e6
+                parts.append(f"{s['name']}={ms:.2f}ms")
+            lines.append(f"{spans[0]['traceId']} " + " ".join(parts))
+    return lines
+
+
+def make_handler(out: Path):
+    class Handler(BaseHTTPRequestHandler):
+        def do_POST(self) -> None:
+            if self.path != "/v1/traces":
+                self.send_error(404)
+                return
+            body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+            try:
+                payload = json.loads(body)
+            except ValueError:
+                self.send_error(400, "invalid JSON")
+                return
+            with out.open("a", encoding="utf-8") as f:
+                f.write(json.dumps(payload, separators=(",", ":")) + "\n")
+            for line in _summarize(payload):
+                print(line)
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.end_headers()
+            self.wfile.write(b"{}")
+
+        def log_message(self, format, *args) -> None:  # keep stdout for trace summaries
+            pass
+
+    return Handler
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="OTLP/JSON trace collector stand-in")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=4318)
+    parser.add_argument("--out", type=Path, default=Path("traces.jsonl"))
+    args = parser.parse_args()
+    server = ThreadingHTTPServer((args.host, args.port), make_handler(args.out))
+    print(f"Collecting traces on http://{args.host}:{args.port}/v1/traces -> {args.out}")
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
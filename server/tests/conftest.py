@@ -1,9 +1,30 @@
-"""Pytest fixtures: test client for API tests."""
+"""Pytest fixtures: test client for API tests, SQLite-backed app for DB tests."""
+
+from datetime import date, timedelta
 
 import pytest
 from httpx import ASGITransport, AsyncClient
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.pool import StaticPool
+from starlette.middleware import Middleware
 
+from app.core import principal_cache
+from app.core.database import (
+    Base,
+    get_db,
+    get_readonly_db,
+    get_streaming_session_maker,
+    install_sqlite_functions,
+    make_readonly_session_maker,
+)
+from app.core.query_stats import install_query_hooks
+from app.core.security import create_access_token, hash_password
 from app.main import app
+from app.models.admin import Admin
+from app.schemas.license import LicenseCreate
+from app.services import license_service
+
+TEST_ADMIN_EMAIL = "admin@test.example"
 
 
 @pytest.fixture
@@ -11,3 +32,84 @@ def client():
     """Async HTTP client for the FastAPI app (no DB override)."""
     transport = ASGITransport(app=app)
     return AsyncClient(transport=transport, base_url="http://test")
+
+
+@pytest.fixture
+def client_with_middleware(monkeypatch):
+    """Client for the app with one more middleware, as main.py adds it when a setting is on.
+
+    `index` is the position in app.user_middleware (0 = outermost).
+    """
+
+    def install(middleware: Middleware, index: int = 0) -> AsyncClient:
+        stack = list(app.user_middleware)
+        stack.insert(index, middleware)
+        monkeypatch.setattr(app, "user_middleware", stack)
+        monkeypatch.setattr(app, "middleware_stack", None)  # rebuilt on the next request
+        return AsyncClient(transport=ASGITransport(app=app), base_url="http://test")
+
+    return install
+
+
+@pytest.fixture
+async def db_session_maker():
+    """In-memory SQLite schema built from the models; get_db / get_readonly_db use it."""
+    engine = create_async_engine("sqlite+aiosqlite://", poolclass=StaticPool)
+    install_query_hooks(engine.sync_engine)
+    install_sqlite_functions(engine.sync_engine)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    maker = async_sessionmaker(engine, expire_on_commit=False, autoflush=False)
+
+    async def _get_db():
+        async with maker() as session:
+            try:
+                yield session
+                if session.in_transaction():
+                    await session.commit()
+            except Exception:
+                await session.rollback()
+                raise
+
+    readonly_maker = make_readonly_session_maker(engine)
+
+    async def _get_readonly_db():
+        async with readonly_maker() as session:
+            yield session
+
+    app.dependency_overrides[get_db] = _get_db
+    app.dependency_overrides[get_readonly_db] = _get_readonly_db
+    app.dependency_overrides[get_streaming_session_maker] = lambda: readonly_maker
+    principal_cache.invalidate()
+    yield maker
+    app.dependency_overrides.pop(get_db, None)
+    app.dependency_overrides.pop(get_readonly_db, None)
+    app.dependency_overrides.pop(get_streaming_session_maker, None)
+    principal_cache.invalidate()
+    await engine.dispose()
+
+
+@pytest.fixture
+async def admin_token(db_session_maker) -> str:
+    """Access token for an active admin stored in the test DB."""
+    async with db_session_maker() as db:
+        db.add(Admin(email=TEST_ADMIN_EMAIL, password_hash=hash_password("secret"), is_active=True))
+        await db.commit()
+    return create_access_token(TEST_ADMIN_EMAIL)
+
+
+@pytest.fixture
+async def active_license(db_session_maker):
+    """(license, plaintext_key) for an active license expiring in a year."""
+    async with db_session_maker() as db:
+        license_, plain_key = await license_service.create_license(
+            db,
+            LicenseCreate(
+                app_name="TestApp",
+                client_name="Test Client",
+                expiry_date=date.today() + timedelta(days=365),
+                status="active",
+            ),
+        )
+        await db.commit()
+    return license_, plain_key
@@ -0,0 +1,172 @@
+"""SQL round trips per endpoint (SQLite-backed app; counts match PostgreSQL)."""
+
+import time
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import event, select
+
+from app.core.database import ReadOnlySessionError, make_readonly_session_maker
+from app.core.query_stats import SQL_STATS_HEADER, QueryStatsMiddleware, capture_statements
+from app.core.security import compute_validation_signature
+from app.models.admin import Admin
+
+
+def _signed(license_key: str) -> dict:
+    ts = int(time.time())
+    return {
+        "license_key": license_key,
+        "app_id": "app1",
+        "timestamp": ts,
+        "signature": compute_validation_signature(license_key, "app1", ts),
+    }
+
+
+@pytest.mark.asyncio
+async def test_validate_issues_at_most_two_statements(client: AsyncClient, active_license):
+    """Lookup by key hash + validation log insert."""
+    _, plain_key = active_license
+    with capture_statements() as stats:
+        r = await client.post("/licenses/validate", json=_signed(plain_key))
+    assert r.json()["valid"] is True
+    assert stats.count <= 2, stats.statements
+
+
+@pytest.mark.asyncio
+async def test_validate_bad_signature_issues_no_statements(client: AsyncClient, db_session_maker):
+    body = {**_signed("LIC-NOPE-00000000-0000000000000000"), "signature": "bad"}
+    with capture_statements() as stats:
+        r = await client.post("/licenses/validate", json=body)
+    assert r.json()["valid"] is False
+    assert stats.count == 0, stats.statements
+
+
+@pytest.mark.asyncio
+async def test_rate_limited_validate_checks_out_no_connection(
+    client: AsyncClient, db_session_maker, active_license
+):
+    _, plain_key = active_license
+    for _ in range(10):
+        await client.post("/licenses/validate", json=_signed(plain_key))
+
+    checkouts = []
+    pool = db_session_maker.kw["bind"].sync_engine.pool
+    listener = lambda *args: checkouts.append(1)  # noqa: E731
+    event.listen(pool, "checkout", listener)
+    try:
+        with capture_statements() as stats:
+            r = await client.post("/licenses/validate", json=_signed(plain_key))
+    finally:
+        event.remove(pool, "checkout", listener)
+    assert r.json()["status"] == "rate_limited"
+    assert stats.count == 0, stats.statements
+    assert checkouts == []
+
+
+@pytest.mark.asyncio
+async def test_readonly_session_rejects_writes(db_session_maker):
+    maker = make_readonly_session_maker(db_session_maker.kw["bind"])
+    async with maker() as db:
+        db.add(Admin(email="ro@test.example", password_hash="x"))
+        with pytest.raises(ReadOnlySessionError):
+            await db.flush()
+
+
+@pytest.mark.asyncio
+async def test_readonly_session_reads_in_one_transaction(db_session_maker):
+    maker = make_readonly_session_maker(db_session_maker.kw["bind"])
+    async with maker() as db:
+        await db.execute(select(Admin.id))
+        assert db.in_transaction()
+        first = await db.connection()
+        await db.execute(select(Admin.id))
+        assert await db.connection() is first
+
+
+def test_readonly_maker_on_postgresql_uses_read_only_snapshot_transactions():
+    """BEGIN ISOLATION LEVEL REPEATABLE READ READ ONLY; no AUTOCOMMIT (no connection made)."""
+    from sqlalchemy.ext.asyncio import create_async_engine
+
+    from app.core import database
+
+    engine = create_async_engine("postgresql+asyncpg://swaps@localhost/swaps")
+    maker = make_readonly_session_maker(engine)
+    options = maker.kw["bind"].get_execution_options()
+    assert options["isolation_level"] == "REPEATABLE READ"
+    assert options["postgresql_readonly"] is True
+    assert maker.kw["info"] == {"readonly": True}
+    assert database.streaming_session_maker is database.readonly_session_maker
+
+
+@pytest.mark.asyncio
+async def test_license_history_issues_at_most_two_statements(
+    client: AsyncClient, admin_token, active_license
+):
+    """Admin lookup + history query (no duplicate query in the route)."""
+    license_, _ = active_license
+    with capture_statements() as stats:
+        r = await client.get(
+            f"/licenses/{license_.id}/history",
+            headers={"Authorization": f"Bearer {admin_token}"},
+        )
+    assert r.status_code == 200
+    assert stats.count <= 2, stats.statements
+
+
+@pytest.mark.asyncio
+async def test_debug_header_reports_statement_count(
+    client_with_middleware, active_license, monkeypatch
+):
+    from fastapi.middleware.cors import CORSMiddleware
+    from starlette.middleware import Middleware
+
+    from app.main import app
+
+    monkeypatch.setattr("app.core.config.settings.sql_debug_header", True)
+    cors = next(i for i, m in enumerate(app.user_middleware) if m.cls is CORSMiddleware)
+    _, plain_key = active_license
+    async with client_with_middleware(Middleware(QueryStatsMiddleware), cors) as client:
+        r = await client.post("/licenses/validate", json=_signed(plain_key))
+        assert r.json()["valid"] is True
+        assert r.headers[SQL_STATS_HEADER].startswith("count=2, time_ms=")
+
+        r = await client.get("/health")
+        assert r.headers[SQL_STATS_HEADER].startswith("count=0, ")
+
+
+@pytest.mark.asyncio
+async def test_admin_mutations_are_single_statements(client: AsyncClient, admin_token):
+    """INSERT / UPDATE ... RETURNING: one round trip each, 404 without a separate SELECT."""
+    headers = {"Authorization": f"Bearer {admin_token}"}
+    await client.get("/licenses/", headers=headers)  # warm the principal cache
+
+    with capture_statements() as stats:
+        r = await client.post(
+            "/licenses/",
+            headers=headers,
+            json={"app_name": "App", "client_name": "Acme", "expiry_date": "2099-01-01"},
+        )
+    assert r.status_code == 200
+    assert stats.count == 1, stats.statements
+    license_id = r.json()["id"]
+
+    with capture_statements() as stats:
+        r = await client.patch(
+            f"/licenses/{license_id}", headers=headers, json={"status": "suspended"}
+        )
+    assert r.status_code == 200
+    assert r.json()["status"] == "suspended"
+    assert stats.count == 1, stats.statements
+
+    with capture_statements() as stats:
+        r = await client.delete(f"/licenses/{license_id}", headers=headers)
+    assert r.status_code == 204
+    assert stats.count == 1, stats.statements
+
+    missing = "00000000-0000-0000-0000-000000000001"
+    with capture_statements() as stats:
+        r = await client.patch(f"/licenses/{missing}", headers=headers, json={"status": "active"})
+    assert r.status_code == 404
+    assert stats.count == 1, stats.statements
+    r = await client.delete(f"/licenses/{missing}", headers=headers)
+    assert r.status_code == 404
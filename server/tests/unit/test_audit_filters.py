@@ -0,0 +1,124 @@
+"""Unit tests for filtered audit log queries (service, JSON endpoint, admin page)."""
+
+from datetime import date, datetime
+
+import pytest
+from httpx import AsyncClient
+
+from app.models.license import License
+from app.models.validation_log import ValidationLog
+from app.services import license_service
+
+
+async def _seed(db_session_maker) -> tuple[License, License]:
+    async with db_session_maker() as db:
+        a = License(
+            license_key_hash=b"a" * 32,
+            app_name="AppA",
+            client_name="Client A",
+            expiry_date=date(2027, 1, 1),
+            status="active",
+        )
+        b = License(
+            license_key_hash=b"b" * 32,
+            app_name="AppB",
+            client_name="Client B",
+            expiry_date=date(2025, 1, 1),
+            status="active",
+        )
+        db.add_all([a, b])
+        await db.flush()
+        rows = [
+            (a, datetime(2026, 3, 3, 9), "203.0.113.10", "success", None),
+            (a, datetime(2026, 3, 3, 10), "203.0.113.99", "fail", "License suspended"),
+            (a, datetime(2026, 3, 4, 10), "198.51.100.1", "success", None),
+            (b, datetime(2026, 3, 3, 11), "203.0.113.10", "fail", "License expired"),
+            (b, datetime(2026, 3, 5, 11), "2001:db8::1", "fail", "License expired"),
+        ]
+        for lic, at, ip, result, reason in rows:
+            db.add(
+                ValidationLog(
+                    license_id=lic.id,
+                    validated_at=at,
+                    ip_address=ip,
+                    result=result,
+                    error_reason=reason,
+                )
+            )
+        await db.commit()
+    return a, b
+
+
+@pytest.mark.asyncio
+async def test_service_filters_combine(db_session_maker):
+    a, b = await _seed(db_session_maker)
+    async with db_session_maker() as db:
+
+        async def times(**filters) -> list[datetime]:
+            entries = await license_service.list_audit_logs(db, **filters)
+            return [log.validated_at for log, _ in entries]
+
+        day = {"start": datetime(2026, 3, 3), "end": datetime(2026, 3, 4)}
+        assert len(await times(**day)) == 3
+        assert await times(**day, result="fail", ip_network="203.0.113.0/24") == [
+            datetime(2026, 3, 3, 11),
+            datetime(2026, 3, 3, 10),
+        ]
+        assert await times(ip_network="203.0.113.10/32") == [
+            datetime(2026, 3, 3, 11),
+            datetime(2026, 3, 3, 9),
+        ]
+        assert await times(ip_network="2001:db8::/32") == [datetime(2026, 3, 5, 11)]
+        assert await times(reason="License expired", license_id=b.id) == [
+            datetime(2026, 3, 5, 11),
+            datetime(2026, 3, 3, 11),
+        ]
+        assert await times(license_id=a.id, result="success") == [
+            datetime(2026, 3, 4, 10),
+            datetime(2026, 3, 3, 9),
+        ]
+
+
+def test_parse_ip_filter():
+    assert license_service.parse_ip_filter(" 203.0.113.7 ") == "203.0.113.7/32"
+    assert license_service.parse_ip_filter("203.0.113.7/24") == "203.0.113.0/24"
+    with pytest.raises(ValueError):
+        license_service.parse_ip_filter("not-an-ip")
+
+
+@pytest.mark.asyncio
+async def test_json_endpoint_filters_and_validates(
+    client: AsyncClient, admin_token, db_session_maker
+):
+    a, _ = await _seed(db_session_maker)
+    headers = {"Authorization": f"Bearer {admin_token}"}
+    r = await client.get(
+        "/licenses/audit",
+        params={"ip": "203.0.113.0/24", "result": "fail", "start": "2026-03-03T00:00:00Z"},
+        headers=headers,
+    )
+    assert r.status_code == 200
+    body = r.json()
+    assert [(e["client_name"], e["error_reason"]) for e in body] == [
+        ("Client B", "License expired"),
+        ("Client A", "License suspended"),
+    ]
+    r = await client.get("/licenses/audit", params={"ip": "nope"}, headers=headers)
+    assert r.status_code == 422
+    r = await client.get("/licenses/audit", params={"reason": "Bogus"}, headers=headers)
+    assert r.status_code == 422
+    assert (await client.get("/licenses/audit")).status_code == 401
+
+
+@pytest.mark.asyncio
+async def test_admin_audit_page_filters(client: AsyncClient, admin_token, db_session_maker):
+    a, _ = await _seed(db_session_maker)
+    client.cookies.set("swaps_token", admin_token)
+    r = await client.get(
+        "/admin/audit", params={"license_id": str(a.id), "result": "fail", "ip": "", "start": ""}
+    )
+    assert r.status_code == 200
+    assert "License suspended" in r.text
+    assert "203.0.113.10" not in r.text
+    r = await client.get("/admin/audit", params={"ip": "999.1.1.1"})
+    assert "Invalid filter" in r.text
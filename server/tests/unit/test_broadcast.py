@@ -0,0 +1,128 @@
+"""Unit tests for the live audit broadcaster and its SSE endpoint."""
+
+import asyncio
+import json
+import time
+
+import pytest
+from httpx import AsyncClient
+
+from app.core.broadcast import (
+    DROPPED_FRAME,
+    Broadcaster,
+    TooManySubscribersError,
+    audit_broadcaster,
+)
+from app.core.config import settings
+from app.core.database import get_db, get_streaming_session_maker
+from app.core.security import compute_validation_signature
+from app.main import app
+
+
+def _frames(sub) -> list[dict]:
+    out = []
+    while not sub.queue.empty():
+        out.append(json.loads(sub.queue.get_nowait().decode().removeprefix("data: ")))
+    return out
+
+
+@pytest.mark.asyncio
+async def test_slow_subscriber_is_dropped_others_keep_receiving(monkeypatch):
+    monkeypatch.setattr(settings, "audit_stream_queue_size", 2)
+    hub = Broadcaster()
+    slow, fast = hub.subscribe(), hub.subscribe()
+    for i in range(2):
+        hub.publish({"n": i})
+    assert _frames(fast) == [{"n": 0}, {"n": 1}]
+    hub.publish({"n": 2})  # slow's buffer is full
+    assert slow.dropped and len(hub) == 1
+    assert _frames(fast) == [{"n": 2}]
+
+    async def never_disconnected() -> bool:
+        return False
+
+    body = [frame async for frame in hub.stream(slow, never_disconnected)]
+    assert body[-1] == DROPPED_FRAME
+    assert len(body) == 4  # retry hint, the 2 buffered events, dropped
+
+
+def test_subscriber_limit(monkeypatch):
+    monkeypatch.setattr(settings, "audit_stream_max_subscribers", 1)
+    hub = Broadcaster()
+    hub.subscribe()
+    with pytest.raises(TooManySubscribersError):
+        hub.subscribe()
+
+
+@pytest.mark.asyncio
+async def test_validate_publishes_event(client: AsyncClient, active_license):
+    license_, plain_key = active_license
+    sub = audit_broadcaster.subscribe()
+    try:
+        ts = int(time.time())
+        await client.post(
+            "/licenses/validate",
+            json={
+                "license_key": plain_key,
+                "app_id": "app1",
+                "timestamp": ts,
+                "signature": compute_validation_signature(plain_key, "app1", ts),
+            },
+        )
+        [event] = _frames(sub)
+    finally:
+        audit_broadcaster.unsubscribe(sub)
+    assert event["license_id"] == str(license_.id)
+    assert event["client_name"] == "Test Client"
+    assert event["result"] == "success"
+
+
+@pytest.mark.asyncio
+async def test_stream_endpoint(client: AsyncClient, admin_token, monkeypatch):
+    monkeypatch.setattr(settings, "audit_stream_queue_size", 1)
+    client.cookies.set("swaps_token", admin_token)
+    request = asyncio.create_task(client.get("/admin/audit/stream"))
+    for _ in range(200):
+        if len(audit_broadcaster):
+            break
+        await asyncio.sleep(0.01)
+    audit_broadcaster.publish({"n": 1})
+    audit_broadcaster.publish({"n": 2})  # overflows the 1-event buffer: stream ends
+    r = await asyncio.wait_for(request, timeout=5)
+    assert r.headers["content-type"].startswith("text/event-stream")
+    assert r.text == 'retry: 3000\n\ndata: {"n":1}\n\n' + DROPPED_FRAME.decode()
+    assert len(audit_broadcaster) == 0
+
+    monkeypatch.setattr(settings, "audit_stream_max_subscribers", 0)
+    assert (await client.get("/admin/audit/stream")).status_code == 503
+
+
+@pytest.mark.asyncio
+async def test_stream_endpoint_holds_no_session_while_streaming(
+    client: AsyncClient, admin_token, monkeypatch
+):
+    monkeypatch.setattr(settings, "audit_stream_queue_size", 1)
+    sessions = []
+    streaming_maker = app.dependency_overrides[get_streaming_session_maker]()
+
+    def tracking_maker():
+        sessions.append(streaming_maker())
+        return sessions[-1]
+
+    async def no_request_session():
+        raise AssertionError("the stream must not hold a request-scoped session")
+        yield
+
+    app.dependency_overrides[get_streaming_session_maker] = lambda: tracking_maker
+    app.dependency_overrides[get_db] = no_request_session
+    client.cookies.set("swaps_token", admin_token)
+    request = asyncio.create_task(client.get("/admin/audit/stream"))
+    for _ in range(200):
+        if len(audit_broadcaster):
+            break
+        await asyncio.sleep(0.01)
+    # The admin was looked up (principal cache miss) in a session closed before streaming
+    assert len(sessions) == 1 and not sessions[0].in_transaction()
+    audit_broadcaster.publish({"n": 1})
+    audit_broadcaster.publish({"n": 2})  # ends the stream
+    assert (await asyncio.wait_for(request, timeout=5)).status_code == 200
@@ -0,0 +1,96 @@
+"""Unit tests for the bounded crypto executor."""
+
+import asyncio
+import threading
+import time
+
+import pytest
+from httpx import AsyncClient
+
+from app.core.crypto_pool import (
+    CRYPTO_REJECTED,
+    CryptoPool,
+    CryptoPoolBusyError,
+    verify_password_async,
+)
+from app.core.security import hash_password
+
+
+@pytest.mark.asyncio
+async def test_verify_password_async_does_not_block_loop():
+    hashed = hash_password("pw")
+    ticks = 0
+
+    async def ticker():
+        nonlocal ticks
+        while True:
+            ticks += 1
+            await asyncio.sleep(0.001)
+
+    t = asyncio.create_task(ticker())
+    try:
+        assert await verify_password_async("pw", hashed) is True
+        assert await verify_password_async("nope", hashed) is False
+    finally:
+        t.cancel()
+    assert ticks > 5
+
+
+@pytest.mark.asyncio
+async def test_pool_rejects_after_queue_timeout(monkeypatch):
+    monkeypatch.setattr("app.core.crypto_pool.settings.crypto_pool_workers", 1)
+    monkeypatch.setattr("app.core.crypto_pool.settings.crypto_queue_size", 0)
+    monkeypatch.setattr("app.core.crypto_pool.settings.crypto_queue_timeout_seconds", 0.05)
+    pool = CryptoPool()
+    release = threading.Event()
+    rejected = CRYPTO_REJECTED.value("slow")
+    first = asyncio.create_task(pool.run("slow", release.wait, 5))
+    await asyncio.sleep(0.01)
+    try:
+        with pytest.raises(CryptoPoolBusyError):
+            await pool.run("slow", time.sleep, 0)
+        assert pool.in_flight == 1
+    finally:
+        release.set()
+        await first
+        pool.shutdown()
+    assert CRYPTO_REJECTED.value("slow") == rejected + 1
+
+
+@pytest.mark.asyncio
+async def test_login_returns_tokens(client: AsyncClient, admin_token):
+    email = "admin@test.example"  # seeded by the admin_token fixture, password "secret"
+    r = await client.post("/auth/login", json={"email": email, "password": "secret"})
+    assert r.status_code == 200
+    assert "access_token" in r.json()
+    r = await client.post("/auth/login", json={"email": email, "password": "bad"})
+    assert r.status_code == 401
+
+
+@pytest.mark.asyncio
+async def test_cancelled_caller_keeps_slot_until_work_finishes(monkeypatch):
+    monkeypatch.setattr("app.core.crypto_pool.settings.crypto_pool_workers", 1)
+    monkeypatch.setattr("app.core.crypto_pool.settings.crypto_queue_size", 0)
+    monkeypatch.setattr("app.core.crypto_pool.settings.crypto_queue_timeout_seconds", 0.05)
+    pool = CryptoPool()
+    release = threading.Event()
+    running = asyncio.create_task(pool.run("slow", release.wait, 5))
+    await asyncio.sleep(0.01)
+    running.cancel()  # e.g. the client disconnected
+    with pytest.raises(asyncio.CancelledError):
+        await running
+    try:
+        # The cancelled hash still occupies the only thread, so nothing new is admitted...
+        assert pool.in_flight == 1
+        with pytest.raises(CryptoPoolBusyError):
+            await pool.run("slow", time.sleep, 0)
+    finally:
+        release.set()
+    # ...until it finishes
+    for _ in range(100):
+        if pool.in_flight == 0:
+            break
+        await asyncio.sleep(0.01)
+    assert pool.in_flight == 0
+    await pool.run("slow", time.sleep, 0)
+    pool.shutdown()
@@ -0,0 +1,41 @@
+"""DEPLOYMENT_MODE=api serves validation only and never imports the admin UI."""
+
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+from app.main import app
+
+_SERVER_DIR = Path(__file__).resolve().parents[2]
+
+_PROBE = """
+import json, sys
+from app.main import app
+print(json.dumps({
+    "paths": sorted(r.path for r in app.routes),
+    "modules": [m for m in ("jinja2", "app.api.routes.admin") if m in sys.modules],
+}))
+"""
+
+
+def test_api_mode_has_only_validation_and_health_routes():
+    env = {**os.environ, "DEPLOYMENT_MODE": "api", "METRICS_ENABLED": "false"}
+    out = subprocess.run(
+        [sys.executable, "-c", _PROBE],
+        env=env,
+        cwd=_SERVER_DIR,
+        capture_output=True,
+        check=True,
+        text=True,
+    )
+    result = json.loads(out.stdout.splitlines()[-1])
+    api_paths = [p for p in result["paths"] if not p.startswith(("/docs", "/redoc", "/openapi"))]
+    assert api_paths == ["/health", "/licenses/validate"]
+    assert result["modules"] == []
+
+
+def test_full_mode_keeps_every_router():
+    paths = {r.path for r in app.routes}
+    assert {"/licenses/validate", "/licenses/{license_id}", "/admin/", "/auth/login"} <= paths
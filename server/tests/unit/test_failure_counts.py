@@ -0,0 +1,98 @@
+"""Unit tests for aggregated counting of license-less validation failures."""
+
+import time
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import select
+
+from app.core.config import settings
+from app.core.security import compute_validation_signature
+from app.models.validation_failure_count import ValidationFailureCount
+from app.services.failure_counts import (
+    UNKNOWN_PREFIX,
+    FailureAggregator,
+    failure_aggregator,
+    ip_prefix,
+)
+
+
+def test_ip_prefix_groups_clients_by_network():
+    assert ip_prefix("203.0.113.77") == "203.0.113.0/24"
+    assert ip_prefix("2001:db8:1:2:3:4:5:6") == "2001:db8:1:2::/64"
+    assert ip_prefix(None) == UNKNOWN_PREFIX
+    assert ip_prefix("testclient") == UNKNOWN_PREFIX
+
+
+def test_distinct_keys_are_capped(monkeypatch):
+    monkeypatch.setattr(settings, "failure_counts_max_keys", 2)
+    agg = FailureAggregator()
+    for i in range(10):
+        agg.record(f"10.0.{i}.1", "License not found")
+    pending = agg.pending()
+    assert len(pending) == 3
+    assert sum(pending.values()) == 10
+    assert any(prefix == UNKNOWN_PREFIX for _, prefix, _ in pending)
+
+
+@pytest.mark.asyncio
+async def test_flush_upserts_and_adds_to_existing_rows(db_session_maker):
+    agg = FailureAggregator()
+    now = 1_699_999_985.0  # 5 s into a minute
+    for _ in range(3):
+        agg.record("198.51.100.5", "Invalid signature", now=now)
+    agg.record("198.51.100.9", "Invalid signature", now=now)
+    agg.record("192.0.2.1", "License not found", now=now)
+    agg.record("192.0.2.1", "License not found", now=now + 60)
+    assert await agg.flush(db_session_maker) == 3
+    assert agg.pending() == {}
+
+    agg.record("198.51.100.200", "Invalid signature", now=now + 10)
+    await agg.flush(db_session_maker)
+
+    async with db_session_maker() as db:
+        rows = (await db.execute(select(ValidationFailureCount))).scalars().all()
+    counts = {(int(r.minute.timestamp()) // 60, r.ip_prefix, r.reason): r.count for r in rows}
+    minute = int(now) // 60
+    assert counts == {
+        (minute, "198.51.100.0/24", "Invalid signature"): 5,
+        (minute, "192.0.2.0/24", "License not found"): 1,
+        (minute + 1, "192.0.2.0/24", "License not found"): 1,
+    }
+
+
+@pytest.mark.asyncio
+async def test_unknown_key_validation_is_counted_not_logged(client: AsyncClient, db_session_maker):
+    before = sum(
+        n for (_, _, reason), n in failure_aggregator.pending().items()
+        if reason == "License not found"
+    )
+    key, ts = "LIC-NOPE-00000000-0000000000000000", int(time.time())
+    r = await client.post(
+        "/licenses/validate",
+        json={
+            "license_key": key,
+            "app_id": "app1",
+            "timestamp": ts,
+            "signature": compute_validation_signature(key, "app1", ts),
+        },
+    )
+    assert r.json()["valid"] is False
+    after = sum(
+        n for (_, _, reason), n in failure_aggregator.pending().items()
+        if reason == "License not found"
+    )
+    assert after == before + 1
+
+
+@pytest.mark.asyncio
+async def test_stop_logs_a_failed_final_flush(monkeypatch, caplog):
+    agg = FailureAggregator()
+    agg.record("203.0.113.7", "not_found")
+
+    async def unreachable_database(session_maker=None):
+        raise ConnectionRefusedError("database is down")
+
+    monkeypatch.setattr(agg, "flush", unreachable_database)
+    await agg.stop()  # must not raise out of lifespan shutdown
+    assert "Final flush of validation failure counts failed" in caplog.text
@@ -0,0 +1,80 @@
+"""orjson /licenses/validate bodies must match FastAPI's default rendering byte for byte."""
+
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from pydantic import ValidationError
+
+from app.api.routes.licenses import _RATE_LIMITED, validate_router
+from app.core.fast_json import encode, pre_encoded
+from app.schemas.license import ValidateResponse
+from app.services import license_service
+
+_FIELD = next(r for r in validate_router.routes if r.path == "/validate").response_field
+
+
+async def _fastapi_body(response: ValidateResponse) -> bytes:
+    content = await serialize_response(field=_FIELD, response_content=response)
+    return JSONResponse(content).body
+
+
+@pytest.mark.parametrize(
+    "response",
+    [
+        ValidateResponse(
+            valid=True,
+            status="active",
+            expires_at=datetime(2027, 1, 1, tzinfo=timezone.utc),
+            message="License valid",
+        ),
+        ValidateResponse(
+            valid=False,
+            status="expired",
+            expires_at=datetime(2025, 6, 30, 12, 5, 7, 120, tzinfo=timezone.utc),
+            message="License has expired",
+        ),
+        ValidateResponse(
+            valid=False,
+            status="suspended",
+            expires_at=datetime(2027, 1, 1, tzinfo=timezone(timedelta(hours=5, minutes=30))),
+            message="Lizenz gesperrt — bitte Support kontaktieren",
+        ),
+        ValidateResponse(
+            valid=False,
+            status="pending",
+            expires_at=datetime(2027, 1, 1),  # naive: no offset either way
+            message="License is pending activation",
+        ),
+    ],
+)
+async def test_encode_matches_fastapi_default(response):
+    assert encode(response) == await _fastapi_body(response)
+
+
+@pytest.mark.parametrize(
+    "constant",
+    [
+        license_service._REQUEST_EXPIRED,
+        license_service._INVALID_REQUEST,
+        license_service._INVALID_LICENSE,
+        _RATE_LIMITED,
+    ],
+)
+async def test_pre_encoded_constants_match_fastapi_default(constant):
+    body = encode(constant)
+    assert body is encode(constant)  # cached, not re-encoded
+    assert body == await _fastapi_body(constant)
+
+
+def test_equal_but_distinct_instance_is_encoded_not_cached():
+    original = pre_encoded(ValidateResponse(valid=False, status="invalid", message="x"))
+    copy = ValidateResponse(valid=False, status="invalid", message="x")
+    assert encode(copy) == encode(original)
+    assert encode(copy) is not encode(original)
+
+
+def test_shared_constants_are_immutable():
+    with pytest.raises(ValidationError):
+        license_service._INVALID_LICENSE.valid = True
@@ -0,0 +1,128 @@
+"""Unit tests for Space-Saving heavy hitters and the admin endpoint/widget."""
+
+import random
+import time
+from collections import Counter
+
+import pytest
+from httpx import AsyncClient
+
+from app.core.heavy_hitters import RollingTopK, SpaceSaving, heavy_hitters
+from app.core.security import compute_validation_signature
+from app.services.ip_cardinality import ip_cardinality, period_starts
+
+
+def test_space_saving_bounds_and_finds_frequent_items():
+    rng = random.Random(7)
+    stream = [f"hot{i}" for i in range(5) for _ in range(200)]
+    stream += [f"cold{rng.randrange(5000)}" for _ in range(4000)]
+    rng.shuffle(stream)
+    sketch = SpaceSaving(capacity=32)
+    for item in stream:
+        sketch.add(item)
+
+    true = Counter(stream)
+    found = {h.item: h for h in sketch.items()}
+    assert len(found) == 32
+    for i in range(5):  # > total / capacity occurrences: guaranteed to be kept
+        h = found[f"hot{i}"]
+        assert h.count - h.error <= true[h.item] <= h.count
+
+
+def test_space_saving_tracks_minimum_through_evictions():
+    rng = random.Random(3)
+    sketch = SpaceSaving(capacity=8)
+    for _ in range(5000):
+        sketch.add(f"k{rng.randrange(40)}")
+        counts = [h.count for h in sketch.items()]
+        assert sketch.floor() == (min(counts) if len(counts) == 8 else 0)
+    assert sum(h.count - h.error for h in sketch.items()) <= sketch.total
+
+
+def test_window_merge_never_under_counts():
+    """An item evicted from some buckets still gets an upper bound over the window."""
+    rng = random.Random(11)
+    topk = RollingTopK(capacity=8, bucket_seconds=10, buckets=4)
+    true = Counter()
+    for bucket in range(4):
+        # "steady" is listed exactly in the quiet odd buckets, but starts the busy even
+        # ones and is then evicted by noise, so their summaries do not list it
+        noise = [f"noise{rng.randrange(200)}" for _ in range(300)] if bucket % 2 == 0 else []
+        for item in ["steady"] * 20 + noise:
+            topk.add(item, now=bucket * 10)
+            true[item] += 1
+    top, total = topk.top(1000, now=39)
+    assert total == sum(true.values())
+    for h in top:
+        assert h.count - h.error <= true[h.item] <= h.count, h
+    assert "steady" in {h.item for h in top}
+
+
+def test_rolling_window_drops_old_buckets():
+    topk = RollingTopK(capacity=4, bucket_seconds=60, buckets=3)
+    topk.add("a", now=0)
+    topk.add("a", now=61)
+    topk.add("b", now=121)
+    top, total = topk.top(10, now=150)
+    assert [(h.item, h.count) for h in top] == [("a", 2), ("b", 1)]
+    assert total == 3
+    top, total = topk.top(10, now=200)  # bucket 0 left the window
+    assert {h.item: h.count for h in top} == {"a": 1, "b": 1}
+    topk.add("c", now=400)
+    assert {h.item for h in topk.top(10, now=400)[0]} == {"c"}
+
+
+@pytest.mark.asyncio
+async def test_heavy_hitters_endpoint_and_widget(client: AsyncClient, admin_token, active_license):
+    license_, plain_key = active_license
+    for _ in range(3):
+        ts = int(time.time())
+        await client.post(
+            "/licenses/validate",
+            json={
+                "license_key": plain_key,
+                "app_id": "app1",
+                "timestamp": ts,
+                "signature": compute_validation_signature(plain_key, "app1", ts),
+            },
+        )
+    r = await client.get(
+        "/diagnostics/heavy-hitters", headers={"Authorization": f"Bearer {admin_token}"}
+    )
+    assert r.status_code == 200
+    top = {e["license_id"]: e for e in r.json()["license_keys"]["top"]}
+    assert top[str(license_.id)]["count"] >= 3
+    assert top[str(license_.id)]["client_name"] == "Test Client"
+
+    client.cookies.set("swaps_token", admin_token)
+    r = await client.get("/admin/heavy-hitters")
+    assert r.status_code == 200
+    assert "Test Client" in r.text
+
+
+@pytest.mark.asyncio
+async def test_heavy_hitters_endpoint_requires_admin(client: AsyncClient):
+    r = await client.get("/diagnostics/heavy-hitters")
+    assert r.status_code == 401
+
+
+@pytest.mark.asyncio
+async def test_validate_behind_proxy_records_forwarded_client_ip(
+    client: AsyncClient, active_license
+):
+    license_, plain_key = active_license
+    ts = int(time.time())
+    r = await client.post(
+        "/licenses/validate",
+        json={
+            "license_key": plain_key,
+            "app_id": "app1",
+            "timestamp": ts,
+            "signature": compute_validation_signature(plain_key, "app1", ts),
+        },
+        headers={"X-Forwarded-For": "203.0.113.9"},  # the test client's peer is 127.0.0.1
+    )
+    assert r.json()["valid"] is True
+    assert "203.0.113.9" in {h.item for h in heavy_hitters.ips.top(100)[0]}
+    day_key = (license_.id, "day", period_starts()["day"])
+    assert ip_cardinality.pending(day_key).estimate() == 1
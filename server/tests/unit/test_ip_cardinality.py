@@ -0,0 +1,146 @@
+"""Unit tests for HyperLogLog sketches and per-license distinct-IP tracking."""
+
+from datetime import date
+from uuid import uuid4
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import event, select
+
+from app.core.config import settings
+from app.core.hll import HyperLogLog
+from app.core.query_stats import capture_statements
+from app.models.license_ip_sketch import LicenseIPSketch
+from app.services.ip_cardinality import IPCardinalityTracker, ip_cardinality, retained_starts
+
+
+def _ips(start: int, n: int) -> list[str]:
+    return [f"10.{(i >> 16) & 255}.{(i >> 8) & 255}.{i & 255}" for i in range(start, start + n)]
+
+
+@pytest.mark.parametrize("n", [10, 1000, 10000])
+def test_estimate_is_within_error_bound(n):
+    sketch = HyperLogLog()
+    for ip in _ips(0, n):
+        sketch.add(ip)
+        sketch.add(ip)  # duplicates do not count
+    assert abs(sketch.estimate() - n) <= max(1, 0.2 * n)
+
+
+def test_merge_equals_sketch_of_union_and_round_trips():
+    a, b, union = HyperLogLog(), HyperLogLog(), HyperLogLog()
+    for ip in _ips(0, 600):
+        a.add(ip)
+        union.add(ip)
+    for ip in _ips(400, 600):
+        b.add(ip)
+        union.add(ip)
+    a.merge(b)
+    assert a.to_bytes() == union.to_bytes()
+    assert len(a.to_bytes()) == 256
+    assert HyperLogLog.from_bytes(a.to_bytes()).estimate() == union.estimate()
+    with pytest.raises(ValueError):
+        HyperLogLog(registers=bytes(100))
+
+
+@pytest.mark.asyncio
+async def test_flush_merges_sketches_from_several_workers(db_session_maker, active_license):
+    license_, _ = active_license
+    today = date(2026, 10, 19)
+    worker_a, worker_b = IPCardinalityTracker(), IPCardinalityTracker()
+    for ip in _ips(0, 30):
+        worker_a.record(license_.id, ip, today=today)
+    for ip in _ips(20, 30):
+        worker_b.record(license_.id, ip, today=today)
+    assert await worker_a.flush(db_session_maker) == 2  # day + month rows
+    assert await worker_b.flush(db_session_maker) == 2
+
+    reader = IPCardinalityTracker()
+    async with db_session_maker() as db:
+        estimates = await reader.estimates(db, [license_.id], today=today)
+        next_day = await reader.estimates(db, [license_.id], today=date(2026, 10, 20))
+    assert abs(estimates[license_.id]["day"] - 50) <= 5
+    assert estimates[license_.id]["month"] == estimates[license_.id]["day"]
+    assert next_day[license_.id]["day"] == 0
+    assert next_day[license_.id]["month"] == estimates[license_.id]["month"]
+
+
+@pytest.mark.asyncio
+async def test_dashboard_flags_licenses_above_threshold(
+    client: AsyncClient, admin_token: str, active_license, monkeypatch
+):
+    license_, _ = active_license
+    monkeypatch.setattr(settings, "key_sharing_daily_ip_threshold", 3)
+    for ip in _ips(0, 10):
+        ip_cardinality.record(license_.id, ip)
+    client.cookies.set("swaps_token", admin_token)
+    r = await client.get("/admin/")
+    assert r.status_code == 200
+    assert "possible sharing" in r.text
+    r = await client.get(f"/admin/licenses/{license_.id}/history")
+    assert "possible key sharing" in r.text
+
+
+@pytest.mark.asyncio
+async def test_flush_creates_and_locks_rows_in_key_order(db_session_maker):
+    tracker = IPCardinalityTracker()
+    license_ids = [uuid4() for _ in range(6)]
+    for license_id in license_ids:
+        tracker.record(license_id, "10.0.0.1", today=date(2026, 10, 19))
+    inserted: list[str] = []
+
+    def _collect(conn, cursor, statement, parameters, context, executemany):
+        if statement.startswith("INSERT"):
+            rows = parameters if executemany else [parameters]
+            inserted.extend(str(row[0]) for row in rows)
+
+    engine = db_session_maker.kw["bind"].sync_engine
+    event.listen(engine, "before_cursor_execute", _collect)
+    try:
+        with capture_statements() as stats:
+            assert await tracker.flush(db_session_maker) == 12
+    finally:
+        event.remove(engine, "before_cursor_execute", _collect)
+    # Concurrent workers take row locks in the same order, so they cannot deadlock
+    assert inserted == sorted(inserted) and len(inserted) == 12
+    select_sql = next(s for s in stats.statements if s.lstrip().startswith("SELECT"))
+    assert "ORDER BY" in select_sql
+
+
+@pytest.mark.asyncio
+async def test_flush_deletes_sketch_rows_estimates_never_read(db_session_maker, active_license):
+    license_, _ = active_license
+    old, recent = IPCardinalityTracker(), IPCardinalityTracker()
+    for day in (date(2026, 8, 31), date(2026, 9, 30), date(2026, 10, 18)):
+        old.record(license_.id, "10.0.0.1", today=day)
+    assert await old.flush(db_session_maker, today=date(2026, 8, 31)) == 6
+
+    recent.record(license_.id, "10.0.0.2", today=date(2026, 10, 19))
+    await recent.flush(db_session_maker, today=date(2026, 10, 19))
+    async with db_session_maker() as db:
+        rows = await db.execute(select(LicenseIPSketch.period, LicenseIPSketch.period_start))
+        kept = sorted(rows.all())
+    # Yesterday and last month stay (late flushes); older days and months are gone
+    assert kept == [
+        ("day", date(2026, 10, 18)),
+        ("day", date(2026, 10, 19)),
+        ("month", date(2026, 9, 1)),
+        ("month", date(2026, 10, 1)),
+    ]
+    assert retained_starts(date(2026, 1, 5)) == {
+        "day": date(2026, 1, 4),
+        "month": date(2025, 12, 1),
+    }
+
+
+@pytest.mark.asyncio
+async def test_stop_logs_a_failed_final_flush(monkeypatch, caplog):
+    tracker = IPCardinalityTracker()
+    tracker.record(uuid4(), "10.0.0.1")
+
+    async def unreachable_database(session_maker=None, today=None):
+        raise ConnectionRefusedError("database is down")
+
+    monkeypatch.setattr(tracker, "flush", unreachable_database)
+    await tracker.stop()  # must not raise out of lifespan shutdown
+    assert "Final flush of license IP sketches failed" in caplog.text
@@ -2,7 +2,12 @@
 
 import pytest
 
-from app.core.security import generate_license_key, hash_license_key
+from app.core.security import (
+    generate_license_key,
+    hash_license_key,
+    license_key_digest,
+    license_key_digest_from_hex,
+)
 
 
 def test_hash_license_key_deterministic():
@@ -14,6 +19,14 @@ def test_hash_license_key_deterministic():
     assert all(c in "0123456789abcdef" for c in h1)
 
 
+def test_license_key_digest_matches_hex_hash():
+    key = "LIC-MYAPP-018E2F3A-7B9D2C1E4F5A6B8C"
+    digest = license_key_digest(key)
+    assert len(digest) == 32
+    assert digest.hex() == hash_license_key(key)
+    assert license_key_digest_from_hex(hash_license_key(key)) == digest
+
+
 def test_generate_license_key_format():
     key = generate_license_key("MYAPP")
     assert key.startswith("LIC-MYAPP-")
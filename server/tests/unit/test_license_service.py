@@ -1,10 +1,11 @@
 """Unit tests for license service (pure functions and logic with mocked DB)."""
 
 from datetime import date
-from unittest.mock import AsyncMock
+from unittest.mock import AsyncMock, MagicMock
 
 import pytest
 
+from app.core.security import hash_license_key
 from app.schemas.license import LicenseCreate, ValidateRequest, ValidateResponse
 from app.services import license_service
 
@@ -12,8 +13,8 @@ from app.services import license_service
 def test_create_license_key_pair():
     plain, key_hash = license_service.create_license_key_pair("APP")
     assert plain.startswith("LIC-APP-")
-    assert len(key_hash) == 64
-    assert all(c in "0123456789abcdef" for c in key_hash)
+    assert isinstance(key_hash, bytes)
+    assert key_hash.hex() == hash_license_key(plain)
 
 
 @pytest.mark.asyncio
@@ -26,12 +27,17 @@ async def test_create_license_returns_plain_key():
         status="active",
         monthly_renewal=True,
     )
+    db.execute.return_value = MagicMock()
     license_, plain = await license_service.create_license(db, data)
-    assert license_.app_name == "MyApp"
-    assert license_.client_name == "Acme"
     assert plain.startswith("LIC-")
-    db.add.assert_called_once()
-    db.flush.assert_called_once()
+    assert license_ is db.execute.return_value.scalar_one.return_value
+    db.execute.assert_awaited_once()
+    stmt = db.execute.await_args.args[0]
+    params = stmt.compile().params
+    assert stmt.table.name == "licenses"
+    assert params["app_name"] == "MyApp"
+    assert params["client_name"] == "Acme"
+    assert params["license_key_hash"] == license_service.license_key_digest(plain)
 
 
 @pytest.mark.asyncio
@@ -0,0 +1,130 @@
+"""Unit tests for archiving validation logs to block-gzipped NDJSON and reading them back."""
+
+import gzip
+import json
+from datetime import date, datetime, timedelta
+
+import pytest
+from sqlalchemy import event, func, select
+
+from app.models.license import License
+from app.models.validation_log import ValidationLog
+from app.services import log_archive
+from app.services.log_archive import MANIFEST, ArchiveReader, archive_before, archive_day
+
+
+async def _seed(db_session_maker) -> list[License]:
+    day1, day2 = datetime(2026, 1, 10), datetime(2026, 1, 11)
+    async with db_session_maker() as db:
+        licenses = [
+            License(
+                license_key_hash=bytes([i]) * 32,
+                app_name="App",
+                client_name=f"Client {i}",
+                expiry_date=date(2027, 1, 1),
+                status="active",
+            )
+            for i in range(3)
+        ]
+        db.add_all(licenses)
+        await db.flush()
+        for lic in licenses:
+            for day in (day1, day2):
+                for minute in range(4):
+                    db.add(
+                        ValidationLog(
+                            license_id=lic.id,
+                            validated_at=day + timedelta(hours=12, minutes=minute),
+                            ip_address="203.0.113.7",
+                            result="success",
+                        )
+                    )
+        await db.commit()
+    return licenses
+
+
+async def _count_logs(db_session_maker) -> int:
+    async with db_session_maker() as db:
+        return await db.scalar(select(func.count()).select_from(ValidationLog))
+
+
+@pytest.mark.asyncio
+async def test_archive_day_writes_blocks_and_deletes_rows(db_session_maker, tmp_path):
+    await _seed(db_session_maker)
+    entry = await archive_day(date(2026, 1, 10), tmp_path, db_session_maker, block_rows=3)
+    assert entry["rows"] == 12
+    assert len(entry["blocks"]) == 4
+    assert json.loads((tmp_path / MANIFEST).read_text())["files"] == [entry]
+    # The concatenated blocks are one valid gzip stream
+    with gzip.open(tmp_path / entry["file"]) as fh:
+        assert len(fh.read().splitlines()) == 12
+    assert await _count_logs(db_session_maker) == 12
+
+    # Re-running an archived day exports nothing new
+    again = await archive_day(date(2026, 1, 10), tmp_path, db_session_maker, block_rows=3)
+    assert again == entry
+    assert await archive_day(date(2026, 1, 9), tmp_path, db_session_maker) is None
+
+
+@pytest.mark.asyncio
+async def test_reader_prunes_blocks_by_license_and_time(db_session_maker, tmp_path):
+    licenses = await _seed(db_session_maker)
+    entries = await archive_before(date(2026, 1, 12), tmp_path, db_session_maker)
+    assert [e["file"] for e in entries] == [
+        "validation_logs-2026-01-10.ndjson.gz",
+        "validation_logs-2026-01-11.ndjson.gz",
+    ]
+    assert await _count_logs(db_session_maker) == 0
+
+    target = sorted(licenses, key=lambda lic: str(lic.id))[1]
+    records = ArchiveReader(tmp_path).history(target.id)
+    assert len(records) == 8
+    assert all(r["license_id"] == str(target.id) for r in records)
+    assert records[0]["validated_at"] == datetime(2026, 1, 11, 12, 3)
+    assert records == sorted(records, key=lambda r: r["validated_at"], reverse=True)
+
+
+@pytest.mark.asyncio
+async def test_reader_decompresses_only_candidate_blocks(db_session_maker, tmp_path):
+    licenses = await _seed(db_session_maker)
+    for day in (date(2026, 1, 10), date(2026, 1, 11)):
+        # Sorted by license, 2 rows per block: each license spans 2 of the day's 6 blocks
+        await archive_day(day, tmp_path, db_session_maker, block_rows=2)
+
+    target = sorted(licenses, key=lambda lic: str(lic.id))[1]
+    reader = ArchiveReader(tmp_path)
+    records = reader.history(target.id, start=datetime(2026, 1, 11, 12, 2))
+    assert [r["validated_at"].minute for r in records] == [3, 2]
+    assert reader.blocks_read == 1
+    assert sum(len(f["blocks"]) for f in reader.manifest["files"]) == 12
+
+
+@pytest.mark.asyncio
+async def test_archive_day_deletes_while_reading_archive(db_session_maker, tmp_path, monkeypatch):
+    await _seed(db_session_maker)
+    monkeypatch.setattr(log_archive, "DELETE_BATCH", 5)
+    read = 0
+    records = ArchiveReader.records
+
+    def counting_records(self, entry):
+        nonlocal read
+        for record in records(self, entry):
+            read += 1
+            yield record
+
+    read_at_delete = []
+    monkeypatch.setattr(ArchiveReader, "records", counting_records)
+    engine = db_session_maker.kw["bind"].sync_engine
+
+    def on_delete(conn, cursor, statement, parameters, context, executemany):
+        if statement.startswith("DELETE"):
+            read_at_delete.append(read)
+
+    event.listen(engine, "before_cursor_execute", on_delete)
+    try:
+        await log_archive.archive_day(date(2026, 1, 10), tmp_path, db_session_maker, block_rows=3)
+    finally:
+        event.remove(engine, "before_cursor_execute", on_delete)
+    # Each batch is deleted as soon as it has been read: at most DELETE_BATCH ids in memory
+    assert read_at_delete == [5, 10, 12]
+    assert await _count_logs(db_session_maker) == 12
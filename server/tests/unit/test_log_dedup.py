@@ -0,0 +1,95 @@
+"""Unit tests for collapsing repeated identical validations into one log row."""
+
+import time
+import uuid
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import select
+
+from app.core.config import settings
+from app.core.query_stats import capture_statements
+from app.core.security import compute_validation_signature
+from app.models.validation_log import ValidationLog
+from app.services.log_dedup import ValidationLogDedup, log_dedup
+
+
+def _signed(license_key: str) -> dict:
+    ts = int(time.time())
+    return {
+        "license_key": license_key,
+        "app_id": "app1",
+        "timestamp": ts,
+        "signature": compute_validation_signature(license_key, "app1", ts),
+    }
+
+
+@pytest.fixture
+def dedup_on(monkeypatch):
+    monkeypatch.setattr(settings, "validation_log_dedup_seconds", 60.0)
+    log_dedup.clear()
+    yield
+    log_dedup.clear()
+
+
+def test_window_and_key_bound(monkeypatch):
+    monkeypatch.setattr(settings, "validation_log_dedup_seconds", 60.0)
+    monkeypatch.setattr(settings, "validation_log_dedup_max_keys", 2)
+    dedup = ValidationLogDedup()
+    key = (uuid.uuid4(), "203.0.113.1", "success", None)
+    row = uuid.uuid4()
+    dedup.remember(key, row, now=0.0)
+    assert dedup.row_for(key, now=59.0) == row
+    assert dedup.row_for(key, now=60.0) is None  # window is measured from the first attempt
+    for i in range(5):
+        dedup.remember((uuid.uuid4(), None, "success", None), uuid.uuid4(), now=100.0 + i)
+    assert len(dedup._rows) <= 2
+
+
+@pytest.mark.asyncio
+async def test_repeats_update_one_row(
+    client: AsyncClient, active_license, db_session_maker, dedup_on
+):
+    license_, plain_key = active_license
+    for _ in range(3):
+        assert (await client.post("/licenses/validate", json=_signed(plain_key))).json()["valid"]
+    with capture_statements() as stats:
+        await client.post("/licenses/validate", json=_signed(plain_key))
+    assert [s.split()[0] for s in stats.statements] == ["SELECT", "UPDATE"]
+
+    async with db_session_maker() as db:
+        rows = (
+            await db.execute(select(ValidationLog).where(ValidationLog.license_id == license_.id))
+        ).scalars().all()
+    assert len(rows) == 1
+    assert rows[0].repeat_count == 4
+    assert rows[0].last_seen_at is not None
+
+
+@pytest.mark.asyncio
+async def test_history_shows_collapsed_counts(
+    client: AsyncClient, active_license, admin_token, dedup_on
+):
+    license_, plain_key = active_license
+    for _ in range(2):
+        await client.post("/licenses/validate", json=_signed(plain_key))
+    r = await client.get(
+        f"/licenses/{license_.id}/history", headers={"Authorization": f"Bearer {admin_token}"}
+    )
+    assert [e["repeat_count"] for e in r.json()] == [2]
+    client.cookies.set("swaps_token", admin_token)
+    assert "(last " in (await client.get(f"/admin/licenses/{license_.id}/history")).text
+
+
+@pytest.mark.asyncio
+async def test_dedup_off_inserts_every_attempt(
+    client: AsyncClient, active_license, db_session_maker
+):
+    license_, plain_key = active_license
+    for _ in range(2):
+        await client.post("/licenses/validate", json=_signed(plain_key))
+    async with db_session_maker() as db:
+        rows = (
+            await db.execute(select(ValidationLog).where(ValidationLog.license_id == license_.id))
+        ).scalars().all()
+    assert [r.repeat_count for r in rows] == [1, 1]
@@ -0,0 +1,45 @@
+"""Unit tests for the event-loop lag monitor and blocking watchdog."""
+
+import asyncio
+import logging
+import threading
+import time
+
+import pytest
+
+from app.core.loop_monitor import LOOP_BLOCKED, LOOP_LAG, LoopMonitor
+
+
+def _block_loop(seconds: float) -> None:
+    time.sleep(seconds)  # deliberately blocking
+
+
+@pytest.mark.asyncio
+async def test_monitor_records_lag_and_logs_blocking_stack(monkeypatch, caplog):
+    monkeypatch.setattr("app.core.loop_monitor.settings.debug", True)
+    monkeypatch.setattr("app.core.loop_monitor.settings.loop_monitor_interval_seconds", 0.02)
+    monkeypatch.setattr("app.core.loop_monitor.settings.loop_block_threshold_ms", 50)
+    monitor = LoopMonitor()
+    lag_count = LOOP_LAG.count()
+    blocked = LOOP_BLOCKED.value()
+    inc_threads = []
+    inc = LOOP_BLOCKED.inc
+
+    def recording_inc(*labels, **kwargs):
+        inc_threads.append(threading.get_ident())
+        inc(*labels, **kwargs)
+
+    monkeypatch.setattr(LOOP_BLOCKED, "inc", recording_inc)
+    caplog.set_level(logging.WARNING, logger="app.core.loop_monitor")
+    monitor.start()
+    try:
+        await asyncio.sleep(0.05)
+        _block_loop(0.3)
+        await asyncio.sleep(0.05)
+    finally:
+        await monitor.stop()
+    assert LOOP_LAG.count() > lag_count
+    assert monitor.last_lag >= 0
+    assert LOOP_BLOCKED.value() == blocked + 1
+    assert inc_threads == [threading.get_ident()]  # counted on the loop thread
+    assert "_block_loop" in caplog.text
@@ -0,0 +1,79 @@
+"""Unit tests for metrics collectors and the /metrics endpoint."""
+
+import time
+
+import pytest
+from httpx import ASGITransport, AsyncClient
+from starlette.applications import Starlette
+from starlette.middleware import Middleware
+from starlette.routing import Route
+
+from app.core.metrics import (
+    HTTP_REQUEST_DURATION,
+    Counter,
+    Histogram,
+    MetricsMiddleware,
+    Registry,
+)
+from app.core.security import compute_validation_signature
+
+
+def test_histogram_renders_cumulative_buckets():
+    h = Histogram("t_seconds", "test", ("route",), buckets=(0.1, 1.0))
+    h.observe(0.05, "/a")
+    h.observe(0.5, "/a")
+    h.observe(5.0, "/a")
+    reg = Registry()
+    reg.register(h)
+    text = reg.render()
+    assert 't_seconds_bucket{route="/a",le="0.1"} 1' in text
+    assert 't_seconds_bucket{route="/a",le="1.0"} 2' in text
+    assert 't_seconds_bucket{route="/a",le="+Inf"} 3' in text
+    assert 't_seconds_count{route="/a"} 3' in text
+    assert h.count("/a") == 3
+
+
+def test_counter_labels_are_escaped():
+    c = Counter("t_total", "test", ("reason",))
+    c.inc('say "hi"')
+    c.inc('say "hi"', amount=2)
+    assert c.value('say "hi"') == 3
+    assert 't_total{reason="say \\"hi\\""} 3.0' in "\n".join(c.samples())
+
+
+@pytest.mark.asyncio
+async def test_metrics_endpoint_exposes_route_stage_and_outcome(
+    client: AsyncClient, active_license
+):
+    _, plain_key = active_license
+    ts = int(time.time())
+    await client.post(
+        "/licenses/validate",
+        json={
+            "license_key": plain_key,
+            "app_id": "app1",
+            "timestamp": ts,
+            "signature": compute_validation_signature(plain_key, "app1", ts),
+        },
+    )
+    r = await client.get("/metrics")
+    assert r.status_code == 200
+    text = r.text
+    assert 'route="/licenses/validate",method="POST",status="200"' in text
+    for stage in ("signature", "lookup", "log_write"):
+        assert f'swaps_validation_stage_duration_seconds_count{{stage="{stage}"}}' in text
+    assert 'swaps_validation_outcomes_total{status="active"}' in text
+    assert 'swaps_db_pool_connections{state="checkedout"}' in text
+
+
+@pytest.mark.asyncio
+async def test_unhandled_errors_are_recorded_as_500():
+    async def boom(request):
+        raise RuntimeError("boom")
+
+    app = Starlette(routes=[Route("/boom", boom)], middleware=[Middleware(MetricsMiddleware)])
+    before = HTTP_REQUEST_DURATION.count("unmatched", "GET", "500")
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+        with pytest.raises(RuntimeError):
+            await client.get("/boom")
+    assert HTTP_REQUEST_DURATION.count("unmatched", "GET", "500") == before + 1
@@ -0,0 +1,46 @@
+"""Unit tests for compact column encodings (coded labels, native IP addresses)."""
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import StatementError
+
+from app.models.validation_log import ValidationLog, ValidationReason, ValidationResult
+
+
+@pytest.mark.asyncio
+async def test_validation_log_round_trips_labels_as_codes(db_session_maker, active_license):
+    license_, _ = active_license
+    async with db_session_maker() as db:
+        db.add_all(
+            [
+                ValidationLog(
+                    license_id=license_.id,
+                    ip_address="203.0.113.9",
+                    result="fail",
+                    error_reason="License expired",
+                ),
+                ValidationLog(license_id=license_.id, ip_address="testclient", result="success"),
+            ]
+        )
+        await db.commit()
+
+        raw = (
+            await db.execute(text("SELECT result, reason, ip_address FROM validation_logs"))
+        ).all()
+        assert sorted(raw, key=lambda r: r[0]) == [
+            (ValidationResult.SUCCESS, None, None),
+            (ValidationResult.FAIL, ValidationReason.LICENSE_EXPIRED, "203.0.113.9"),
+        ]
+
+        logs = (await db.execute(ValidationLog.__table__.select())).all()
+        decoded = {(row.result, row.reason, row.ip_address) for row in logs}
+        assert decoded == {("fail", "License expired", "203.0.113.9"), ("success", None, None)}
+
+
+@pytest.mark.asyncio
+async def test_unknown_label_is_rejected(db_session_maker, active_license):
+    license_, _ = active_license
+    async with db_session_maker() as db:
+        db.add(ValidationLog(license_id=license_.id, result="maybe"))
+        with pytest.raises(StatementError):
+            await db.flush()
@@ -0,0 +1,108 @@
+"""Unit tests for the admin principal cache used by the auth dependencies."""
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import select, update
+
+from app.core import principal_cache
+from app.core.principal_cache import AdminPrincipal
+from app.core.query_stats import capture_statements
+from app.models.admin import Admin
+
+
+@pytest.mark.asyncio
+async def test_repeated_admin_requests_skip_admin_lookup(client: AsyncClient, admin_token):
+    headers = {"Authorization": f"Bearer {admin_token}"}
+    with capture_statements() as first:
+        r = await client.get("/licenses/", headers=headers)
+    assert r.status_code == 200
+    with capture_statements() as second:
+        r = await client.get("/licenses/", headers=headers)
+    assert r.status_code == 200
+    assert any("admins" in s for s in first.statements)
+    assert not any("admins" in s for s in second.statements), second.statements
+
+
+@pytest.mark.asyncio
+async def test_deactivating_admin_evicts_cached_principal(
+    client: AsyncClient, db_session_maker, admin_token
+):
+    headers = {"Authorization": f"Bearer {admin_token}"}
+    assert (await client.get("/licenses/", headers=headers)).status_code == 200
+
+    async with db_session_maker() as db:
+        admin = (await db.execute(select(Admin))).scalar_one()
+        admin.is_active = False
+        await db.commit()
+
+    r = await client.get("/licenses/", headers=headers)
+    assert r.status_code == 403
+
+
+@pytest.mark.asyncio
+async def test_dashboard_cookie_auth_uses_cache(client: AsyncClient, admin_token):
+    client.cookies.set("swaps_token", admin_token)
+    assert (await client.get("/admin/audit")).status_code == 200
+    with capture_statements() as stats:
+        assert (await client.get("/admin/audit")).status_code == 200
+    assert not any("admins" in s for s in stats.statements)
+
+
+def test_entries_expire_after_ttl(monkeypatch):
+    principal = AdminPrincipal(id=None, email="a@b.c", role="admin", is_active=True)
+    monkeypatch.setattr(principal_cache.settings, "admin_principal_cache_ttl_seconds", 10.0)
+    principal_cache.put(principal)
+    assert principal_cache.get("a@b.c") is principal
+    monkeypatch.setattr(principal_cache.time, "monotonic", lambda: float("inf"))
+    assert principal_cache.get("a@b.c") is None
+
+
+async def _cache_admin(client: AsyncClient, admin_token: str) -> None:
+    r = await client.get("/licenses/", headers={"Authorization": f"Bearer {admin_token}"})
+    assert r.status_code == 200
+    assert principal_cache.get("admin@test.example") is not None
+
+
+@pytest.mark.asyncio
+async def test_eviction_waits_for_commit(client: AsyncClient, db_session_maker, admin_token):
+    await _cache_admin(client, admin_token)
+    async with db_session_maker() as db:
+        admin = (await db.execute(select(Admin))).scalar_one()
+        admin.role = "viewer"
+        await db.flush()
+        # Not committed: other requests still see the old row, so the entry stays
+        assert principal_cache.get(admin.email).role == "admin"
+        await db.rollback()
+    assert principal_cache.get("admin@test.example") is not None
+
+    async with db_session_maker() as db:
+        admin = (await db.execute(select(Admin))).scalar_one()
+        admin.role = "viewer"
+        await db.commit()
+    assert principal_cache.get("admin@test.example") is None
+
+
+@pytest.mark.asyncio
+async def test_bulk_update_of_admins_evicts_on_commit(
+    client: AsyncClient, db_session_maker, admin_token
+):
+    await _cache_admin(client, admin_token)
+    async with db_session_maker() as db:
+        await db.execute(update(Admin).values(is_active=False))
+        assert principal_cache.get("admin@test.example") is not None
+        await db.commit()
+    assert principal_cache.get("admin@test.example") is None
+    r = await client.get("/licenses/", headers={"Authorization": f"Bearer {admin_token}"})
+    assert r.status_code == 403
+
+
+def test_load_that_overlaps_an_invalidation_is_not_cached(monkeypatch):
+    monkeypatch.setattr(principal_cache.settings, "admin_principal_cache_ttl_seconds", 10.0)
+    principal = AdminPrincipal(id=None, email="a@b.c", role="admin", is_active=True)
+    generation = principal_cache.generation()  # request starts loading the row
+    principal_cache.invalidate("a@b.c")  # a deactivation commits meanwhile
+    principal_cache.put(principal, generation)
+    assert principal_cache.get("a@b.c") is None
+    principal_cache.put(principal, principal_cache.generation())
+    assert principal_cache.get("a@b.c") is principal
+    principal_cache.invalidate()
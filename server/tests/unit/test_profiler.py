@@ -0,0 +1,95 @@
+"""Unit tests for the sampling profiler and its admin endpoint."""
+
+import threading
+import time
+
+import pytest
+from httpx import AsyncClient
+
+from app.core import profiler
+
+
+def _busy_loop(stop: threading.Event) -> None:
+    while not stop.is_set():
+        sum(range(1000))
+
+
+def test_sample_thread_collects_collapsed_stacks():
+    stop = threading.Event()
+    t = threading.Thread(target=_busy_loop, args=(stop,))
+    t.start()
+    try:
+        stacks, taken = profiler.sample_thread(t.ident, 0.2, 0.005)
+    finally:
+        stop.set()
+        t.join()
+    assert taken > 5
+    assert any("test_profiler:_busy_loop" in s for s in stacks)
+    text = profiler.render_collapsed(stacks)
+    stack, count = text.splitlines()[0].rsplit(" ", 1)
+    assert int(count) >= 1 and ";" in stack
+
+
+def test_sample_thread_route_filter_drops_other_stacks():
+    def unrelated():
+        pass
+
+    stacks, taken = profiler.sample_thread(
+        threading.get_ident(), 0.02, 0.005, only_within=unrelated.__code__
+    )
+    assert taken > 0
+    assert not stacks
+
+
+def test_sample_thread_rejects_when_busy(monkeypatch):
+    monkeypatch.setattr("app.core.profiler.settings.profiler_max_concurrent", 0)
+    with pytest.raises(profiler.ProfilerBusyError):
+        profiler.sample_thread(threading.get_ident(), 0.01, 0.005)
+
+
+@pytest.mark.asyncio
+async def test_profile_endpoint_requires_admin(client: AsyncClient):
+    r = await client.get("/diagnostics/profile?seconds=1")
+    assert r.status_code == 401
+
+
+@pytest.mark.asyncio
+async def test_profile_endpoint_returns_folded_file(client: AsyncClient, admin_token):
+    started = time.monotonic()
+    r = await client.get(
+        "/diagnostics/profile?seconds=0.2&route=/licenses/validate",
+        headers={"Authorization": f"Bearer {admin_token}"},
+    )
+    assert r.status_code == 200
+    assert time.monotonic() - started < 2
+    assert r.headers["content-disposition"].endswith('.folded"')
+    assert int(r.headers["x-profile-samples"]) > 0
+
+    r = await client.get(
+        "/diagnostics/profile?seconds=3600", headers={"Authorization": f"Bearer {admin_token}"}
+    )
+    assert r.status_code == 422
+
+
+@pytest.mark.asyncio
+async def test_profile_route_filter_matches_method_and_path(client: AsyncClient, admin_token):
+    from app.api.routes import diagnostics, licenses
+    from app.main import app
+
+    request = type("R", (), {"app": app})()
+    code = diagnostics._endpoint_code(request, "PATCH /licenses/{license_id}")
+    assert code is licenses.update_license.__code__
+    code = diagnostics._endpoint_code(request, "delete /licenses/{license_id}")
+    assert code is not licenses.update_license.__code__
+    assert diagnostics._endpoint_code(request, "/licenses/validate") is (
+        licenses.validate_license.__code__
+    )
+
+    auth = {"Authorization": f"Bearer {admin_token}"}
+    params = {"seconds": 0.05, "route": "/licenses/{license_id}"}
+    r = await client.get("/diagnostics/profile", params=params, headers=auth)
+    assert r.status_code == 400
+    assert "DELETE" in r.json()["detail"] and "PATCH" in r.json()["detail"]
+    params["route"] = "PUT /licenses/{license_id}"
+    r = await client.get("/diagnostics/profile", params=params, headers=auth)
+    assert r.status_code == 404
@@ -3,22 +3,45 @@
 from unittest.mock import MagicMock
 
 import pytest
+from starlette.requests import Request
 
-from app.core.rate_limit import RateLimitMiddleware, _get_client_ip
+from app.core.client_ip import client_ip
+from app.core.config import settings
+from app.core.rate_limit import RateLimitMiddleware
 
 
-def test_get_client_ip_from_forwarded():
-    request = MagicMock()
-    request.headers = {"x-forwarded-for": "192.168.1.1, 10.0.0.1"}
-    request.client = None
-    assert _get_client_ip(request) == "192.168.1.1"
+def _request(peer: str | None, forwarded: str | None = None) -> Request:
+    headers = [(b"x-forwarded-for", forwarded.encode())] if forwarded else []
+    return Request(
+        {
+            "type": "http",
+            "method": "POST",
+            "path": "/",
+            "headers": headers,
+            "client": (peer, 1234) if peer else None,
+        }
+    )
 
 
-def test_get_client_ip_from_client():
-    request = MagicMock()
-    request.headers = {}
-    request.client = MagicMock(host="127.0.0.1")
-    assert _get_client_ip(request) == "127.0.0.1"
+def test_client_ip_from_trusted_proxy_is_nearest_untrusted_hop(monkeypatch):
+    monkeypatch.setattr(settings, "trusted_proxies", ["127.0.0.1", "172.16.0.0/12"])
+    # The client prepended a spoofed entry; Nginx appended the real peer address
+    request = _request("172.18.0.5", "6.6.6.6, 203.0.113.7")
+    assert client_ip(request) == "203.0.113.7"
+    assert client_ip(_request("127.0.0.1", "198.51.100.1, 172.18.0.5")) == "198.51.100.1"
+
+
+def test_client_ip_ignores_forwarded_for_from_untrusted_peer(monkeypatch):
+    monkeypatch.setattr(settings, "trusted_proxies", ["127.0.0.1"])
+    assert client_ip(_request("203.0.113.7", "192.168.1.1")) == "203.0.113.7"
+    assert client_ip(_request(None, "192.168.1.1")) is None
+
+
+def test_client_ip_is_resolved_once_per_request(monkeypatch):
+    request = _request("127.0.0.1", "203.0.113.7")
+    assert client_ip(request) == "203.0.113.7"
+    monkeypatch.setattr(settings, "trusted_proxies", [])
+    assert client_ip(Request(request.scope)) == "203.0.113.7"
 
 
 @pytest.mark.asyncio
@@ -38,6 +61,7 @@ async def test_rate_limit_allows_under_limit(monkeypatch):
         return Response("ok")
 
     request = MagicMock(spec=Request)
+    request.scope = {}
     request.headers = {}
     request.client = MagicMock(host="1.2.3.4")
     for _ in range(2):
@@ -61,6 +85,7 @@ async def test_rate_limit_blocks_over_limit(monkeypatch):
         return Response("ok")
 
     request = MagicMock(spec=Request)
+    request.scope = {}
     request.headers = {}
     request.client = MagicMock(host="5.6.7.8")
     r1 = await middleware.dispatch(request, next_handler)
@@ -68,3 +93,12 @@ async def test_rate_limit_blocks_over_limit(monkeypatch):
     assert r1.status_code == 200
     assert r2.status_code == 429
     _rate.clear()
+
+
+def test_validation_rate_limit_follows_setting(monkeypatch):
+    from app.api.routes import licenses
+
+    monkeypatch.setattr(licenses.settings, "validation_rate_limit_per_key_per_hour", 3)
+    monkeypatch.setattr(licenses, "_validations_by_key", {})
+    results = [licenses._check_validation_rate_limit(b"k" * 32) for _ in range(4)]
+    assert results == [True, True, True, False]
@@ -0,0 +1,225 @@
+"""Unit tests for the streamed admin dashboard and license history pages."""
+
+import asyncio
+from datetime import date, datetime, timedelta
+
+import pytest
+from httpx import AsyncClient
+from jinja2 import DictLoader, Environment
+from starlette.requests import ClientDisconnect
+
+from app.api.routes import admin as admin_routes
+from app.core.database import get_db
+from app.core.query_stats import capture_statements
+from app.main import app
+from app.models.license import License
+from app.models.validation_log import ValidationLog
+
+
+async def _asgi_get(path: str, cookie: str) -> tuple[int, list[bytes]]:
+    """GET through the raw ASGI interface, keeping each body message separate."""
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": b"",
+        "headers": [(b"host", b"test"), (b"cookie", cookie.encode())],
+        "client": ("127.0.0.1", 50000),
+        "server": ("test", 80),
+    }
+    messages = []
+    sent_request = False
+
+    async def receive():
+        nonlocal sent_request
+        if not sent_request:
+            sent_request = True
+            return {"type": "http.request", "body": b"", "more_body": False}
+        await asyncio.Event().wait()  # never disconnects
+
+    async def send(message):
+        messages.append(message)
+
+    await app(scope, receive, send)
+    status = next(m["status"] for m in messages if m["type"] == "http.response.start")
+    chunks = [m["body"] for m in messages if m["type"] == "http.response.body" and m["body"]]
+    return status, chunks
+
+
+@pytest.mark.asyncio
+async def test_dashboard_streams_all_licenses_in_chunks(
+    client: AsyncClient, admin_token, db_session_maker
+):
+    async with db_session_maker() as db:
+        db.add_all(
+            License(
+                license_key_hash=i.to_bytes(32, "big"),
+                app_name="App",
+                client_name=f"Client {i:04d}",
+                expiry_date=date(2027, 1, 1),
+                status="active",
+            )
+            for i in range(450)
+        )
+        await db.commit()
+    with capture_statements() as stats:
+        status, chunks = await _asgi_get("/admin/", cookie=f"swaps_token={admin_token}")
+    page = b"".join(chunks).decode()
+    assert status == 200
+    assert len(chunks) > 5  # sent progressively, not as one body
+    assert page.count('class="badge badge-active">active') == 450
+    assert page.rstrip().endswith("</html>")
+    # admin lookup, 3 summary queries, the license cursor, one IP estimate query per batch
+    assert stats.count == 1 + 3 + 1 + 3, stats.statements
+
+
+@pytest.mark.asyncio
+async def test_history_streams_logs_and_redirects_unknown_license(
+    client: AsyncClient, admin_token, active_license, db_session_maker
+):
+    license_, _ = active_license
+    async with db_session_maker() as db:
+        start = datetime(2026, 1, 1)
+        db.add_all(
+            ValidationLog(
+                license_id=license_.id,
+                validated_at=start + timedelta(minutes=i),
+                ip_address="203.0.113.5",
+                result="success",
+            )
+            for i in range(300)
+        )
+        await db.commit()
+    client.cookies.set("swaps_token", admin_token)
+    r = await client.get(f"/admin/licenses/{license_.id}/history")
+    assert r.status_code == 200
+    assert r.text.count("203.0.113.5") == 300
+    assert r.text.index("2026-01-01 04:59:00") < r.text.index("2026-01-01 00:00:00")
+
+    r = await client.get(
+        "/admin/licenses/00000000-0000-0000-0000-000000000000/history", follow_redirects=False
+    )
+    assert r.status_code == 302
+
+
+@pytest.mark.asyncio
+async def test_streamed_pages_hold_no_request_scoped_session(
+    client: AsyncClient, admin_token, active_license
+):
+    license_, _ = active_license
+
+    async def no_request_session():
+        raise AssertionError("streamed pages must not hold a get_db session")
+        yield
+
+    app.dependency_overrides[get_db] = no_request_session  # popped by db_session_maker
+    client.cookies.set("swaps_token", admin_token)
+    assert (await client.get("/admin/")).status_code == 200
+    assert (await client.get(f"/admin/licenses/{license_.id}/history")).status_code == 200
+
+
+class _TrackedSession:
+    closed = False
+
+    async def close(self) -> None:
+        self.closed = True
+
+
+@pytest.mark.asyncio
+async def test_stream_closes_session_when_template_fails_mid_stream(monkeypatch):
+    env = Environment(
+        loader=DictLoader({"page.html": "{% for row in rows %}{{ row }}{% endfor %}"}),
+        enable_async=True,
+    )
+    monkeypatch.setattr(admin_routes, "_streaming_env", env)
+    monkeypatch.setattr(admin_routes, "_STREAM_CHUNK_CHARS", 1)
+
+    async def rows():
+        yield "x" * 10
+        raise RuntimeError("cursor lost")
+
+    db = _TrackedSession()
+    response = admin_routes._stream_template("page.html", {"rows": rows()}, db)
+    bodies = []
+
+    async def receive():
+        await asyncio.Event().wait()
+
+    async def send(message):
+        if message["type"] == "http.response.body":
+            bodies.append(message["body"])
+
+    scope = {"type": "http", "asgi": {"version": "3.0", "spec_version": "2.4"}}
+    with pytest.raises(RuntimeError, match="cursor lost"):
+        await response(scope, receive, send)
+    assert bodies == [b"x" * 10]  # the first chunk went out before the failure
+    assert db.closed
+
+
+@pytest.mark.asyncio
+async def test_stream_closes_session_when_client_disconnects(monkeypatch):
+    env = Environment(
+        loader=DictLoader({"page.html": "{% for row in rows %}{{ row }}{% endfor %}"}),
+        enable_async=True,
+    )
+    monkeypatch.setattr(admin_routes, "_streaming_env", env)
+    monkeypatch.setattr(admin_routes, "_STREAM_CHUNK_CHARS", 1)
+    first_chunk_sent = asyncio.Event()
+
+    async def rows():
+        yield "x"
+        await asyncio.Event().wait()  # a slow cursor
+
+    db = _TrackedSession()
+    response = admin_routes._stream_template("page.html", {"rows": rows()}, db)
+
+    async def receive():
+        await first_chunk_sent.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        if message["type"] == "http.response.body":
+            first_chunk_sent.set()
+
+    # Before ASGI spec 2.4 Starlette watches for the disconnect and cancels the body
+    scope = {"type": "http", "asgi": {"version": "3.0", "spec_version": "2.3"}}
+    await asyncio.wait_for(response(scope, receive, send), timeout=5)
+    assert db.closed
+
+
+@pytest.mark.asyncio
+async def test_stream_closes_session_when_send_fails_on_disconnect(monkeypatch):
+    env = Environment(
+        loader=DictLoader({"page.html": "{% for row in rows %}{{ row }}{% endfor %}"}),
+        enable_async=True,
+    )
+    monkeypatch.setattr(admin_routes, "_streaming_env", env)
+    monkeypatch.setattr(admin_routes, "_STREAM_CHUNK_CHARS", 1)
+
+    async def rows():
+        for _ in range(10):
+            yield "x"
+
+    db = _TrackedSession()
+    response = admin_routes._stream_template("page.html", {"rows": rows()}, db)
+    sent = 0
+
+    async def receive():
+        await asyncio.Event().wait()
+
+    async def send(message):
+        nonlocal sent
+        if message["type"] == "http.response.body":
+            sent += 1
+            if sent == 2:
+                raise OSError("connection reset")  # what the server does after a disconnect
+
+    # ASGI spec 2.4: Starlette does not watch for the disconnect, send raises instead
+    scope = {"type": "http", "asgi": {"version": "3.0", "spec_version": "2.4"}}
+    with pytest.raises(ClientDisconnect):
+        await response(scope, receive, send)
+    assert db.closed  # while the response (and its body generator) is still referenced
@@ -0,0 +1,51 @@
+"""Admin template bytecode cache and startup precompilation."""
+
+from fastapi.templating import Jinja2Templates
+
+from app.api.routes import admin
+from app.core.config import settings
+
+
+def _fresh_envs(monkeypatch, cache_dir):
+    """The admin template environments as a new worker would build them."""
+    monkeypatch.setattr(settings, "template_cache_dir", str(cache_dir))
+    templates = Jinja2Templates(directory=str(admin._templates_dir))
+    templates.env.bytecode_cache = admin._bytecode_cache("__jinja2_%s.cache")
+    streaming_env = templates.env.overlay(
+        enable_async=True, bytecode_cache=admin._bytecode_cache("__jinja2_async_%s.cache")
+    )
+    monkeypatch.setattr(admin, "templates", templates)
+    monkeypatch.setattr(admin, "_streaming_env", streaming_env)
+    return templates.env, streaming_env
+
+
+def test_precompile_loads_every_template_into_both_envs(monkeypatch, tmp_path):
+    env, streaming_env = _fresh_envs(monkeypatch, tmp_path)
+    count = admin.precompile_templates()
+    names = env.list_templates(extensions=["html"])
+    assert count == len(names) and "admin/dashboard.html" in names
+    assert len(env.cache) == len(streaming_env.cache) == count
+    # Sync and async code for the same source must not share a cache file
+    assert len(list(tmp_path.glob("__jinja2_async_*.cache"))) == count
+    assert len(list(tmp_path.glob("__jinja2_*.cache"))) == 2 * count
+
+
+def test_next_worker_reads_bytecode_instead_of_compiling(monkeypatch, tmp_path):
+    _fresh_envs(monkeypatch, tmp_path)
+    admin.precompile_templates()
+
+    env, streaming_env = _fresh_envs(monkeypatch, tmp_path)
+
+    def compile_(*args, **kwargs):
+        raise AssertionError("template compiled despite cached bytecode")
+
+    monkeypatch.setattr(env, "compile", compile_)
+    monkeypatch.setattr(streaming_env, "compile", compile_)
+    admin.precompile_templates()
+    html = env.get_template("admin/login.html").render(request=None, error=None)
+    assert "</html>" in html
+
+
+def test_no_cache_dir_means_no_bytecode_cache(monkeypatch):
+    monkeypatch.setattr(settings, "template_cache_dir", "")
+    assert admin._bytecode_cache("__jinja2_%s.cache") is None
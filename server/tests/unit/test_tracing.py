@@ -0,0 +1,158 @@
+"""Unit tests for tracing spans, Server-Timing and OTLP export."""
+
+import json
+import time
+
+import pytest
+from httpx import AsyncClient
+from starlette.middleware import Middleware
+
+from app.api.deps import server_timing_allowed
+from app.core import tracing
+from app.core.security import compute_validation_signature
+
+
+def test_span_is_noop_without_trace():
+    with tracing.span("lookup") as s:
+        s.set_attribute("k", "v")
+    assert s is tracing._NOOP_SPAN
+
+
+def test_nested_spans_and_server_timing():
+    trace = tracing.Trace("0" * 32, sampled=True)
+    token = tracing._current_trace.set(trace)
+    try:
+        with tracing.Span(trace, "request", None) as root:
+            with tracing.span("handler"):
+                with tracing.span("lookup") as lookup:
+                    time.sleep(0.001)
+    finally:
+        tracing._current_trace.reset(token)
+    assert lookup.parent_id is not None
+    assert [s.name for s in trace.spans] == ["lookup", "handler", "request"]
+    header = trace.server_timing()
+    assert header.startswith("total;dur=")
+    assert "lookup;dur=" in header and "middleware;dur=" in header
+    otlp = {s["name"]: s for s in trace.to_otlp()["spans"]}
+    assert otlp["handler"]["parentSpanId"] == root.span_id
+    assert otlp["lookup"]["parentSpanId"] == otlp["handler"]["spanId"]
+
+
+def test_parse_traceparent():
+    tp = "00-4bf92f3577b34da6a3ce929d0e0e4736-00f067aa0ba902b7-01"
+    assert tracing._parse_traceparent(tp) == (
+        "4bf92f3577b34da6a3ce929d0e0e4736", "00f067aa0ba902b7", True
+    )
+    assert tracing._parse_traceparent("garbage") is None
+    for bad in (
+        "00-" + "0" * 32 + "-00f067aa0ba902b7-01",  # all-zero trace id
+        "00-4bf92f3577b34da6a3ce929d0e0e4736-" + "0" * 16 + "-01",
+        "00-4BF92F3577B34DA6A3CE929D0E0E4736-00f067aa0ba902b7-01",  # uppercase
+        "00-4bf92f3577b34da6a3ce929d0e0e473z-00f067aa0ba902b7-01",
+        "00-4bf92f3577b34da6a3ce929d0e0e4736-00f067aa0ba902b7-zz",
+        "ff-4bf92f3577b34da6a3ce929d0e0e4736-00f067aa0ba902b7-01",
+    ):
+        assert tracing._parse_traceparent(bad) is None, bad
+
+
+@pytest.mark.asyncio
+async def test_sampled_flag_is_only_honoured_from_trusted_proxies(
+    client_with_middleware, tmp_path, monkeypatch
+):
+    monkeypatch.setattr("app.core.tracing.settings.trace_export_path", str(tmp_path / "t"))
+    monkeypatch.setattr("app.core.tracing.settings.trace_sample_rate", 0.0)
+    submitted = []
+    monkeypatch.setattr(tracing.exporter, "submit", submitted.append)
+    client = client_with_middleware(Middleware(tracing.TracingMiddleware))
+    tp = "00-4bf92f3577b34da6a3ce929d0e0e4736-00f067aa0ba902b7-01"
+
+    monkeypatch.setattr("app.core.client_ip.settings.trusted_proxies", [])
+    await client.get("/health", headers={"traceparent": tp})
+    assert submitted == []  # an anonymous client cannot force sampling
+
+    monkeypatch.setattr("app.core.client_ip.settings.trusted_proxies", ["127.0.0.1"])
+    await client.get("/health", headers={"traceparent": tp})
+    assert [t.trace_id for t in submitted] == ["4bf92f3577b34da6a3ce929d0e0e4736"]
+
+
+@pytest.mark.asyncio
+async def test_exporter_stop_survives_unreachable_collector(monkeypatch):
+    monkeypatch.setattr("app.core.tracing.settings.trace_export_url", "http://127.0.0.1:9/v1")
+    exporter = tracing.TraceExporter()
+    exporter.submit(tracing.Trace("4bf92f3577b34da6a3ce929d0e0e4736", sampled=True))
+    await exporter.stop()  # logs the connection error instead of raising
+
+
+def _signed(plain_key: str) -> dict:
+    ts = int(time.time())
+    return {
+        "license_key": plain_key,
+        "app_id": "app1",
+        "timestamp": ts,
+        "signature": compute_validation_signature(plain_key, "app1", ts),
+    }
+
+
+@pytest.fixture
+def traced_client(client_with_middleware, monkeypatch):
+    """The app with Server-Timing on, its tracing middleware installed as main.py does."""
+    monkeypatch.setattr("app.core.tracing.settings.server_timing_enabled", True)
+    return client_with_middleware(
+        Middleware(tracing.TracingMiddleware, timing_allowed=server_timing_allowed)
+    )
+
+
+def test_tracing_is_off_by_default():
+    from app.core.config import Settings
+    from app.main import app
+
+    assert Settings().server_timing_enabled is False
+    assert all(m.cls is not tracing.TracingMiddleware for m in app.user_middleware)
+
+
+@pytest.mark.asyncio
+async def test_validate_emits_server_timing_to_admins_and_exports(
+    traced_client: AsyncClient, active_license, admin_token, tmp_path, monkeypatch
+):
+    out = tmp_path / "traces.jsonl"
+    monkeypatch.setattr("app.core.tracing.settings.trace_export_path", str(out))
+    monkeypatch.setattr("app.core.tracing.settings.trace_sample_rate", 1.0)
+    _, plain_key = active_license
+    r = await traced_client.post(
+        "/licenses/validate",
+        json=_signed(plain_key),
+        headers={"Authorization": f"Bearer {admin_token}"},
+    )
+    timing = r.headers[tracing.SERVER_TIMING_HEADER]
+    for name in ("total", "handler", "signature", "lookup", "log_write", "middleware"):
+        assert f"{name};dur=" in timing
+    await tracing.exporter.flush()
+    payload = json.loads(out.read_text().splitlines()[-1])
+    names = {s["name"] for s in payload["resourceSpans"][0]["scopeSpans"][-1]["spans"]}
+    assert {"request", "handler", "lookup"} <= names
+
+
+@pytest.mark.asyncio
+async def test_public_routes_hide_server_timing_from_anonymous_callers(
+    traced_client: AsyncClient, active_license, admin_token
+):
+    _, plain_key = active_license
+    r = await traced_client.post("/licenses/validate", json=_signed(plain_key))
+    assert r.json()["valid"] is True
+    assert tracing.SERVER_TIMING_HEADER not in r.headers
+    r = await traced_client.post(
+        "/licenses/validate",
+        json=_signed(plain_key),
+        headers={"Authorization": "Bearer not-a-token"},
+    )
+    assert tracing.SERVER_TIMING_HEADER not in r.headers
+    r = await traced_client.get("/no-such-path")
+    assert tracing.SERVER_TIMING_HEADER not in r.headers
+
+    # Admin-only routes carry it (as do public ones for an admin's cookie)
+    r = await traced_client.get("/licenses/", headers={"Authorization": f"Bearer {admin_token}"})
+    assert r.status_code == 200
+    assert "total;dur=" in r.headers[tracing.SERVER_TIMING_HEADER]
+    traced_client.cookies.set("swaps_token", admin_token)
+    r = await traced_client.get("/health")
+    assert "total;dur=" in r.headers[tracing.SERVER_TIMING_HEADER]
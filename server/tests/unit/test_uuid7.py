@@ -0,0 +1,25 @@
+"""Unit tests for time-ordered UUIDv7 primary keys."""
+
+import time
+
+from app.models.base import uuid7
+from app.models.validation_log import ValidationLog
+
+
+def test_uuid7_version_variant_and_timestamp():
+    before = time.time_ns() // 1_000_000
+    u = uuid7()
+    after = time.time_ns() // 1_000_000
+    assert u.version == 7
+    assert u.variant == "specified in RFC 4122"
+    assert before <= u.int >> 80 <= after + 1
+
+
+def test_uuid7_strictly_increasing():
+    ids = [uuid7() for _ in range(20000)]
+    assert ids == sorted(ids)
+    assert len(set(ids)) == len(ids)
+
+
+def test_validation_log_ids_are_time_ordered():
+    assert ValidationLog.__table__.c.id.default.arg.__name__ == "uuid7"
@@ -1,34 +1,343 @@
 """
-Locust load test: simulate concurrent validation requests.
+Locust load test: realistic validation traffic plus concurrent admin users.
+
 Run: locust -f tests/locustfile.py --host=http://localhost:8000
-Then open http://localhost:8089 and spawn 500 users for validation endpoint.
+Then open http://localhost:8089 and spawn users (e.g. 500).
+
+Before the test starts, a pool of real licenses is provisioned through the admin API
+(active, expired and suspended), so validation requests reach the DB lookup and the
+validation log write. Requests are signed with the server's LICENSE_HMAC_SECRET.
+
+Required environment (same values as the server):
+  LICENSE_HMAC_SECRET     signing secret for validation requests
+  SWAPS_ADMIN_EMAIL       admin used to provision licenses and for dashboard users
+  SWAPS_ADMIN_PASSWORD
+
+Traffic mix (ratios, any positive integers) via --validation-mix or SWAPS_VALIDATION_MIX:
+  valid=60,expired=10,suspended=10,unknown=10,replayed=5,rate_limited=5
+
+Each outcome is reported under its own name (e.g. "/licenses/validate [expired]"), so the
+Locust UI and CSV stats give per-outcome latency percentiles; a summary table is also
+printed when the test stops.
+
+Rate limits: the server allows VALIDATION_RATE_LIMIT_PER_KEY_PER_HOUR validations per key
+(10 by default) and 100 requests per minute per IP. Valid/expired/suspended keys are rotated
+across a pool per kind and each simulated user sends a synthetic X-Forwarded-For address,
+so only the rate_limited scenario is meant to trip the limits (the server honours that
+header only from TRUSTED_PROXIES, so add the load generator's address on the load-test
+deployment; otherwise every user shares one IP). The pool is sized from
+users x validation rate x mix share (replays included) x run time (at most one hour) /
+per-key limit; pass the server's limit with --server-rate-limit. For large runs, raise the
+server limit (e.g. VALIDATION_RATE_LIMIT_PER_KEY_PER_HOUR=1000 on a load-test deployment)
+rather than provisioning tens of thousands of licenses. An explicit --license-pool-size that
+is too small stops the test before any user starts. In the rate_limited scenario, "active"
+responses before the hot key reaches its limit count as successes.
 """
 
+import hashlib
+import hmac
+import logging
+import math
+import os
+import random
 import time
-from locust import HttpUser, task, between
-
-# These must match a real license key and server signing secret for "valid" requests.
-# For load testing invalid requests (still hits the endpoint), we use a fixed body.
-VALIDATION_PAYLOAD = {
-    "license_key": "LIC-LOADTEST-00000000-0000000000000000",
-    "app_id": "loadtest",
-    "timestamp": int(time.time()),
-    "signature": "invalid-signature-for-load-test",
+from base64 import b64encode
+from collections import deque
+from datetime import date, timedelta
+from itertools import cycle
+
+from locust import HttpUser, between, events, task
+from locust.exception import StopUser
+
+VALIDATE_PATH = "/licenses/validate"
+OUTCOMES = ("valid", "expired", "suspended", "unknown", "replayed", "rate_limited")
+DEFAULT_MIX = "valid=60,expired=10,suspended=10,unknown=10,replayed=5,rate_limited=5"
+
+# Expected `status` in the validation response for each outcome (None = any 200 body)
+EXPECTED_STATUS = {
+    "valid": "active",
+    "expired": "expired",
+    "suspended": "suspended",
+    "unknown": "invalid",
+    "replayed": None,
+    "rate_limited": "rate_limited",
 }
+# Also a success for that outcome: the hot key has not reached the limit yet (warm-up)
+WARMUP_STATUS = {"rate_limited": "active"}
+
+# Upper bound on validations per ValidationUser per second: a task every >= 0.5 s, and
+# validate is one of its two equally weighted tasks
+VALIDATIONS_PER_USER_PER_SECOND = 1.0
+_HOUR_SECONDS = 3600
+# Kinds whose keys are rotated and must stay under the per-key limit
+POOLED_KINDS = ("valid", "expired", "suspended")
+
+# Filled once per process by _provision_pool on test start
+_pool: dict[str, list[str]] = {"valid": [], "expired": [], "suspended": [], "rate_limited": []}
+_key_cycles: dict[str, cycle] = {}
+_mix: list[tuple[str, int]] = []
+# Recently sent signed payloads, re-sent verbatim by the "replayed" scenario
+_sent_payloads: deque[dict] = deque(maxlen=1000)
+
+
+def compute_signature(license_key: str, app_id: str, timestamp: int, secret: str) -> str:
+    """HMAC-SHA256(license_key|app_id|timestamp) — same as the server and SDK."""
+    payload = f"{license_key}|{app_id}|{timestamp}"
+    sig = hmac.new(secret.encode("utf-8"), payload.encode("utf-8"), hashlib.sha256).digest()
+    return b64encode(sig).decode("ascii").rstrip("=")
+
+
+def signed_payload(license_key: str, app_id: str = "loadtest") -> dict:
+    secret = os.environ.get("LICENSE_HMAC_SECRET", "change-me-hmac-secret-for-key-generation")
+    ts = int(time.time())
+    return {
+        "license_key": license_key,
+        "app_id": app_id,
+        "timestamp": ts,
+        "signature": compute_signature(license_key, app_id, ts, secret),
+    }
+
+
+def parse_mix(spec: str) -> list[tuple[str, int]]:
+    """Parse "valid=60,expired=10,..." into [(outcome, weight), ...]."""
+    mix = []
+    for part in spec.split(","):
+        if not part.strip():
+            continue
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if name not in OUTCOMES:
+            raise ValueError(f"Unknown outcome {name!r} in validation mix; expected {OUTCOMES}")
+        if int(weight) > 0:
+            mix.append((name, int(weight)))
+    if not mix:
+        raise ValueError("Validation mix must contain at least one positive weight")
+    return mix
+
+
+@events.init_command_line_parser.add_listener
+def _add_arguments(parser):
+    parser.add_argument(
+        "--validation-mix",
+        type=str,
+        env_var="SWAPS_VALIDATION_MIX",
+        default=DEFAULT_MIX,
+        help="Outcome ratios for validation traffic, e.g. " + DEFAULT_MIX,
+    )
+    parser.add_argument(
+        "--license-pool-size",
+        type=int,
+        env_var="SWAPS_LICENSE_POOL_SIZE",
+        default=0,
+        help="Licenses provisioned per kind (valid, expired, suspended); 0 = size from "
+        "users, mix, run time and --server-rate-limit",
+    )
+    parser.add_argument(
+        "--server-rate-limit",
+        type=int,
+        env_var="SWAPS_SERVER_RATE_LIMIT",
+        default=10,
+        help="The server's VALIDATION_RATE_LIMIT_PER_KEY_PER_HOUR",
+    )
+
+
+def required_pool_size(
+    users: int, share: float, run_time: float | None, limit_per_hour: int
+) -> int:
+    """Keys of one kind needed so that no key passes the server's hourly limit.
+
+    `users` is the number of ValidationUsers, `share` the kind's fraction of all validations
+    (replays of its payloads included) and `run_time` the test duration in seconds (None =
+    unlimited, counted as one hour, since the limit is a sliding hour).
+    """
+    window = min(run_time or _HOUR_SECONDS, _HOUR_SECONDS)
+    demand = users * VALIDATIONS_PER_USER_PER_SECOND * share * window
+    return max(1, math.ceil(demand / limit_per_hour))
+
+
+def _pool_size(environment, mix: list[tuple[str, int]]) -> int:
+    """Pool size per kind: the requested one if large enough, else the required one."""
+    options = environment.parsed_options
+    users = getattr(environment.runner, "target_user_count", None) or options.num_users or 1
+    validation_users = math.ceil(
+        users * ValidationUser.weight / (ValidationUser.weight + AdminUser.weight)
+    )
+    # Replays re-send recent payloads, which come from the other outcomes in proportion to
+    # their weights, so a pooled kind's share of all validations is w / (total - replayed)
+    fresh = sum(weight for kind, weight in mix if kind != "replayed")
+    largest_share = max(
+        (w / fresh for k, w in mix if k in POOLED_KINDS and fresh), default=0.0
+    )
+    required = required_pool_size(
+        validation_users, largest_share, options.run_time, options.server_rate_limit
+    )
+    if options.license_pool_size and options.license_pool_size < required:
+        raise ValueError(
+            f"--license-pool-size {options.license_pool_size} is too small: "
+            f"{validation_users} validation users need {required} keys per kind to stay "
+            f"under {options.server_rate_limit} validations per key per hour. Raise the "
+            "pool size, or VALIDATION_RATE_LIMIT_PER_KEY_PER_HOUR on the server and "
+            "--server-rate-limit to match."
+        )
+    return options.license_pool_size or required
+
+
+def _admin_token(client, host: str) -> str:
+    r = client.post(
+        f"{host}/auth/login",
+        json={
+            "email": os.environ["SWAPS_ADMIN_EMAIL"],
+            "password": os.environ["SWAPS_ADMIN_PASSWORD"],
+        },
+    )
+    r.raise_for_status()
+    return r.json()["access_token"]
+
+
+@events.test_start.add_listener
+def _provision_pool(environment, **kwargs):
+    """Create the license pool through the admin API before any user starts."""
+    import requests  # shipped with locust
+
+    global _mix
+    mix = parse_mix(environment.parsed_options.validation_mix)
+    try:
+        size = _pool_size(environment, mix)
+    except ValueError as exc:
+        logging.error("%s", exc)
+        environment.process_exit_code = 1
+        environment.runner.quit()
+        return
+    logging.info("Provisioning %d licenses per kind", size)
+    host = environment.host.rstrip("/")
+    with requests.Session() as http:
+        headers = {"Authorization": f"Bearer {_admin_token(http, host)}"}
+        today = date.today()
+        kinds = {
+            "valid": ("active", today + timedelta(days=365), size),
+            "expired": ("active", today - timedelta(days=30), size),
+            "suspended": ("suspended", today + timedelta(days=365), size),
+            "rate_limited": ("active", today + timedelta(days=365), 5),
+        }
+        for kind, (status, expiry, count) in kinds.items():
+            _pool[kind] = []
+            for i in range(count):
+                r = http.post(
+                    f"{host}/licenses/",
+                    headers=headers,
+                    json={
+                        "app_name": "LoadTest",
+                        "client_name": f"locust-{kind}-{i}",
+                        "expiry_date": expiry.isoformat(),
+                        "status": status,
+                        "monthly_renewal": False,
+                    },
+                )
+                r.raise_for_status()
+                _pool[kind].append(r.json()["license_key"])
+            _key_cycles[kind] = cycle(_pool[kind])
+    _mix = mix
+
+
+@events.test_stop.add_listener
+def _print_outcome_percentiles(environment, **kwargs):
+    """Print p50/p95/p99 per validation outcome (also visible in the UI/CSV by name)."""
+    rows = [
+        e for e in environment.stats.entries.values() if e.name.startswith(VALIDATE_PATH + " [")
+    ]
+    if not rows:
+        return
+    print(f"\n{'outcome':<40}{'reqs':>8}{'fails':>8}{'p50':>8}{'p95':>8}{'p99':>8}")
+    for e in sorted(rows, key=lambda e: e.name):
+        print(
+            f"{e.name:<40}{e.num_requests:>8}{e.num_failures:>8}"
+            f"{e.get_response_time_percentile(0.5):>8.0f}"
+            f"{e.get_response_time_percentile(0.95):>8.0f}"
+            f"{e.get_response_time_percentile(0.99):>8.0f}"
+        )
 
 
 class ValidationUser(HttpUser):
-    """User that repeatedly calls POST /licenses/validate."""
+    """SDK client: validation requests mixed by outcome, with a per-user source IP."""
+
+    weight = 20
     wait_time = between(0.5, 1.5)
 
-    @task(10)
+    def on_start(self):
+        a, b, c = random.randint(0, 255), random.randint(0, 255), random.randint(1, 254)
+        self.forwarded_for = f"10.{a}.{b}.{c}"
+
+    def _post(self, outcome: str, payload: dict) -> None:
+        expected = EXPECTED_STATUS[outcome]
+        with self.client.post(
+            VALIDATE_PATH,
+            json=payload,
+            headers={"X-Forwarded-For": self.forwarded_for},
+            name=f"{VALIDATE_PATH} [{outcome}]",
+            catch_response=True,
+        ) as r:
+            if r.status_code != 200:
+                r.failure(f"HTTP {r.status_code}")
+                return
+            status = r.json().get("status")
+            if expected is not None and status not in (expected, WARMUP_STATUS.get(outcome)):
+                r.failure(f"expected status {expected!r}, got {status!r}")
+            else:
+                r.success()
+
+    @task
     def validate(self):
-        payload = {
-            **VALIDATION_PAYLOAD,
-            "timestamp": int(time.time()),
-        }
-        self.client.post("/licenses/validate", json=payload, name="/licenses/validate")
+        if not _mix:
+            raise StopUser()  # provisioning failed
+        outcome = random.choices([m[0] for m in _mix], weights=[m[1] for m in _mix])[0]
+        if outcome == "unknown":
+            key = f"LIC-LOADTEST-{int(time.time()):08X}-{random.getrandbits(64):016X}"
+            payload = signed_payload(key)
+        elif outcome == "replayed":
+            if not _sent_payloads:
+                return
+            payload = random.choice(_sent_payloads)
+        elif outcome == "rate_limited":
+            # A handful of hot keys, far past 10/hour each after the first few seconds
+            payload = signed_payload(random.choice(_pool["rate_limited"]))
+        else:
+            payload = signed_payload(next(_key_cycles[outcome]))
+        if outcome != "replayed":
+            _sent_payloads.append(payload)
+        self._post(outcome, payload)
 
     @task(1)
     def health(self):
         self.client.get("/health", name="/health")
+
+
+class AdminUser(HttpUser):
+    """Dashboard user browsing the license list and audit log while validations run."""
+
+    weight = 1
+    wait_time = between(2, 5)
+
+    def on_start(self):
+        r = self.client.post(
+            "/admin/login",
+            data={
+                "email": os.environ["SWAPS_ADMIN_EMAIL"],
+                "password": os.environ["SWAPS_ADMIN_PASSWORD"],
+            },
+            allow_redirects=False,
+            name="/admin/login",
+        )
+        if r.status_code != 302:
+            raise StopUser()
+
+    @task(3)
+    def dashboard(self):
+        self.client.get("/admin", name="/admin")
+
+    @task(2)
+    def audit(self):
+        self.client.get("/admin/audit", name="/admin/audit")
+
+    @task(1)
+    def audit_next_page(self):
+        self.client.get("/admin/audit?skip=100&limit=100", name="/admin/audit?skip")
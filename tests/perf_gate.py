@@ -0,0 +1,306 @@
+"""
+Performance regression gate: drive the ASGI app in-process and compare against a baseline.
+
+Run from repo root:
+  PYTHONPATH=server python tests/perf_gate.py                     # compare, exit 1 on regression
+  PYTHONPATH=server python tests/perf_gate.py --timing            # also gate on latency/rps
+  PYTHONPATH=server python tests/perf_gate.py --update-baseline   # rewrite tests/perf_baseline.json
+
+Each scenario sends a fixed number of requests at a fixed concurrency through
+httpx.ASGITransport (no network, no uvicorn) and records p50/p95/p99 latency, throughput
+and SQL statements per request. By default a scenario regresses only when it issues more
+SQL statements per request than the baseline: statement counts are the same on every
+machine. With --timing it also regresses when p50/p95 latency grows, or throughput drops,
+by more than --tolerance (default 25%), or p99 grows by more than --tail-tolerance
+(default 100%; a few samples decide it). Timings only mean something against a baseline
+recorded on the same runner, so --timing refuses a baseline whose runner (--runner,
+default the host name) differs.
+
+The gate refuses to compare at all when the baseline was recorded with another database
+dialect, request count or concurrency; regenerate it with --update-baseline instead.
+
+DATABASE_URL defaults to a throwaway SQLite file (schema created from the models), so the
+gate runs anywhere; point it at a migrated PostgreSQL database for production-like numbers.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+from dataclasses import asdict, dataclass
+from datetime import date, timedelta
+from itertools import count
+from pathlib import Path
+from statistics import quantiles
+
+# Configure the app before it is imported (settings and engine are created at import time)
+_tmp_db = Path(tempfile.gettempdir()) / "swaps_perf_gate.db"
+os.environ.setdefault("DATABASE_URL", f"sqlite+aiosqlite:///{_tmp_db}")
+os.environ.setdefault("RATE_LIMIT_PER_MINUTE_PER_IP", "100000000")
+
+from httpx import ASGITransport, AsyncClient  # noqa: E402
+from sqlalchemy import select  # noqa: E402
+
+from app.api.deps import ADMIN_TOKEN_COOKIE  # noqa: E402
+from app.core.database import Base, async_session_maker, engine  # noqa: E402
+from app.core.query_stats import capture_statements  # noqa: E402
+from app.core.security import (  # noqa: E402
+    compute_validation_signature,
+    create_access_token,
+    hash_password,
+)
+from app.main import app  # noqa: E402
+from app.models.admin import Admin  # noqa: E402
+from app.schemas.license import LicenseCreate  # noqa: E402
+from app.services import license_service  # noqa: E402
+
+BASELINE_PATH = Path(__file__).resolve().parent / "perf_baseline.json"
+ADMIN_EMAIL = "perf-gate@example.com"
+# Per-key validation limit is 10/hour, so valid traffic rotates across enough keys
+_VALIDATIONS_PER_KEY = 10
+
+
+@dataclass
+class ScenarioResult:
+    requests: int
+    p50_ms: float
+    p95_ms: float
+    p99_ms: float
+    rps: float
+    statements_per_request: float
+
+
+async def _setup_database(valid_keys: int) -> tuple[list[str], str]:
+    """Create schema (SQLite only), an admin and active licenses. Returns (keys, license_id)."""
+    if engine.dialect.name == "sqlite":
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.drop_all)
+            await conn.run_sync(Base.metadata.create_all)
+    keys: list[str] = []
+    async with async_session_maker() as db:
+        existing = await db.execute(select(Admin).where(Admin.email == ADMIN_EMAIL).limit(1))
+        if existing.scalar_one_or_none() is None:
+            db.add(
+                Admin(
+                    email=ADMIN_EMAIL,
+                    password_hash=hash_password("perf-gate"),
+                    role="admin",
+                    is_active=True,
+                )
+            )
+        data = LicenseCreate(
+            app_name="PerfGate",
+            client_name="perf-gate",
+            expiry_date=date.today() + timedelta(days=365),
+            status="active",
+            monthly_renewal=False,
+        )
+        license_ = None
+        for _ in range(valid_keys):
+            license_, key = await license_service.create_license(db, data)
+            keys.append(key)
+        await db.commit()
+    return keys, str(license_.id)
+
+
+def _signed(license_key: str) -> dict:
+    ts = int(time.time())
+    return {
+        "license_key": license_key,
+        "app_id": "perf",
+        "timestamp": ts,
+        "signature": compute_validation_signature(license_key, "perf", ts),
+    }
+
+
+async def _run(
+    client: AsyncClient, make_request, sequence: count, total: int, concurrency: int
+) -> ScenarioResult:
+    """Send `total` requests from `concurrency` workers; make_request(client, i) is awaited.
+
+    `i` comes from the scenario's sequence, so warm-up and measured runs never reuse a key.
+    """
+    latencies: list[float] = []
+    remaining = total
+
+    async def worker() -> None:
+        nonlocal remaining
+        while remaining > 0:
+            remaining -= 1
+            i = next(sequence)
+            start = time.perf_counter()
+            r = await make_request(client, i)
+            latencies.append((time.perf_counter() - start) * 1000)
+            if r.status_code >= 500:
+                raise RuntimeError(f"request {i} failed with HTTP {r.status_code}")
+
+    started = time.perf_counter()
+    # Workers inherit the capture, so every statement of every request is counted
+    with capture_statements() as stats:
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    cuts = quantiles(latencies, n=100, method="inclusive")
+    return ScenarioResult(
+        requests=total,
+        p50_ms=round(cuts[49], 3),
+        p95_ms=round(cuts[94], 3),
+        p99_ms=round(cuts[98], 3),
+        rps=round(total / elapsed, 1),
+        statements_per_request=round(stats.count / total, 2),
+    )
+
+
+async def run_scenarios(total: int, concurrency: int) -> dict[str, ScenarioResult]:
+    warmup = min(concurrency, total)
+    keys, license_id = await _setup_database((total + warmup) // _VALIDATIONS_PER_KEY + 1)
+    token = create_access_token(ADMIN_EMAIL)
+    bearer = {"Authorization": f"Bearer {token}"}
+    unknown_key = "LIC-PERFGATE-00000000-0000000000000000"
+
+    scenarios = {
+        "health": lambda c, i: c.get("/health"),
+        "validate_valid": lambda c, i: c.post(
+            "/licenses/validate", json=_signed(keys[i // _VALIDATIONS_PER_KEY])
+        ),
+        "validate_unknown_key": lambda c, i: c.post(
+            "/licenses/validate", json=_signed(f"{unknown_key[:-4]}{i:04X}")
+        ),
+        "validate_bad_signature": lambda c, i: c.post(
+            "/licenses/validate", json={**_signed(f"{unknown_key[:-4]}{i:04X}"), "signature": "x"}
+        ),
+        "licenses_list": lambda c, i: c.get("/licenses/", headers=bearer),
+        "license_history": lambda c, i: c.get(f"/licenses/{license_id}/history", headers=bearer),
+        "admin_dashboard": lambda c, i: c.get("/admin/", cookies={ADMIN_TOKEN_COOKIE: token}),
+    }
+    results: dict[str, ScenarioResult] = {}
+    transport = ASGITransport(app=app, client=("127.0.0.1", 50000))
+    async with AsyncClient(transport=transport, base_url="http://perf") as client:
+        for name, make_request in scenarios.items():
+            sequence = count()
+            # Warm-up: imports, template compilation, connection pool
+            await _run(client, make_request, sequence, warmup, concurrency)
+            results[name] = await _run(client, make_request, sequence, total, concurrency)
+    await engine.dispose()
+    return results
+
+
+def incompatible(run: dict, baseline: dict, timing: bool) -> list[str]:
+    """Settings that differ between this run and the baseline (empty list = comparable)."""
+    fields = ("database", "requests", "concurrency") + (("runner",) if timing else ())
+    return [
+        f"{field}: baseline {baseline.get(field)!r}, this run {run[field]!r}"
+        for field in fields
+        if baseline.get(field) != run[field]
+    ]
+
+
+def compare(
+    current: dict[str, ScenarioResult],
+    baseline: dict,
+    tolerance: float,
+    tail_tolerance: float,
+    timing: bool = False,
+) -> list[str]:
+    """Return human-readable regressions (empty list = pass). Timings only when `timing`."""
+    regressions = []
+    for name, result in current.items():
+        base = baseline.get(name)
+        if base is None:
+            continue
+        if result.statements_per_request > base["statements_per_request"] + 0.01:
+            regressions.append(
+                f"{name}: {result.statements_per_request} SQL statements/request "
+                f"> baseline {base['statements_per_request']}"
+            )
+        if not timing:
+            continue
+        for metric, allowed in (
+            ("p50_ms", tolerance),
+            ("p95_ms", tolerance),
+            ("p99_ms", tail_tolerance),
+        ):
+            limit = base[metric] * (1 + allowed)
+            if getattr(result, metric) > limit:
+                regressions.append(
+                    f"{name}: {metric} {getattr(result, metric):.2f} > {limit:.2f} "
+                    f"(baseline {base[metric]:.2f})"
+                )
+        if result.rps < base["rps"] * (1 - tolerance):
+            regressions.append(f"{name}: rps {result.rps:.1f} < baseline {base['rps']:.1f}")
+    return regressions
+
+
+def _print_table(results: dict[str, ScenarioResult]) -> None:
+    print(f"{'scenario':<26}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'req/s':>9}{'stmts':>7}")
+    for name, r in results.items():
+        print(
+            f"{name:<26}{r.p50_ms:>9.2f}{r.p95_ms:>9.2f}{r.p99_ms:>9.2f}"
+            f"{r.rps:>9.1f}{r.statements_per_request:>7.2f}"
+        )
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--requests", type=int, default=500, help="requests per scenario")
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed regression ratio")
+    parser.add_argument("--tail-tolerance", type=float, default=1.0, help="same, for p99")
+    parser.add_argument("--baseline", type=Path, default=BASELINE_PATH)
+    parser.add_argument("--update-baseline", action="store_true")
+    parser.add_argument(
+        "--timing",
+        action="store_true",
+        help="also gate on latency and throughput (baseline must come from this runner)",
+    )
+    parser.add_argument(
+        "--runner", default=platform.node(), help="name of this machine in the baseline"
+    )
+    args = parser.parse_args()
+    run = {
+        "requests": args.requests,
+        "concurrency": args.concurrency,
+        "database": engine.dialect.name,
+        "runner": args.runner,
+    }
+
+    baseline = None
+    if not args.update_baseline:
+        if not args.baseline.exists():
+            print(f"No baseline at {args.baseline}; run with --update-baseline first.")
+            return 1
+        baseline = json.loads(args.baseline.read_text())
+        mismatches = incompatible(run, baseline, args.timing)
+        if mismatches:
+            print(f"Baseline {args.baseline} was recorded with other settings:")
+            for line in mismatches:
+                print(f"  - {line}")
+            print("Run with the same settings, or regenerate it with --update-baseline.")
+            return 2
+
+    results = asyncio.run(run_scenarios(args.requests, args.concurrency))
+    _print_table(results)
+
+    if args.update_baseline:
+        payload = {**run, "scenarios": {name: asdict(r) for name, r in results.items()}}
+        args.baseline.write_text(json.dumps(payload, indent=2) + "\n")
+        print(f"Baseline written to {args.baseline}")
+        return 0
+
+    regressions = compare(
+        results, baseline["scenarios"], args.tolerance, args.tail_tolerance, args.timing
+    )
+    if regressions:
+        print("\nPerformance regressions:")
+        for line in regressions:
+            print(f"  - {line}")
+        return 1
+    print("\nNo regressions against baseline.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())